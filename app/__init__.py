@@ -70,6 +70,7 @@ def create_app(config_name):
     from app.push_notification import push_notification
     from app.earnings_call import earnings_call
     from app.monthly_valuation import monthly_valuation
+    from app.daily_price import daily_price
     from app.recommended_stock import recommended_stock
     from app.stock_index_weight import stock_index_weight
     from app.announcement_income_sheet_analysis import announcement_income_sheet_analysis
@@ -91,6 +92,7 @@ def create_app(config_name):
     app.register_blueprint(push_notification, url_prefix='/api/v0/push_notification')
     app.register_blueprint(earnings_call, url_prefix='/api/v0/earnings_call')
     app.register_blueprint(monthly_valuation, url_prefix='/api/v0/monthly_valuation')
+    app.register_blueprint(daily_price, url_prefix='/api/v0/daily_price')
     app.register_blueprint(recommended_stock, url_prefix='/api/v0/recommended_stock')
     app.register_blueprint(stock_index_weight, url_prefix='/api/v0/stock_index_weight')
     app.register_blueprint(announcement_income_sheet_analysis, url_prefix='/api/v0/announcement_income_sheet_analysis')
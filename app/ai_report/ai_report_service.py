@@ -7,6 +7,7 @@ from .. import db
 from .models import AiReport
 from ..ai_prompt.models import AiPrompt
 from ..models import Feed
+from ..services.feed_services import FeedServices
 
 logger = get_logger(__name__)
 
@@ -170,7 +171,7 @@ class AiReportService:
         from datetime import datetime as dt
         start_dt = dt.combine(period_start, dt.min.time())
         end_dt = dt.combine(period_end, dt.max.time())
-        feeds = Feed.query.filter(
+        feeds = FeedServices.get_feed_list_query().filter(
             Feed.source == source,
             Feed.releaseTime >= start_dt,
             Feed.releaseTime <= end_dt,
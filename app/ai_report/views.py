@@ -9,7 +9,7 @@ from . import ai_report
 from .serializer import AiReportSchema
 from .ai_report_service import AiReportService
 from ..decorators.auth import api_auth_required
-from ..schemas.feed_schema import FeedSchema
+from ..services.feed_services import FeedServices
 from ..earnings_call.serializer import EarningsCallchema
 
 logger = get_logger(__name__)
@@ -168,7 +168,7 @@ class AiReportFeedsApi(MethodView):
             return jsonify({"error": "Invalid date format, use YYYY-MM-DD"}), 400
 
         feeds = ai_report_service.get_news_feeds(source, period_start, period_end)
-        return jsonify(FeedSchema(many=True).dump(feeds))
+        return jsonify(FeedServices.serialize_feed_rows(feeds))
 
 
 class AiReportCompletedApi(MethodView):
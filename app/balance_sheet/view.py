@@ -7,8 +7,12 @@ import json
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from app.log_config import get_logger
+from app.decorators.auth import api_auth_required
+from ..utils.financial_statement_services import FinancialStatementServices, statement_digest
+from ..utils.bulk_operations import summarize_results
 
 logger = get_logger(__name__)
+balance_sheet_services = FinancialStatementServices(BalanceSheet)
 
 
 class handleBalanceSheet(MethodView):
@@ -106,6 +110,7 @@ class handleBalanceSheet(MethodView):
                 for key in payload:
                     balanceSheet[key] = payload[key]
 
+            balanceSheet['content_digest'] = statement_digest(BalanceSheet, balanceSheet)
             db.session.add(balanceSheet)
             db.session.commit()
         except IntegrityError as ie:
@@ -128,3 +133,36 @@ balance_sheet.add_url_rule('/<stock_id>',
                   view_func=handleBalanceSheet.as_view(
                       'handleBalanceSheet'),
                   methods=['GET', 'POST'])
+
+
+class handleBalanceSheetBatch(MethodView):
+    decorators = [api_auth_required]
+    """
+    Description:
+        this api is used to create or replace many balance sheets at once.
+    Detail:
+        Accepts a JSON array of balance sheets in the handleBalanceSheet POST format,
+        each with its stock_id. Rows whose content digest is unchanged are
+        skipped, the rest are upserted in one transaction.
+    Return:
+        http status 200 with the status of every item
+        (created, updated, unchanged, duplicate, invalid or failed).
+    """
+
+    def post(self):
+        try:
+            payload = request.get_json()
+        except Exception:
+            return jsonify({"error": "Invalid JSON format"}), 400
+        if not isinstance(payload, list) or not payload:
+            return jsonify({"error": "Request body must be a non-empty array of balance sheets"}), 400
+
+        results = balance_sheet_services.bulk_upsert_statements(payload)
+
+        return jsonify({'results': results, 'summary': summarize_results(results)}), 200
+
+
+balance_sheet.add_url_rule('/batch',
+                  view_func=handleBalanceSheetBatch.as_view(
+                      'handleBalanceSheetBatch'),
+                  methods=['POST'])
@@ -8,6 +8,7 @@ from sqlalchemy.exc import IntegrityError
 
 from ..database_setup import BasicInformation
 from ..utils.stock_search_count_service import StockSearchCountService
+from ..utils.autocomplete_index import autocomplete_index
 from .. import db
 from . import basic_information
 from .serializer import BasicInformationDetailSchema
@@ -110,6 +111,7 @@ class handleBasicInfo(MethodView):
             return jsonify({"error": "Failed to update %s Basic Info" % stock_id}), 400
 
         stock_search_count_service.create_stock_search_count(stock_id)
+        autocomplete_index.refresh_stocks([stock_id])
 
         return jsonify({"message": "Created"}), 201
 
@@ -133,6 +135,7 @@ class handleBasicInfo(MethodView):
                 basicInfo['exchange_type'] = payload['exchangeType']
                 db.session.add(basicInfo)
                 db.session.commit()
+                autocomplete_index.refresh_stocks([stock_id])
                 return jsonify({"message": "OK"}), 200
             else:
                 return jsonify({"error": "No such stock id"}), 404
@@ -7,9 +7,13 @@ import json
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from app.log_config import get_logger
+from app.decorators.auth import api_auth_required
+from ..utils.financial_statement_services import FinancialStatementServices, statement_digest
+from ..utils.bulk_operations import summarize_results
 
 
 logger = get_logger(__name__)
+cash_flow_services = FinancialStatementServices(CashFlow)
 
 
 class handleCashFlow(MethodView):
@@ -107,6 +111,7 @@ class handleCashFlow(MethodView):
                 for key in payload:
                     cashFlow[key] = payload[key]
 
+            cashFlow['content_digest'] = statement_digest(CashFlow, cashFlow)
             db.session.add(cashFlow)
             db.session.commit()
         except IntegrityError as ie:
@@ -129,3 +134,36 @@ cash_flow.add_url_rule('/<stock_id>',
                   view_func=handleCashFlow.as_view(
                       'handleCashFlow'),
                   methods=['GET', 'POST'])
+
+
+class handleCashFlowBatch(MethodView):
+    decorators = [api_auth_required]
+    """
+    Description:
+        this api is used to create or replace many cash flows at once.
+    Detail:
+        Accepts a JSON array of cash flows in the handleCashFlow POST format,
+        each with its stock_id. Rows whose content digest is unchanged are
+        skipped, the rest are upserted in one transaction.
+    Return:
+        http status 200 with the status of every item
+        (created, updated, unchanged, duplicate, invalid or failed).
+    """
+
+    def post(self):
+        try:
+            payload = request.get_json()
+        except Exception:
+            return jsonify({"error": "Invalid JSON format"}), 400
+        if not isinstance(payload, list) or not payload:
+            return jsonify({"error": "Request body must be a non-empty array of cash flows"}), 400
+
+        results = cash_flow_services.bulk_upsert_statements(payload)
+
+        return jsonify({'results': results, 'summary': summarize_results(results)}), 200
+
+
+cash_flow.add_url_rule('/batch',
+                  view_func=handleCashFlowBatch.as_view(
+                      'handleCashFlowBatch'),
+                  methods=['POST'])
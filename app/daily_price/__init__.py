@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+daily_price = Blueprint('daily_price', __name__)
+
+from . import view
@@ -0,0 +1,201 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, text
+
+from app.log_config import get_logger
+from .. import db
+from ..database_setup import BasicInformation
+from ..monthly_valuation.models import MonthlyValuation
+from ..monthly_valuation.monthly_valuation_services import MonthlyValuationService
+from ..utils.bulk_operations import bulk_upsert
+from ..utils.data_update_date_service import DataUpdateDateService, FUNDAMENTALS_VERSION
+from .models import DailyPrice
+
+
+logger = get_logger(__name__)
+
+# Years past the current one that keep a partition of their own
+PARTITION_YEARS_AHEAD = 1
+
+# (month, day) the market is closed on every year. Lunar holidays move, so
+# history starting right after one is treated as a partial month.
+FIXED_MARKET_HOLIDAYS = {(1, 1)}
+
+
+class DailyPriceService():
+
+    def __init__(self):
+        pass
+
+    def append_daily_prices(self, rows) -> int:
+        """
+        Bulk upsert daily prices keyed by (stock_id, trade_date), so resending
+        a day overwrites it. The caller owns the transaction.
+
+        Args:
+            rows: List of dicts with stock_id, trade_date and any of
+                  DailyPrice.PRICE_FIELDS
+
+        Returns:
+            int: Number of rows written
+        """
+        rows = [
+            dict({field: row.get(field) for field in DailyPrice.PRICE_FIELDS},
+                 stock_id=row['stock_id'], trade_date=row['trade_date'])
+            for row in rows
+        ]
+        return bulk_upsert(DailyPrice, rows, ['stock_id', 'trade_date'], DailyPrice.PRICE_FIELDS)
+
+    def get_price_history(self, stock_ids, start, end) -> dict:
+        """
+        Read the daily prices of stock_ids between start and end (inclusive)
+        with one query.
+
+        Returns:
+            dict: {stock_id: {'trade_date': [...], '收盤價': [...], '漲跌': [...], '成交量': [...]}}
+                  with the arrays in date order, trade_date as ISO strings
+        """
+        history = {}
+        rows = db.session.query(
+            DailyPrice.stock_id, DailyPrice.trade_date,
+            *[getattr(DailyPrice, field) for field in DailyPrice.PRICE_FIELDS]
+        ).filter(
+            DailyPrice.stock_id.in_(list(stock_ids)),
+            DailyPrice.trade_date.between(start, end)
+        ).order_by(DailyPrice.stock_id, DailyPrice.trade_date)
+
+        for row in rows:
+            columns = history.get(row.stock_id)
+            if columns is None:
+                columns = history[row.stock_id] = {
+                    field: [] for field in ['trade_date'] + DailyPrice.PRICE_FIELDS}
+            columns['trade_date'].append(row.trade_date.isoformat())
+            for field in DailyPrice.PRICE_FIELDS:
+                columns[field].append(getattr(row, field))
+        return history
+
+    def calculate_monthly_average_prices(self, start, end, stock_ids=None) -> list:
+        """
+        Average 收盤價 per stock and calendar month between start and end
+        with one grouped query.
+
+        Returns:
+            list: [{'stock_id', 'year', 'month', '均價'}]
+        """
+        year = func.extract('year', DailyPrice.trade_date)
+        month = func.extract('month', DailyPrice.trade_date)
+        query = db.session.query(
+            DailyPrice.stock_id, year.label('year'), month.label('month'),
+            func.avg(DailyPrice.收盤價).label('average')
+        ).join(  # MonthlyValuation references basic_information, daily_price does not
+            BasicInformation, BasicInformation.id == DailyPrice.stock_id
+        ).filter(
+            DailyPrice.trade_date.between(start, end),
+            DailyPrice.收盤價.isnot(None)
+        )
+        if stock_ids is not None:
+            query = query.filter(DailyPrice.stock_id.in_(list(stock_ids)))
+
+        return [
+            {'stock_id': row.stock_id, 'year': int(row.year), 'month': str(int(row.month)),
+             '均價': round(float(row.average), 2)}
+            for row in query.group_by(DailyPrice.stock_id, year, month)
+        ]
+
+    def rollup_monthly_average_prices(self, start, end, stock_ids=None) -> int:
+        """
+        Derive MonthlyValuation.均價 from the daily prices between start and
+        end and rebuild the valuation statistics of the affected stocks.
+
+        Only whole months should be passed, a partial month is averaged
+        over the days it covers.
+
+        Returns:
+            int: Number of MonthlyValuation rows written
+        """
+        rows = [
+            dict(row, create_time=datetime.utcnow())
+            for row in self.calculate_monthly_average_prices(start, end, stock_ids)
+        ]
+        count = bulk_upsert(MonthlyValuation, rows, ['stock_id', 'year', 'month'], ['均價'])
+        DataUpdateDateService().bump_data_versions([row['stock_id'] for row in rows], FUNDAMENTALS_VERSION)
+        db.session.commit()
+
+        if rows:
+            MonthlyValuationService().rebuild_valuation_statistics(sorted({row['stock_id'] for row in rows}))
+        logger.info(f'Rolled up {count} monthly average prices between {start} and {end}')
+        return count
+
+    def prune_daily_prices(self, keep_years) -> int:
+        """
+        Drop daily prices older than the last keep_years calendar years,
+        including the current one, after rolling them up into monthly
+        averages. The month history starts in is left out of the rollup
+        unless no trading day precedes the oldest price in it, so a partial
+        month never replaces the crawled 均價.
+
+        MySQL drops the yearly partitions and adds the ones for the coming
+        years, other databases delete the rows.
+
+        Returns:
+            int: Number of years removed on MySQL, rows removed otherwise
+        """
+        first_kept_year = date.today().year - keep_years + 1
+        cutoff = date(first_kept_year, 1, 1)
+        oldest = db.session.query(func.min(DailyPrice.trade_date)).scalar()
+        if oldest is not None and oldest < cutoff:
+            first_whole_month = self._first_whole_month(oldest)
+            if first_whole_month < cutoff:
+                self.rollup_monthly_average_prices(first_whole_month, date(first_kept_year - 1, 12, 31))
+
+        if db.engine.dialect.name in ('mysql', 'mariadb'):
+            removed = self._drop_year_partitions(first_kept_year)
+            self.ensure_year_partitions()
+            return removed
+
+        removed = DailyPrice.query.filter(DailyPrice.trade_date < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+
+    @staticmethod
+    def _first_whole_month(oldest) -> date:
+        """First day of the earliest month fully covered by history starting at oldest."""
+        month_start = oldest.replace(day=1)
+        leading_days = (month_start + timedelta(days=offset) for offset in range(oldest.day - 1))
+        if all(day.weekday() >= 5 or (day.month, day.day) in FIXED_MARKET_HOLIDAYS for day in leading_days):
+            return month_start
+        return date(oldest.year + oldest.month // 12, oldest.month % 12 + 1, 1)
+
+    def ensure_year_partitions(self, years_ahead=PARTITION_YEARS_AHEAD):
+        """Split the catch-all partition so every year up to years_ahead has its own (MySQL only)."""
+        if db.engine.dialect.name not in ('mysql', 'mariadb'):
+            return
+        existing = self._year_partitions()
+        missing = [
+            year for year in range(max(existing, default=date.today().year - 1) + 1,
+                                   date.today().year + years_ahead + 1)
+        ]
+        if not missing:
+            return
+        partitions = ', '.join(f'PARTITION p{year} VALUES LESS THAN ({year + 1})' for year in missing)
+        db.session.execute(text(
+            f'ALTER TABLE daily_price REORGANIZE PARTITION pmax INTO '
+            f'({partitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)'
+        ))
+        db.session.commit()
+
+    def _drop_year_partitions(self, first_kept_year) -> int:
+        old = [year for year in self._year_partitions() if year < first_kept_year]
+        if old:
+            db.session.execute(text(
+                'ALTER TABLE daily_price DROP PARTITION ' + ', '.join(f'p{year}' for year in old)))
+            db.session.commit()
+        return len(old)
+
+    @staticmethod
+    def _year_partitions() -> list:
+        names = db.session.execute(text("""
+            SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'daily_price'
+        """)).scalars()
+        return sorted(int(name[1:]) for name in names if name and name[1:].isdigit())
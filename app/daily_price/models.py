@@ -0,0 +1,29 @@
+from .. import db
+
+
+class DailyPrice(db.Model):
+    """
+    Daily close of a stock, appended from the end-of-day snapshot.
+
+    On MySQL the table is partitioned by YEAR(trade_date) (see the
+    create_daily_price migration), which rules out a foreign key to
+    basic_information and lets retention drop whole years at once.
+    """
+    __tablename__ = 'daily_price'
+
+    PRICE_FIELDS = ['收盤價', '漲跌', '成交量']
+
+    stock_id = db.Column(db.String(6), primary_key=True, nullable=False)
+    trade_date = db.Column(db.Date, primary_key=True, nullable=False)
+    收盤價 = db.Column(db.Float)
+    漲跌 = db.Column(db.Float)
+    成交量 = db.Column(db.BigInteger)
+
+    def __repr__(self):
+        return f'DailyPrice({self.stock_id}, {self.trade_date})'
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta
+
+from flask import request, jsonify
+from flask.views import MethodView
+
+from app.log_config import get_logger
+from app.decorators.auth import api_auth_required
+from .daily_price_services import DailyPriceService
+from . import daily_price
+
+logger = get_logger(__name__)
+
+daily_price_service = DailyPriceService()
+
+MAX_STOCKS = 50
+DEFAULT_DAYS = 365
+
+
+class DailyPriceListApi(MethodView):
+    decorators = [api_auth_required]
+
+    def get(self):
+        """
+        Daily price history in columnar form
+        Query parameters:
+        - stocks: comma separated stock ids, at most MAX_STOCKS
+        - start_date: first trade date (format: YYYY-MM-DD), default DEFAULT_DAYS before end_date
+        - end_date: last trade date (format: YYYY-MM-DD), default today
+        """
+        stock_ids = [stock for stock in request.args.get('stocks', '', type=str).split(',') if stock]
+        if not stock_ids or len(stock_ids) > MAX_STOCKS or any(len(stock) > 10 for stock in stock_ids):
+            return jsonify({"error": f"Invalid stocks parameter. Must be 1 to {MAX_STOCKS} stock ids"}), 400
+
+        try:
+            end_date = self._parse_date('end_date', date.today())
+            start_date = self._parse_date('start_date', end_date - timedelta(days=DEFAULT_DAYS))
+        except ValueError as ex:
+            return jsonify({"error": f"Invalid {ex} format. Use YYYY-MM-DD"}), 400
+        if start_date > end_date:
+            return jsonify({"error": "start_date must not be after end_date"}), 400
+
+        return jsonify(daily_price_service.get_price_history(stock_ids, start_date, end_date))
+
+    @staticmethod
+    def _parse_date(name, default):
+        value = request.args.get(name, None)
+        if not value:
+            return default
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError(name)
+
+
+daily_price.add_url_rule('',
+    view_func=DailyPriceListApi.as_view(
+        'daily_price_list_api'), methods=['GET'])
@@ -1,7 +1,7 @@
 from datetime import time
 
 from . import db
-from .utils.model_utilities import get_current_date
+from .utils.model_utilities import get_current_date, calculate_quantile
 
 # db.Index('revenue_idx_stock', MonthRevenue.stock_id)
 
@@ -126,9 +126,22 @@ class BasicInformation(db.Model):
             IncomeSheet.season.desc()
         ).first()
 
+    def get_valuation_statistics(self):
+        """Get the precomputed valuation statistics row for this stock."""
+        from app.monthly_valuation.models import MonthlyValuationStatistics
+
+        return db.session.get(MonthlyValuationStatistics, self.id)
+
     def get_average_monthly_price(self, months: int = 6) -> float:
         """Get the average monthly price for this stock."""
-        from app.monthly_valuation.models import MonthlyValuation
+        from app.monthly_valuation.models import MonthlyValuation, MonthlyValuationStatistics
+
+        statistics_field = MonthlyValuationStatistics.AVERAGE_PRICE_FIELDS.get(months)
+        if statistics_field:
+            statistics = self.get_valuation_statistics()
+            if statistics is not None:
+                value = statistics[statistics_field]
+                return float(value) if value is not None else None
 
         monthly_valuations = MonthlyValuation.query.filter_by(stock_id=self.id).order_by(
             MonthlyValuation.year.desc(),
@@ -143,7 +156,14 @@ class BasicInformation(db.Model):
 
     def get_pe_quantile(self, quantile: float = 0.5, years: int = 5) -> float:
         """Get the P/E ratio for this stock."""
-        from app.monthly_valuation.models import MonthlyValuation
+        from app.monthly_valuation.models import MonthlyValuation, MonthlyValuationStatistics
+
+        statistics_field = MonthlyValuationStatistics.PE_QUANTILE_FIELDS.get(quantile)
+        if statistics_field and years == MonthlyValuationStatistics.PE_YEARS:
+            statistics = self.get_valuation_statistics()
+            if statistics is not None:
+                value = statistics[statistics_field]
+                return float(value) if value is not None else None
 
         monthly_valuation = MonthlyValuation.query.filter_by(stock_id=self.id).order_by(
             MonthlyValuation.year.desc(),
@@ -151,17 +171,7 @@ class BasicInformation(db.Model):
         ).limit(years * 12).all()
         pe_list = [float(row.本益比) for row in monthly_valuation if row.本益比 is not None]
 
-        if not pe_list:
-            return None
-
-        pe_list.sort()
-        n = len(pe_list)
-        idx = quantile * (n - 1)
-        lower = int(idx)
-        upper = min(lower + 1, n - 1)
-        weight = idx - lower
-        quantile_value = pe_list[lower] * (1 - weight) + pe_list[upper] * weight
-        return round(quantile_value, 2)
+        return calculate_quantile(pe_list, quantile)
 
 
 # db.Index('basic_infomation_name_idx', BasicInformation.公司簡稱)
@@ -170,6 +180,9 @@ class BasicInformation(db.Model):
 # done
 class BalanceSheet(db.Model):
     __tablename__ = 'balance_sheet'
+    __table_args__ = (
+        db.UniqueConstraint('stock_id', 'year', 'season', name='uix_balance_sheet_stock_year_season'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     update_date = db.Column(
@@ -215,13 +228,15 @@ class BalanceSheet(db.Model):
     歸屬於母公司業主之權益 = db.Column(db.BigInteger)
     權益總計 = db.Column(db.BigInteger)
     負債及權益總計 = db.Column(db.BigInteger)
+    # sha1 of the value columns, maintained on every write
+    content_digest = db.Column(db.String(40))
 
     # Add add a decorator property to serialize data from the datadb.Model
     @property
     def serialize(self):
         res = {}
         for attr, val in self.__dict__.items():
-            if attr == '_sa_instance_state':
+            if attr in ('_sa_instance_state', 'content_digest'):
                 continue
             res[attr] = val
         return res
@@ -236,6 +251,9 @@ class BalanceSheet(db.Model):
 # prototype done
 class CashFlow(db.Model):
     __tablename__ = 'cashflow'
+    __table_args__ = (
+        db.UniqueConstraint('stock_id', 'year', 'season', name='uix_cashflow_stock_year_season'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     update_date = db.Column(
@@ -270,13 +288,15 @@ class CashFlow(db.Model):
     期初現金及約當現金餘額 = db.Column(db.BigInteger)
     期末現金及約當現金餘額 = db.Column(db.BigInteger)
     本期現金及約當現金增加減少數 = db.Column(db.BigInteger)
+    # sha1 of the value columns, maintained on every write
+    content_digest = db.Column(db.String(40))
 
     # Add add a decorator property to serialize data from the datadb.Model
     @property
     def serialize(self):
         res = {}
         for attr, val in self.__dict__.items():
-            if attr == '_sa_instance_state':
+            if attr in ('_sa_instance_state', 'content_digest'):
                 continue
             res[attr] = val
         return res
@@ -413,6 +433,8 @@ class DailyInformation(db.Model):
     本益比 = db.Column(db.Numeric(13, 2))
     殖利率 = db.Column(db.Float)
     股價淨值比 = db.Column(db.Float)
+    近四季營業收入合計 = db.Column(db.BigInteger)
+    近四季本期淨利 = db.Column(db.BigInteger)
 
     # Add add a decorator property to serialize data from the datadb.Model
     @property
@@ -468,6 +490,9 @@ class DataUpdateDate(db.Model):
     news_last_update = db.Column(db.Date, nullable=True)
     income_sheet_last_update = db.Column(db.Date, nullable=True)
     earnings_call_last_update = db.Column(db.Date, nullable=True)
+    # Tokens replaced on every write, used as HTTP validators (see app.decorators.conditional)
+    fundamentals_version = db.Column(db.String(32), nullable=True)
+    daily_info_version = db.Column(db.String(32), nullable=True)
 
 
 class PushNotification(db.Model):
@@ -6,6 +6,7 @@ from .auth import (
     api_auth_required,
     api_auth_or_jwt_required,
 )
+from .conditional import conditional_on_data_versions
 
 
 __all__ = [
@@ -15,4 +16,5 @@ __all__ = [
     'permission_required',
     'api_auth_required',
     'api_auth_or_jwt_required',
+    'conditional_on_data_versions',
 ]
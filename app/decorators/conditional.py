@@ -0,0 +1,102 @@
+import hashlib
+from datetime import date
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import g, request, make_response
+
+from app import db
+from app.database_setup import DataUpdateDate
+
+
+# Let clients store responses but revalidate them on every use
+CACHE_CONTROL = 'private, no-cache'
+
+
+def data_version_etag(stock_id, version_columns):
+    """
+    ETag of the current GET request for the data versions of stock_id,
+    read with a single primary key lookup on data_update_date.
+
+    The path, query string and current year are part of the ETag, so every
+    parameter combination gets its own validator and windows like "the
+    last five years" move on at the turn of the year.
+
+    Args:
+        stock_id: Stock the response is about
+        version_columns: DataUpdateDate version columns the response depends on
+
+    Returns:
+        str: The ETag, None when the stock has no version yet
+    """
+    if not version_columns:
+        return None
+    versions = db.session.query(
+        *[getattr(DataUpdateDate, column) for column in version_columns]
+    ).filter(DataUpdateDate.stock_id == stock_id).one_or_none()
+    if versions is None or None in versions:
+        return None
+
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return hashlib.sha1(
+        '\n'.join([request.path, query, str(date.today().year), *versions]).encode('utf-8')
+    ).hexdigest()
+
+
+def not_modified_response(etag):
+    """Return a 304 response when If-None-Match matches etag, otherwise None."""
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response('', 304)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def add_etag(response, etag):
+    """Attach etag to a successful response."""
+    if etag is not None and response.status_code == 200:
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def conditional_on_data_versions(*version_columns, get_stock_id=None):
+    """
+    Decorator adding ETag and If-None-Match support to a GET view whose
+    response only depends on the given DataUpdateDate version columns of
+    one stock. Other methods pass straight through.
+
+    Writers bump the versions with DataUpdateDateService.bump_data_versions,
+    so a matching request returns 304 without running the view. The ETag is
+    also left in g.data_version_etag for cached_chart.
+
+    Usage:
+        @jwt_required()
+        @conditional_on_data_versions(FUNDAMENTALS_VERSION)
+        def get_chart(stock_id):
+            ...
+
+    Apply it inside the authentication decorator, and before
+    api_auth_required in MethodView.decorators.
+
+    Args:
+        *version_columns: FUNDAMENTALS_VERSION and/or DAILY_INFO_VERSION
+        get_stock_id: Callable returning the stock id from the view kwargs,
+                      defaults to the stock_id URL parameter
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return fn(*args, **kwargs)
+
+            stock_id = get_stock_id(kwargs) if get_stock_id else kwargs.get('stock_id')
+            etag = data_version_etag(stock_id, version_columns) if stock_id else None
+            g.data_version_etag = etag
+            response = not_modified_response(etag)
+            if response is not None:
+                return response
+            return add_etag(make_response(fn(*args, **kwargs)), etag)
+        return wrapper
+    return decorator
@@ -3,6 +3,7 @@ from app.log_config import get_logger
 from .models import EarningsCall
 from .. import db
 from ..models import Feed
+from ..services.feed_services import FeedServices
 from ..utils.data_update_date_service import DataUpdateDateService
 from ..ai_report.models import AiReport
 
@@ -212,7 +213,7 @@ class EarningsCallService():
         from sqlalchemy import or_
         end_date = meeting_date + timedelta(days=days_after)
 
-        query = Feed.query.filter(
+        query = FeedServices.get_feed_list_query().filter(
             Feed.stock_id == stock_id,
             Feed.releaseTime >= meeting_date,
             Feed.releaseTime <= end_date,
@@ -11,6 +11,7 @@ from .serializer import EarningsCallchema
 from .earnings_call_services import EarningsCallService
 from app.decorators.auth import api_auth_required
 from app.ai_report.models import AiReport
+from app.services.feed_services import FeedServices
 
 logger = get_logger(__name__)
 earnings_call_service = EarningsCallService()
@@ -155,8 +156,6 @@ class EarningsCallFeedsApi(MethodView):
 
     @api_auth_required
     def get(self, earnings_call_id):
-        from app.schemas.feed_schema import FeedSchema
-
         earnings_call = earnings_call_service.get_earnings_call(earnings_call_id)
         if not earnings_call:
             return jsonify({"error": "Earnings call not found"}), 404
@@ -177,7 +176,7 @@ class EarningsCallFeedsApi(MethodView):
             "stock_id": earnings_call.stock_id,
             "meeting_date": earnings_call.meeting_date.isoformat(),
             "feeds_count": len(feeds),
-            "feeds": FeedSchema(many=True).dump(feeds)
+            "feeds": FeedServices.serialize_feed_rows(feeds)
         })
 
 
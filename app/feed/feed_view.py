@@ -4,19 +4,20 @@ from datetime import datetime, timedelta, date
 
 from flask import request, jsonify, Response
 from flask.views import MethodView
+from sqlalchemy.orm import joinedload, lazyload, load_only
 
 
 from .. import db
 from . import feed
 
 from app.services.feed_services import FeedServices
-from app.models import AnnouncementIncomeSheetAnalysis
+from app.models import AnnouncementIncomeSheetAnalysis, Feed
 from app.schemas.announcement_income_sheet_analysis_schema import AnnouncementIncomeSheetAnalysisSchema
-from app.schemas.feed_schema import FeedSchema
 from app.database_setup import BasicInformation
 
 from app.utils.model_utilities import get_current_date
 from app.utils.announcement_handler import AnnounceHandler
+from app.utils.bulk_operations import summarize_results
 from app.decorators.auth import api_auth_required
 
 
@@ -24,10 +25,19 @@ logger = get_logger(__name__)
 feed_services = FeedServices()
 
 
+def is_financial_report_announcement(feed) -> bool:
+    return bool(
+        feed.feedType == 'announcement' and
+        re.search(r'財報|財務報', feed.title) and
+        not re.search(r'日期|子公司|附註|淨值百分|iXBRL|比率|說明會|附表', feed.title)
+    )
+
+
 @feed.route('/<stock_id>', methods=['GET'])
 def get_stock_feed(stock_id) -> Response:
-    page = request.args.get('page', default=1, type=int)
     page_size = min(request.args.get('page_size', default=15, type=int), 50)
+    if page_size < 1:
+        return jsonify({"error": "page_size must be at least 1"}), 400
     start_date_str = request.args.get('start_date', default=None)
     start_date = None
     if start_date_str:
@@ -36,9 +46,29 @@ def get_stock_feed(stock_id) -> Response:
         except ValueError:
             return jsonify({"error": "Invalid start_date format. Use YYYY-MM-DD"}), 400
     sources = request.args.getlist('source') or None
+
+    # Cursor pagination is opt-in: mode=cursor for the first page, cursor for the next ones
+    if request.args.get('mode') == 'cursor' or 'cursor' in request.args:
+        try:
+            feed_page = feed_services.get_feeds_page_by_stock(
+                stock_id, request.args.get('cursor'), page_size, start_date, sources,
+                with_total=request.args.get('include_total', '').lower() == 'true'
+            )
+        except ValueError as ex:
+            return jsonify({"error": str(ex)}), 400
+        response = {
+            'feeds': feed_services.serialize_feed_rows(feed_page.items),
+            'next_cursor': feed_page.next_cursor,
+            'has_next': feed_page.has_next,
+        }
+        if feed_page.total is not None:
+            response['total'] = feed_page.total
+        return jsonify(response), 200
+
+    page = request.args.get('page', default=1, type=int)
     pagination = feed_services.get_feeds_by_stock(stock_id, page, page_size, start_date, sources)
     return jsonify({
-        'feeds': FeedSchema(many=True).dump(pagination.items),
+        'feeds': feed_services.serialize_feed_rows(pagination.items),
         'total': pagination.total,
         'page': pagination.page,
         'pages': pagination.pages,
@@ -93,16 +123,9 @@ class HandleFeed(MethodView):
         else:
             end_time = datetime.now()
 
-        feeds = feed_services.get_feeds_by_time_range(start_time, end_time)
-        results = FeedSchema(many=True).dump(feeds)
-
-        stock_ids = {r['stock_id'] for r in results if r.get('stock_id')}
-        name_map = {
-            b.id: getattr(b, '公司簡稱', None)
-            for b in BasicInformation.query.filter(BasicInformation.id.in_(stock_ids)).all()
-        }
-        for r in results:
-            r['company_name'] = name_map.get(r.get('stock_id'))
+        feeds = feed_services.get_feeds_by_time_range(
+            start_time, end_time, company_name_column=BasicInformation.公司簡稱)
+        results = feed_services.serialize_feed_rows(feeds)
 
         return jsonify(results), 200
 
@@ -117,11 +140,7 @@ class HandleFeed(MethodView):
         try:
             feed = feed_services.create_feed(feed_data)
 
-            if (
-                feed.feedType == 'announcement' and
-                re.search(r'財報|財務報', feed.title) and
-                not re.search(r'日期|子公司|附註|淨值百分|iXBRL|比率|說明會|附表', feed.title)
-            ):
+            if is_financial_report_announcement(feed):
                 announcement_income_sheet_analysis = feed.create_default_announcement_income_sheet_analysis()
                 announcement_income_sheet_analysis.analysis_announcement_income_sheet()
 
@@ -138,6 +157,50 @@ feed.add_url_rule('',
                   methods=['GET', 'POST'])
 
 
+class HandleFeedBatch(MethodView):
+    decorators = [api_auth_required]
+    """
+    Description:
+        this api is used to create or update many Feeds in one request.
+    Detail:
+        Accepts a JSON array of feeds in the HandleFeed POST format and
+        upserts them in a single transaction. Financial report
+        announcements are sent for income sheet analysis as in HandleFeed.
+    Return:
+        http status 200 with the status of every item
+        (created, updated, duplicate, invalid or failed).
+    """
+
+    def post(self) -> Response:
+        try:
+            feeds_data = request.get_json()
+        except Exception:
+            return jsonify({"error": "Invalid JSON format"}), 400
+        if not isinstance(feeds_data, list) or not feeds_data:
+            return jsonify({"error": "Request body must be a non-empty array of feeds"}), 400
+
+        results = feed_services.create_feeds(feeds_data)
+
+        feed_ids = [r['feed_id'] for r in results if r['status'] in ('created', 'updated')]
+        if feed_ids:
+            for saved_feed in Feed.query.filter(Feed.id.in_(feed_ids)).all():
+                if not is_financial_report_announcement(saved_feed):
+                    continue
+                try:
+                    announcement_income_sheet_analysis = saved_feed.create_default_announcement_income_sheet_analysis()
+                    announcement_income_sheet_analysis.analysis_announcement_income_sheet()
+                except Exception as ex:
+                    logger.exception(ex)
+
+        return jsonify({'results': results, 'summary': summarize_results(results)}), 200
+
+
+feed.add_url_rule('/batch',
+                  view_func=HandleFeedBatch.as_view(
+                      'handleFeedBatch'),
+                  methods=['POST'])
+
+
 class AnnouncementIncomeSheetAnalysisListApi(MethodView):
     def get(self) -> Response:
         update_date = request.args.get('update_date')
@@ -148,21 +211,24 @@ class AnnouncementIncomeSheetAnalysisListApi(MethodView):
         processing_failed = request.args.get('processing_failed')
         announcement_income_sheet_analysis_schema = AnnouncementIncomeSheetAnalysisSchema(many=True)
 
-        queries = AnnouncementIncomeSheetAnalysis.query.filter_by(update_date=update_date)
+        # Join only the short company name instead of a second BasicInformation query
+        queries = db.session.query(
+            AnnouncementIncomeSheetAnalysis, BasicInformation.公司簡稱
+        ).outerjoin(
+            BasicInformation, BasicInformation.id == AnnouncementIncomeSheetAnalysis.stock_id
+        ).options(
+            # The schema only nests feed title and link, skip Feed's joined stock and tags
+            joinedload(AnnouncementIncomeSheetAnalysis.feed).options(
+                load_only(Feed.title, Feed.link), lazyload(Feed.stock), lazyload(Feed.tags))
+        ).filter(AnnouncementIncomeSheetAnalysis.update_date == update_date)
         if processing_failed is not None:
             processing_failed = processing_failed.lower() == 'true'
-            queries = queries.filter_by(processing_failed=processing_failed)
-
-        announcement_income_sheet_analysis = queries.all()
-        results = announcement_income_sheet_analysis_schema.dump(announcement_income_sheet_analysis)
+            queries = queries.filter(AnnouncementIncomeSheetAnalysis.processing_failed == processing_failed)
 
-        stock_ids = {r['stock_id'] for r in results if r.get('stock_id')}
-        name_map = {
-            b.id: getattr(b, '公司簡稱', None)
-            for b in BasicInformation.query.filter(BasicInformation.id.in_(stock_ids)).all()
-        }
-        for r in results:
-            r['company_name'] = name_map.get(r.get('stock_id'))
+        rows = queries.all()
+        results = announcement_income_sheet_analysis_schema.dump([row[0] for row in rows])
+        for r, row in zip(results, rows):
+            r['company_name'] = row[1]
 
         return jsonify(results), 200
 
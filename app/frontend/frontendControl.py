@@ -1,7 +1,6 @@
 from app.log_config import get_logger
 import json
 import pytz
-import re
 from datetime import datetime, timedelta
 
 from flask import request, jsonify, make_response
@@ -9,18 +8,42 @@ from sqlalchemy.sql import func
 from flask_jwt_extended import jwt_required
 
 from app.utils.jwt_utils import get_current_user
+from app.decorators.conditional import (
+    conditional_on_data_versions, data_version_etag, not_modified_response, add_etag
+)
 from . import frontend
 from app import db
 from app.database_setup import (
     BasicInformation, MonthRevenue, IncomeSheet,
-    DailyInformation, StockCommodity, StockSearchCounts
+    DailyInformation, StockCommodity
 )
 from app.models import Feed
-from app.schemas.feed_schema import FeedSchema
+from app.services.feed_services import FeedServices
 from app.utils.stock_search_count_service import StockSearchCountService
+from app.utils.autocomplete_index import autocomplete_index
+from app.utils.data_update_date_service import FUNDAMENTALS_VERSION, DAILY_INFO_VERSION
+from app.utils.chart_cache import chart_cache, cached_chart
+from app.utils.keyset_pagination import paginate_by_keyset
 
 logger = get_logger(__name__)
 stock_search_count_service = StockSearchCountService()
+feed_services = FeedServices()
+
+# IncomeSheet columns of each stock page chart, shared by the single chart
+# endpoints and stock_dashboard
+INCOME_SHEET_CHART_COLUMNS = {
+    'eps': ['基本每股盈餘'],
+    'income_sheet': ['營業收入合計', '營業毛利', '營業利益', '稅前淨利', '本期淨利', '母公司業主淨利'],
+    'profit_analysis': ['營業毛利率', '營業利益率', '稅前淨利率', '本期淨利率'],
+    'op_expense_analysis': [
+        '營業費用率', '推銷費用率', '管理費用率', '研究發展費用率',
+        '營業費用', '推銷費用', '管理費用', '研究發展費用'
+    ],
+}
+DAILY_INFO_COLUMNS = ['本日收盤價', '本日漲跌', '本益比', '近四季每股盈餘', '殖利率', '股價淨值比']
+STOCK_COMMODITY_COLUMNS = ['stock_future', 'stock_option', 'small_stock_future']
+MONTH_REVENUE_CHART_COLUMNS = ['當月營收', '去年同月增減', '上月比較增減', '備註']
+DASHBOARD_SECTIONS = ['stock_info_commodity', 'daily_info', 'month_revenue'] + list(INCOME_SHEET_CHART_COLUMNS)
 
 
 @frontend.route('/stock_info_commodity/<stock_id>')
@@ -87,28 +110,18 @@ def checkStockExist(stock_id):
 
 @frontend.route('/daily_info/<stock_id>')
 @jwt_required()
+@conditional_on_data_versions(DAILY_INFO_VERSION)
+@cached_chart('daily_info')
 def getFrontEndDailyInfo(stock_id):
     dailyInfo = db.session\
         .query()\
         .with_entities(
-            DailyInformation.本日收盤價,
-            DailyInformation.本日漲跌,
-            DailyInformation.本益比,
-            DailyInformation.近四季每股盈餘,
-            DailyInformation.殖利率,
-            DailyInformation.股價淨值比)\
+            *[getattr(DailyInformation, column) for column in DAILY_INFO_COLUMNS])\
         .filter_by(stock_id=stock_id)\
         .one_or_none()
     if dailyInfo == None:
         res = make_response(
-            json.dumps({
-                "本日收盤價": None,
-                "本日漲跌": None,
-                "本益比": None,
-                "近四季每股盈餘": None,
-                "殖利率": None,
-                "股價淨值比": None
-            })
+            json.dumps({column: None for column in DAILY_INFO_COLUMNS})
         , 404)
         return res
     else:
@@ -118,6 +131,8 @@ def getFrontEndDailyInfo(stock_id):
 
 @frontend.route('/month_revenue/<stock_id>')
 @jwt_required()
+@conditional_on_data_versions(FUNDAMENTALS_VERSION)
+@cached_chart('month_revenue')
 def getFrontEndMonthRevenue(stock_id):
     year = int(request.args.get('year', default=5))
     monthlyReve = db.session\
@@ -141,6 +156,8 @@ def getFrontEndMonthRevenue(stock_id):
 
 @frontend.route('/eps/<stock_id>')
 @jwt_required()
+@conditional_on_data_versions(FUNDAMENTALS_VERSION)
+@cached_chart('eps')
 def getFrontEndEPS(stock_id):
     year = min(int(request.args.get('year', default=5)), 10)
     EPS = db.session\
@@ -149,7 +166,7 @@ def getFrontEndEPS(stock_id):
             func.concat(
                 IncomeSheet.year, 'Q', IncomeSheet.season).label(
                     "Year/Season"),
-            IncomeSheet.基本每股盈餘)\
+            *[getattr(IncomeSheet, column) for column in INCOME_SHEET_CHART_COLUMNS['eps']])\
         .filter_by(stock_id=stock_id)\
         .filter(IncomeSheet.year >= datetime.now().year-year)\
         .order_by(IncomeSheet.year.desc())\
@@ -161,6 +178,8 @@ def getFrontEndEPS(stock_id):
 
 @frontend.route('/income_sheet/<stock_id>')
 @jwt_required()
+@conditional_on_data_versions(FUNDAMENTALS_VERSION)
+@cached_chart('income_sheet')
 def getFrontEndIncomeSheet(stock_id):
     year = min(int(request.args.get('year', default=5)), 10)
     incomeSheet = db.session\
@@ -169,12 +188,7 @@ def getFrontEndIncomeSheet(stock_id):
             func.concat(
                 IncomeSheet.year, 'Q', IncomeSheet.season).label(
                     "Year/Season"),
-            IncomeSheet.營業收入合計,
-            IncomeSheet.營業毛利,
-            IncomeSheet.營業利益,
-            IncomeSheet.稅前淨利,
-            IncomeSheet.本期淨利,
-            IncomeSheet.母公司業主淨利)\
+            *[getattr(IncomeSheet, column) for column in INCOME_SHEET_CHART_COLUMNS['income_sheet']])\
         .filter_by(stock_id=stock_id)\
         .filter(IncomeSheet.year >= datetime.now().year-year)\
         .order_by(IncomeSheet.year.desc())\
@@ -186,6 +200,8 @@ def getFrontEndIncomeSheet(stock_id):
 
 @frontend.route('/profit_analysis/<stock_id>')
 @jwt_required()
+@conditional_on_data_versions(FUNDAMENTALS_VERSION)
+@cached_chart('profit_analysis')
 def getFrontEndProfitAnalysis(stock_id):
     year = min(int(request.args.get('year', default=5)), 10)
     profit = db.session\
@@ -194,10 +210,7 @@ def getFrontEndProfitAnalysis(stock_id):
             func.concat(
                 IncomeSheet.year, 'Q', IncomeSheet.season).label(
                     "Year/Season"),
-            IncomeSheet.營業毛利率,
-            IncomeSheet.營業利益率,
-            IncomeSheet.稅前淨利率,
-            IncomeSheet.本期淨利率)\
+            *[getattr(IncomeSheet, column) for column in INCOME_SHEET_CHART_COLUMNS['profit_analysis']])\
         .filter_by(stock_id=stock_id)\
         .filter(IncomeSheet.year >= datetime.now().year-year)\
         .order_by(IncomeSheet.year.desc())\
@@ -209,6 +222,8 @@ def getFrontEndProfitAnalysis(stock_id):
 
 @frontend.route('/op_expense_analysis/<stock_id>')
 @jwt_required()
+@conditional_on_data_versions(FUNDAMENTALS_VERSION)
+@cached_chart('op_expense_analysis')
 def getFrontEndOperationExpenseAnalysis(stock_id):
     year = min(int(request.args.get('year', default=5)), 10)
     operationExpense = db.session\
@@ -217,14 +232,7 @@ def getFrontEndOperationExpenseAnalysis(stock_id):
             func.concat(
                 IncomeSheet.year, 'Q', IncomeSheet.season).label(
                     "Year/Season"),
-            IncomeSheet.營業費用率,
-            IncomeSheet.推銷費用率,
-            IncomeSheet.管理費用率,
-            IncomeSheet.研究發展費用率,
-            IncomeSheet.營業費用,
-            IncomeSheet.推銷費用,
-            IncomeSheet.管理費用,
-            IncomeSheet.研究發展費用)\
+            *[getattr(IncomeSheet, column) for column in INCOME_SHEET_CHART_COLUMNS['op_expense_analysis']])\
         .filter_by(stock_id=stock_id)\
         .filter(IncomeSheet.year >= datetime.now().year-year)\
         .order_by(IncomeSheet.year.desc())\
@@ -234,27 +242,163 @@ def getFrontEndOperationExpenseAnalysis(stock_id):
     return jsonify(data)
 
 
+@frontend.route('/stock_dashboard/<stock_id>')
+@jwt_required()
+def getFrontEndStockDashboard(stock_id):
+    """
+    Every chart of the stock page in one response, keyed by the name of
+    the single chart endpoint it replaces and in the same format.
+
+    Query parameters:
+    - sections: comma separated subset of DASHBOARD_SECTIONS, default all
+    - year: years of income sheet and month revenue history, default 5, at most 10
+
+    Stock information, commodities and daily information share one query,
+    the IncomeSheet sections share another and month revenue takes a third.
+
+    The ETag combines the fundamentals and daily info versions of the
+    requested sections; stock information and commodities rarely change and
+    are revalidated together with the daily info.
+    """
+    sections = request.args.get('sections', default=None)
+    sections = DASHBOARD_SECTIONS if not sections else [section for section in sections.split(',') if section]
+    unknown = [section for section in sections if section not in DASHBOARD_SECTIONS]
+    if unknown:
+        return jsonify({"error": f"Unknown sections: {', '.join(unknown)}"}), 400
+    try:
+        year = min(int(request.args.get('year', default=5)), 10)
+    except ValueError:
+        return jsonify({"error": "Invalid year parameter"}), 400
+
+    version_columns = []
+    if 'stock_info_commodity' in sections or 'daily_info' in sections:
+        version_columns.append(DAILY_INFO_VERSION)
+    if any(section in sections for section in ['month_revenue', *INCOME_SHEET_CHART_COLUMNS]):
+        version_columns.append(FUNDAMENTALS_VERSION)
+    etag = data_version_etag(stock_id, version_columns)
+    response = not_modified_response(etag)
+    if response is None:
+        response = chart_cache.get_or_compute(
+            'stock_dashboard', etag, lambda: _build_stock_dashboard(stock_id, sections, year))
+    if 'stock_info_commodity' in sections and response.status_code in (200, 304):
+        current_user = get_current_user()
+        stock_search_count_service.increase_stock_search_count(current_user['email'], stock_id)
+    return add_etag(response, etag)
+
+
+def _build_stock_dashboard(stock_id, sections, year):
+    stock = db.session\
+        .query()\
+        .with_entities(
+            BasicInformation.公司簡稱,
+            BasicInformation.產業類別,
+            BasicInformation.exchange_type,
+            *[getattr(StockCommodity, column) for column in STOCK_COMMODITY_COLUMNS],
+            *[getattr(DailyInformation, column) for column in DAILY_INFO_COLUMNS])\
+        .outerjoin(StockCommodity, StockCommodity.stock_id == BasicInformation.id)\
+        .outerjoin(DailyInformation, DailyInformation.stock_id == BasicInformation.id)\
+        .filter(BasicInformation.id == stock_id)\
+        .one_or_none()
+    if stock is None:
+        return make_response(
+            json.dumps("Couldn't find stock: {}".format(stock_id)), 404)
+
+    resData = {}
+    if 'stock_info_commodity' in sections:
+        resData['stock_info_commodity'] = {
+            'stockInformation': {
+                '公司簡稱': stock.公司簡稱,
+                '產業類別': stock.產業類別,
+                'exchange_type': stock.exchange_type
+            },
+            'stockCommodity': {column: bool(getattr(stock, column)) for column in STOCK_COMMODITY_COLUMNS}
+        }
+    if 'daily_info' in sections:
+        resData['daily_info'] = {column: getattr(stock, column) for column in DAILY_INFO_COLUMNS}
+
+    chart_sections = [section for section in INCOME_SHEET_CHART_COLUMNS if section in sections]
+    if chart_sections:
+        columns = list(dict.fromkeys(
+            column for section in chart_sections for column in INCOME_SHEET_CHART_COLUMNS[section]))
+        incomeSheet = db.session\
+            .query()\
+            .with_entities(
+                IncomeSheet.year, IncomeSheet.season,
+                *[getattr(IncomeSheet, column) for column in columns])\
+            .filter_by(stock_id=stock_id)\
+            .filter(IncomeSheet.year >= datetime.now().year-year)\
+            .order_by(IncomeSheet.year)\
+            .order_by(IncomeSheet.season)\
+            .all()
+        for section in chart_sections:
+            resData[section] = [
+                dict({'Year/Season': f'{row.year}Q{row.season}'},
+                     **{column: getattr(row, column) for column in INCOME_SHEET_CHART_COLUMNS[section]})
+                for row in incomeSheet
+            ]
+
+    if 'month_revenue' in sections:
+        monthlyReve = db.session\
+            .query()\
+            .with_entities(
+                MonthRevenue.year, MonthRevenue.month,
+                *[getattr(MonthRevenue, column) for column in MONTH_REVENUE_CHART_COLUMNS])\
+            .filter_by(stock_id=stock_id)\
+            .filter(MonthRevenue.year >= datetime.now().year-year)\
+            .order_by(MonthRevenue.year)\
+            .order_by(MonthRevenue.month)\
+            .all()
+        resData['month_revenue'] = [
+            dict({'Year/Month': f'{row.year}/{row.month}'},
+                 **{column: getattr(row, column) for column in MONTH_REVENUE_CHART_COLUMNS})
+            for row in monthlyReve
+        ]
+
+    return jsonify(resData)
+
+
 @frontend.route('/feed')
 @jwt_required()
 def getMarketFeed():
     target_date = request.args.get('targetDate', default=datetime.now().strftime('%Y-%m-%d'))
     feed_source = request.args.getlist('source')
     page = request.args.get('page', 0)
-    page_size = request.args.get('page_size', 5)
+    page_size = request.args.get('page_size', default=5, type=int)
+    if page_size < 1:
+        return jsonify({"error": "page_size must be at least 1"}), 400
     start_time = datetime.strptime(target_date, '%Y-%m-%d').astimezone(tz=pytz.UTC)
     end_time = datetime.strptime(target_date, '%Y-%m-%d') + timedelta(days=1)
-    feed_query = Feed.query.filter(
+    feed_query = feed_services.get_feed_list_query().filter(
         Feed.releaseTime.between(start_time, end_time)).order_by(
             Feed.releaseTime.desc())
 
     if feed_source:
         feed_query = feed_query.filter(Feed.source.in_(feed_source))
 
+    # Cursor pagination is opt-in: mode=cursor for the first page, cursor for the next ones
+    if request.args.get('mode') == 'cursor' or 'cursor' in request.args:
+        try:
+            feed_page = paginate_by_keyset(
+                feed_query.order_by(None), Feed.releaseTime, Feed.id,
+                request.args.get('cursor'), page_size,
+                with_total=request.args.get('include_total', '').lower() == 'true'
+            )
+        except ValueError as ex:
+            return jsonify({"error": str(ex)}), 400
+        response = {
+            'feeds': feed_services.serialize_feed_rows(feed_page.items),
+            'next_cursor': feed_page.next_cursor,
+            'has_next': feed_page.has_next
+        }
+        if feed_page.total is not None:
+            response['total'] = feed_page.total
+        return jsonify(response)
+
     feeds = feed_query.paginate(
-        page=int(page), per_page=int(page_size), error_out=False)
+        page=int(page), per_page=page_size, error_out=False)
 
     return jsonify({
-        'feeds': FeedSchema(many=True).dump(feeds.items),
+        'feeds': feed_services.serialize_feed_rows(feeds.items),
         'next_page': feeds.next_num,
         'has_next': feeds.has_next
     })
@@ -268,20 +412,7 @@ def getStockAutocomplete():
     if search_stock is None:
         return jsonify({ 'stocks': [] })
 
-    subq = BasicInformation.query.filter(BasicInformation.exchange_type.in_(['sii', 'otc']))
-
-    if re.search("^[0-9]{1,4}$", search_stock):
-        subq = subq.filter(
-            BasicInformation.id.like(f'{search_stock}%'))
-    else:
-        subq = subq.filter(
-            BasicInformation.公司簡稱.like(f'{search_stock}%'))
-
-    subq = subq.with_entities(BasicInformation.id, BasicInformation.公司簡稱).subquery()
-
-    stock_list = StockSearchCounts.query.join(
-        subq, StockSearchCounts.stock_id == subq.c.id).order_by(
-            StockSearchCounts.search_count.desc()).with_entities(subq.c.id, subq.c.公司簡稱).limit(8).all()
+    stock_list = autocomplete_index.search(search_stock)
 
     return jsonify([
         {
@@ -0,0 +1,166 @@
+from sqlalchemy import func
+
+from app.log_config import get_logger
+from .. import db
+from ..database_setup import BasicInformation, DailyInformation, IncomeSheet
+from ..utils.bulk_operations import bulk_upsert, bulk_upsert_records, chunked
+from ..utils.data_update_date_service import DataUpdateDateService, FUNDAMENTALS_VERSION, DAILY_INFO_VERSION
+from ..utils.model_utilities import get_current_date
+from ..utils.screener_cache import screener_cache
+
+
+logger = get_logger(__name__)
+data_update_date_service = DataUpdateDateService()
+
+INCOME_SHEET_KEY_COLUMNS = ['stock_id', 'year', 'season']
+INCOME_SHEET_VALUE_COLUMNS = [
+    column.name for column in IncomeSheet.__table__.columns
+    if column.name not in INCOME_SHEET_KEY_COLUMNS + ['id', 'update_date']
+]
+TRAILING_FINANCIAL_FIELDS = ['近四季每股盈餘', '近四季營業收入合計', '近四季本期淨利']
+
+
+class IncomeSheetServices():
+
+    def __init__(self):
+        pass
+
+    def bulk_upsert_income_sheets(self, income_sheets) -> list:
+        """
+        Create or update many income sheets in one transaction, see
+        bulk_upsert_records.
+
+        Only the columns of each payload are compared and written.
+        income_sheet_last_update is set for the stocks with new rows and the
+        trailing four season figures are recomputed once for every affected
+        stock.
+
+        Args:
+            income_sheets: List of dicts in the handleIncomeSheet POST format
+                           plus stock_id
+
+        Returns:
+            list: Per-item {'index', 'stock_id', 'year', 'season', 'status', 'error'},
+                  where status is created, updated, unchanged, duplicate,
+                  invalid or failed
+        """
+        results = bulk_upsert_records(
+            IncomeSheet, INCOME_SHEET_KEY_COLUMNS, INCOME_SHEET_VALUE_COLUMNS, income_sheets,
+            self._normalize_income_sheet, before_commit=self._record_income_sheet_changes
+        )
+
+        changed_stock_ids = {result['stock_id'] for result in results if result['status'] in ('created', 'updated')}
+        if changed_stock_ids:
+            screener_cache.invalidate()
+            self.refresh_trailing_financials(changed_stock_ids)
+
+        return results
+
+    @staticmethod
+    def _normalize_income_sheet(income_sheet) -> dict:
+        season = str(income_sheet['season'])
+        if season not in ('1', '2', '3', '4'):
+            raise ValueError('season must be 1, 2, 3, or 4')
+
+        row = {column: income_sheet[column] for column in INCOME_SHEET_VALUE_COLUMNS if column in income_sheet}
+        row.update({'stock_id': str(income_sheet['stock_id']), 'year': int(income_sheet['year']), 'season': season})
+        return row
+
+    @staticmethod
+    def _record_income_sheet_changes(created_keys, changed_keys):
+        data_update_date_service.bulk_update_last_update(
+            {key[0] for key in created_keys}, 'income_sheet_last_update')
+        data_update_date_service.bump_data_versions({key[0] for key in changed_keys}, FUNDAMENTALS_VERSION)
+
+    def calculate_trailing_financials(self, stock_ids=None) -> dict:
+        """
+        Calculate trailing four season figures from the newest four income
+        sheets of each sii/otc stock with a single windowed query.
+
+        Stocks need at least four income sheets. 近四季每股盈餘 sums the
+        available 基本每股盈餘, while 近四季營業收入合計 and 近四季本期淨利 are
+        only set when all four seasons have a value.
+
+        Args:
+            stock_ids: Stocks to calculate, None for the whole market
+
+        Returns:
+            dict: {stock_id: {'stock_id': ..., '近四季每股盈餘': ..., ...}}
+        """
+        if stock_ids is None:
+            chunks = [None]
+        else:
+            chunks = chunked(sorted(set(stock_ids)))
+
+        trailing_financials = {}
+        for chunk in chunks:
+            ranked = db.session.query(
+                IncomeSheet.stock_id,
+                IncomeSheet.基本每股盈餘,
+                IncomeSheet.營業收入合計,
+                IncomeSheet.本期淨利,
+                func.row_number().over(
+                    partition_by=IncomeSheet.stock_id,
+                    order_by=(IncomeSheet.year.desc(), IncomeSheet.season.desc())
+                ).label('season_rank')
+            ).join(BasicInformation, BasicInformation.id == IncomeSheet.stock_id).filter(
+                BasicInformation.exchange_type.in_(['sii', 'otc']))
+            if chunk is not None:
+                ranked = ranked.filter(IncomeSheet.stock_id.in_(chunk))
+            ranked = ranked.subquery()
+
+            rows = db.session.query(
+                ranked.c.stock_id,
+                func.sum(ranked.c.基本每股盈餘).label('eps'),
+                func.sum(ranked.c.營業收入合計).label('revenue'),
+                func.count(ranked.c.營業收入合計).label('revenue_count'),
+                func.sum(ranked.c.本期淨利).label('net_income'),
+                func.count(ranked.c.本期淨利).label('net_income_count')
+            ).filter(ranked.c.season_rank <= 4).group_by(
+                ranked.c.stock_id).having(func.count() >= 4).all()
+
+            for row in rows:
+                if row.eps is None and row.revenue_count < 4 and row.net_income_count < 4:
+                    continue
+                trailing_financials[row.stock_id] = {
+                    'stock_id': row.stock_id,
+                    '近四季每股盈餘': round(float(row.eps), 2) if row.eps is not None else None,
+                    '近四季營業收入合計': int(row.revenue) if row.revenue_count == 4 else None,
+                    '近四季本期淨利': int(row.net_income) if row.net_income_count == 4 else None,
+                }
+
+        return trailing_financials
+
+    def refresh_trailing_financials(self, stock_ids) -> int:
+        """Recalculate and store the trailing four season figures of stock_ids."""
+        try:
+            return self.rebuild_trailing_financials(stock_ids)
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f'fail refresh trailing financials: {sorted(stock_ids)}, ex: {ex}')
+            return 0
+
+    def rebuild_trailing_financials(self, stock_ids=None) -> int:
+        """
+        Recalculate and bulk upsert DailyInformation trailing four season figures.
+
+        Args:
+            stock_ids: Stocks to rebuild, None for the whole market
+
+        Returns:
+            int: Number of DailyInformation rows written
+        """
+        update_date = get_current_date()
+        rows = [
+            dict(record, update_date=update_date)
+            for record in self.calculate_trailing_financials(stock_ids).values()
+        ]
+
+        count = bulk_upsert(
+            DailyInformation, rows,
+            index_elements=['stock_id'],
+            update_columns=TRAILING_FINANCIAL_FIELDS
+        )
+        data_update_date_service.bump_data_versions([row['stock_id'] for row in rows], DAILY_INFO_VERSION)
+        db.session.commit()
+        return count
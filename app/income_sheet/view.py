@@ -6,22 +6,25 @@ from flask import request, jsonify, make_response
 from flask.views import MethodView
 from sqlalchemy.exc import IntegrityError
 
-from ..utils.data_update_date_service import DataUpdateDateService
-from app.database_setup import (
-    BasicInformation, IncomeSheet, DailyInformation
-)
+from ..utils.data_update_date_service import DataUpdateDateService, FUNDAMENTALS_VERSION
+from ..utils.screener_cache import screener_cache
+from ..utils.bulk_operations import summarize_results
+from app.database_setup import IncomeSheet
 from .. import db
 from . import income_sheet
 from .serializer import IncomeSheetSchema
+from .income_sheet_services import IncomeSheetServices
 from app.decorators.auth import api_auth_required
+from app.decorators.conditional import conditional_on_data_versions
 
 
 logger = get_logger(__name__)
 data_update_date_service = DataUpdateDateService()
+income_sheet_services = IncomeSheetServices()
 
 
 class handleIncomeSheet(MethodView):
-    decorators = [api_auth_required]
+    decorators = [conditional_on_data_versions(FUNDAMENTALS_VERSION), api_auth_required]
     """
     Description:
         this api is used to handle income sheet request.
@@ -128,6 +131,7 @@ class handleIncomeSheet(MethodView):
                     incomeSheet[key] = payload[key]
 
             db.session.add(incomeSheet)
+            data_update_date_service.bump_data_versions([stock_id], FUNDAMENTALS_VERSION)
             db.session.commit()
         except IntegrityError as ie:
             db.session.rollback()
@@ -142,46 +146,82 @@ class handleIncomeSheet(MethodView):
                 % (stock_id, ex))
             return jsonify({"error": "Failed to update %s Income Sheet" % stock_id}), 400
 
-        checkFourSeasonEPS(stock_id)
+        screener_cache.invalidate()
+        income_sheet_services.refresh_trailing_financials([stock_id])
         return jsonify({"message": "Created"}), 201
 
 
-def checkFourSeasonEPS(stock_id):
-    quantityOfIncomeSheet = db.session.query(
-        db.func.count(IncomeSheet.id)).filter_by(
-            stock_id=stock_id).scalar()
+income_sheet.add_url_rule('/<stock_id>',
+                  view_func=handleIncomeSheet.as_view(
+                      'handleIncomeSheet'),
+                  methods=['GET', 'POST'])
 
-    stockType = db.session.query(
-        BasicInformation.exchange_type).filter_by(
-            id=stock_id).scalar()
 
-    if stockType in ('sii', 'otc') and quantityOfIncomeSheet >= 4:
-        stockEps = db.session.query(
-            (IncomeSheet.基本每股盈餘).label('eps')).filter_by(
-                stock_id=stock_id).order_by(
-                    IncomeSheet.year.desc()).order_by(
-                        IncomeSheet.season.desc()).limit(4).subquery()
-        fourSeasonEps = db.session.query(db.func.sum(stockEps.c.eps)).scalar()
+class handleIncomeSheetBatch(MethodView):
+    decorators = [api_auth_required]
+    """
+    Description:
+        this api is used to create or update a season's worth of income sheets.
+    Detail:
+        Accepts a JSON array of income sheets in the handleIncomeSheet POST
+        format, each with its stock_id. Unchanged rows are skipped, the
+        rest are upserted in one transaction and the trailing four season
+        figures are recomputed once for every affected stock.
+    Return:
+        http status 200 with the status of every item
+        (created, updated, unchanged, duplicate, invalid or failed).
+    """
 
-        dailyInfo = db.session.query(
-            DailyInformation).filter_by(
-                stock_id=stock_id).one_or_none()
+    def post(self):
         try:
-            if dailyInfo is not None:
-                dailyInfo['近四季每股盈餘'] = round(fourSeasonEps, 2)
-            else:
-                dailyInfo = DailyInformation()
-                dailyInfo['stock_id'] = stock_id
-                dailyInfo['近四季每股盈餘'] = round(fourSeasonEps, 2)
+            payload = request.get_json()
+        except Exception:
+            return jsonify({"error": "Invalid JSON format"}), 400
+        if not isinstance(payload, list) or not payload:
+            return jsonify({"error": "Request body must be a non-empty array of income sheets"}), 400
 
-            db.session.add(dailyInfo)
-            db.session.commit()
+        results = income_sheet_services.bulk_upsert_income_sheets(payload)
+
+        return jsonify({'results': results, 'summary': summarize_results(results)}), 200
+
+
+income_sheet.add_url_rule('/batch',
+                  view_func=handleIncomeSheetBatch.as_view(
+                      'handleIncomeSheetBatch'),
+                  methods=['POST'])
+
+
+class handleTrailingFinancials(MethodView):
+    decorators = [api_auth_required]
+    """
+    Description:
+        this api is used to rebuild the trailing four season figures.
+    Detail:
+        Recalculates 近四季每股盈餘, 近四季營業收入合計 and 近四季本期淨利 of
+        DailyInformation for the stock_ids in the request body, or for the
+        whole market when stock_ids is omitted.
+    Return:
+        http status 200 with the number of stocks written.
+    """
+
+    def post(self):
+        payload = request.get_json(silent=True) or {}
+        stock_ids = payload.get('stock_ids') if isinstance(payload, dict) else None
+        if stock_ids is not None and not isinstance(stock_ids, list):
+            return jsonify({"error": "stock_ids must be an array"}), 400
+
+        try:
+            count = income_sheet_services.rebuild_trailing_financials(
+                [str(stock_id) for stock_id in stock_ids] if stock_ids is not None else None)
         except Exception as ex:
             db.session.rollback()
             logger.exception(ex)
+            return jsonify({"error": "Failed to rebuild trailing financials"}), 500
 
+        return jsonify({'count': count}), 200
 
-income_sheet.add_url_rule('/<stock_id>',
-                  view_func=handleIncomeSheet.as_view(
-                      'handleIncomeSheet'),
-                  methods=['GET', 'POST'])
+
+income_sheet.add_url_rule('/trailing',
+                  view_func=handleTrailingFinancials.as_view(
+                      'handleTrailingFinancials'),
+                  methods=['POST'])
@@ -9,8 +9,12 @@ from sqlalchemy.exc import IntegrityError
 from app import db
 from app.main import main
 from app.utils.stock_screener import StockScreenerManager
+from app.utils.screener_cache import screener_cache
+from app.utils.chart_cache import chart_cache
 from app.decorators.auth import api_auth_required
 from app.utils.discord_bot import DiscordBot
+from app.utils.daily_information_service import DailyInformationService
+from app.utils.data_update_date_service import DataUpdateDateService, DAILY_INFO_VERSION
 from app.utils.announcement_handler import AnnounceHandler
 from app.database_setup import (
     BasicInformation, IncomeSheet, BalanceSheet,
@@ -21,6 +25,8 @@ from app.monthly_valuation.models import MonthlyValuation
 
 
 logger = get_logger(__name__)
+daily_information_service = DailyInformationService()
+data_update_date_service = DataUpdateDateService()
 
 
 def showMain():
@@ -41,6 +47,27 @@ def use_screener():
     return make_response('', 204)
 
 
+@main.route('screener/all', methods=['POST'])
+@api_auth_required
+def use_all_screeners():
+    from app.tasks.screener_task.tasks import run_screeners
+
+    task = run_screeners.delay(date=request.args.get('date'))
+    return jsonify({'task_id': task.id}), 202
+
+
+@main.route('screener/cache_stats')
+@api_auth_required
+def get_screener_cache_stats():
+    return jsonify(screener_cache.get_stats())
+
+
+@main.route('chart_cache/stats')
+@api_auth_required
+def get_chart_cache_stats():
+    return jsonify(chart_cache.get_stats())
+
+
 @main.route('incomesheet_announce', methods=['POST'])
 def get_incomesheet_announcement():
     payload = json.loads(request.data)
@@ -158,8 +185,8 @@ class handleDailyInfo(MethodView):
             if dailyInfo is not None:
                 for key in payload:
                     dailyInfo[key] = payload[key]
-                    dailyInfo['update_date'] = datetime.now(
-                        ).strftime("%Y-%m-%d")
+                dailyInfo['update_date'] = datetime.now(
+                    ).strftime("%Y-%m-%d")
             else:
                 dailyInfo = DailyInformation()
                 dailyInfo['stock_id'] = stock_id
@@ -167,6 +194,7 @@ class handleDailyInfo(MethodView):
                     dailyInfo[key] = payload[key]
 
             db.session.add(dailyInfo)
+            data_update_date_service.bump_data_versions([stock_id], DAILY_INFO_VERSION)
             db.session.commit()
         except IntegrityError as ie:
             db.session.rollback()
@@ -181,9 +209,41 @@ class handleDailyInfo(MethodView):
                 % (stock_id, ex))
             return jsonify({"error": "Failed to update %s Daily Information." % (stock_id)}), 400
 
+        screener_cache.invalidate()
         return jsonify({"message": "OK"})
 
 
+class handleDailyInfoBatch(MethodView):
+    decorators = [api_auth_required]
+    """
+    Description:
+        this api is used to write the end-of-day snapshot of the whole market.
+    Detail:
+        Accepts a JSON array of daily information in the handleDailyInfo
+        POST format, each with its stock_id, and writes it to
+        daily_information with one multi-row upsert.
+    Return:
+        http status 200 with the number of inserted, updated, unchanged,
+        duplicate and invalid items.
+    """
+
+    def post(self):
+        try:
+            payload = request.get_json()
+        except Exception:
+            return jsonify({"error": "Invalid JSON format"}), 400
+        if not isinstance(payload, list) or not payload:
+            return jsonify({"error": "Request body must be a non-empty array of daily information"}), 400
+
+        try:
+            stats = daily_information_service.bulk_upsert_daily_information(payload)
+        except Exception as ex:
+            logger.warning(f"400 failed to update Daily Information snapshot. Reason: {ex}")
+            return jsonify({"error": "Failed to update Daily Information snapshot."}), 400
+
+        return jsonify(stats), 200
+
+
 class handleStockCommodity(MethodView):
     """
     Description:
@@ -258,6 +318,11 @@ main.add_url_rule('/daily_information/<stock_id>',
                   view_func=handleDailyInfo.as_view(
                       'handleDailyInfo'),
                   methods=['GET', 'POST'])
+main.add_url_rule('/daily_information/batch',
+                  'handleDailyInfoBatch',
+                  view_func=handleDailyInfoBatch.as_view(
+                      'handleDailyInfoBatch'),
+                  methods=['POST'])
 main.add_url_rule('/StockCommodity/<stock_id>',
                   'handleStockCommodity',
                   view_func=handleStockCommodity.as_view(
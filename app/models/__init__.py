@@ -3,6 +3,7 @@ from .feed_tag import FeedTag
 from .feed_feed_tag import FeedFeedTag
 from .announcement_income_sheet_analysis import AnnouncementIncomeSheetAnalysis
 from .recommended_stock import RecommendedStock
+from .screener_backtest_result import ScreenerBacktestResult
 from .user import User
 from .role import Role
 from .user_role import UserRole
@@ -16,6 +17,7 @@ __all__ = [
     'FeedFeedTag',
     'AnnouncementIncomeSheetAnalysis',
     'RecommendedStock',
+    'ScreenerBacktestResult',
     'User',
     'Role',
     'UserRole',
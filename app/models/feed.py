@@ -11,6 +11,10 @@ logger = get_logger(__name__)
 
 class Feed(db.Model):
     __tablename__ = 'feed'
+    __table_args__ = (
+        # Keyset pagination of a stock's timeline seeks on (releaseTime, id)
+        db.Index('ix_feed_stock_id_releaseTime', 'stock_id', 'releaseTime'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     stock_id = db.Column(db.String(6), db.ForeignKey('basic_information.id'), nullable=True)
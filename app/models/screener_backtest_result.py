@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from app import db
+
+
+class ScreenerBacktestResult(db.Model):
+    __tablename__ = 'screener_backtest_results'
+
+    id = db.Column(db.Integer, primary_key=True)
+    stock_id = db.Column(db.String(6), db.ForeignKey('basic_information.id'), nullable=False)
+    backtest_date = db.Column(db.Date, nullable=False, index=True)
+    filter_model = db.Column(db.String(100), nullable=False, index=True)
+    create_time = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('filter_model', 'backtest_date', 'stock_id', name='uix_backtest_filter_date_stock'),
+    )
+
+    def __repr__(self):
+        return f'ScreenerBacktestResult({self.stock_id}, {self.backtest_date}, {self.filter_model})'
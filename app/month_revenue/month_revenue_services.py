@@ -0,0 +1,108 @@
+import csv
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import BigInteger, Float
+
+from app.log_config import get_logger
+from ..database_setup import MonthRevenue
+from ..utils.bulk_operations import bulk_upsert_records
+from ..utils.data_update_date_service import DataUpdateDateService, FUNDAMENTALS_VERSION
+from ..utils.screener_cache import screener_cache
+
+
+logger = get_logger(__name__)
+data_update_date_service = DataUpdateDateService()
+
+MONTH_REVENUE_KEY_COLUMNS = ['stock_id', 'year', 'month']
+MONTH_REVENUE_VALUE_COLUMNS = [
+    column.name for column in MonthRevenue.__table__.columns
+    if column.name not in MONTH_REVENUE_KEY_COLUMNS + ['id', 'update_date']
+]
+NOT_APPLICABLE = '不適用'
+
+
+def read_month_revenue_csv(lines):
+    """
+    Yield a dict per CSV row of lines, which can be any iterable of text
+    lines such as a request stream, keyed by the header row. Empty cells
+    become None.
+    """
+    for row in csv.DictReader(lines):
+        yield {
+            key.strip(): (value.strip() or None) if isinstance(value, str) else value
+            for key, value in row.items() if key
+        }
+
+
+def _parse_number(column, value):
+    """Convert a CSV string to the python type of a numeric MonthRevenue column."""
+    column_type = MonthRevenue.__table__.columns[column].type
+    if not isinstance(column_type, (BigInteger, Float)):
+        return value
+    try:
+        number = Decimal(value.replace(',', ''))
+    except InvalidOperation:
+        raise ValueError(f'{column} must be a number: {value}')
+    return int(number) if isinstance(column_type, BigInteger) else float(number)
+
+
+class MonthRevenueServices():
+
+    def __init__(self):
+        pass
+
+    def bulk_upsert_month_revenues(self, month_revenues) -> list:
+        """
+        Create or update a whole market's month revenues in one transaction,
+        see bulk_upsert_records.
+
+        Every item is normalized in a single pass (不適用 and empty values
+        become None, CSV strings become numbers) and only new or changed
+        rows are upserted under uix_month_revenue_stock_year_month.
+        month_revenue_last_update is set for the stocks with new rows in one
+        statement.
+
+        Args:
+            month_revenues: Iterable of dicts in the handleMonthRevenue POST format
+
+        Returns:
+            list: Per-item {'index', 'stock_id', 'year', 'month', 'status', 'error'},
+                  where status is created, updated, unchanged, duplicate,
+                  invalid or failed
+        """
+        results = bulk_upsert_records(
+            MonthRevenue, MONTH_REVENUE_KEY_COLUMNS, MONTH_REVENUE_VALUE_COLUMNS, month_revenues,
+            self._normalize_month_revenue, before_commit=self._record_month_revenue_changes
+        )
+
+        if any(result['status'] in ('created', 'updated') for result in results):
+            screener_cache.invalidate()
+
+        return results
+
+    @staticmethod
+    def _normalize_month_revenue(month_revenue) -> dict:
+        stock_id = str(month_revenue['stock_id'])
+        year = int(month_revenue['year'])
+        month = str(int(month_revenue['month']))
+        if not 1 <= int(month) <= 12:
+            raise ValueError('month must be between 1 and 12')
+
+        row = {'stock_id': stock_id, 'year': year, 'month': month}
+        for column in MONTH_REVENUE_VALUE_COLUMNS:
+            if column not in month_revenue:
+                continue
+            value = month_revenue[column]
+            if value in (NOT_APPLICABLE, ''):
+                value = None
+            elif isinstance(value, str):
+                value = _parse_number(column, value)
+            row[column] = value
+        return row
+
+    @staticmethod
+    def _record_month_revenue_changes(created_keys, changed_keys):
+        data_update_date_service.bulk_update_last_update(
+            {key[0] for key in created_keys}, 'month_revenue_last_update')
+        data_update_date_service.bump_data_versions({key[0] for key in changed_keys}, FUNDAMENTALS_VERSION)
+
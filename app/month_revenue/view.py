@@ -1,4 +1,6 @@
 from app.log_config import get_logger
+import csv
+import io
 import json
 from datetime import datetime
 
@@ -6,18 +8,25 @@ from flask import request, jsonify, make_response
 from flask.views import MethodView
 from sqlalchemy.exc import IntegrityError
 
-from ..utils.data_update_date_service import DataUpdateDateService
+from ..utils.data_update_date_service import DataUpdateDateService, FUNDAMENTALS_VERSION
+from ..utils.screener_cache import screener_cache
+from ..utils.bulk_operations import summarize_results
 from ..database_setup import MonthRevenue
 from .. import db
 from . import month_revenue
 from .serializer import MonthRevenueSchema
+from .month_revenue_services import MonthRevenueServices, read_month_revenue_csv
+from app.decorators.auth import api_auth_required
+from app.decorators.conditional import conditional_on_data_versions
 
 
 logger = get_logger(__name__)
 data_update_date_service = DataUpdateDateService()
+month_revenue_services = MonthRevenueServices()
 
 
 class handleMonthRevenue(MethodView):
+    decorators = [conditional_on_data_versions(FUNDAMENTALS_VERSION)]
     """
     Description:
         this api is used to handle month revenue request.
@@ -94,6 +103,7 @@ class handleMonthRevenue(MethodView):
                     monthReve[key] = payload[key]
 
             db.session.add(monthReve)
+            data_update_date_service.bump_data_versions([stock_id], FUNDAMENTALS_VERSION)
             db.session.commit()
         except IntegrityError as ie:
             db.session.rollback()
@@ -106,6 +116,7 @@ class handleMonthRevenue(MethodView):
                 f"400 {stock_id} is failed to update Month Revenue. Reason: {ex}")
             return jsonify({"error": f"Failed to update {stock_id} Month Revenue"}), 400
 
+        screener_cache.invalidate()
         return jsonify({"message": "Created"}), 201
 
 
@@ -113,3 +124,46 @@ month_revenue.add_url_rule('/<stock_id>',
                   view_func=handleMonthRevenue.as_view(
                       'handleMonthRevenue'),
                   methods=['GET', 'POST'])
+
+
+class handleMonthRevenueBatch(MethodView):
+    decorators = [api_auth_required]
+    """
+    Description:
+        this api is used to create or update a whole market's month revenue.
+    Detail:
+        Accepts a JSON array of month revenues in the handleMonthRevenue
+        POST format, or a text/csv body whose header row uses the same field
+        names. Unchanged rows are skipped and the rest are upserted in one
+        transaction.
+    Return:
+        http status 200 with the status of every item
+        (created, updated, unchanged, duplicate, invalid or failed).
+    """
+
+    def post(self):
+        if request.mimetype == 'text/csv':
+            payload = read_month_revenue_csv(
+                io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline=''))
+        else:
+            try:
+                payload = request.get_json()
+            except Exception:
+                return jsonify({"error": "Invalid JSON format"}), 400
+            if not isinstance(payload, list) or not payload:
+                return jsonify({"error": "Request body must be a non-empty array of month revenues"}), 400
+
+        try:
+            results = month_revenue_services.bulk_upsert_month_revenues(payload)
+        except (csv.Error, UnicodeDecodeError) as ex:
+            return jsonify({"error": f"Invalid CSV format: {ex}"}), 400
+        if not results:
+            return jsonify({"error": "Request body must contain month revenues"}), 400
+
+        return jsonify({'results': results, 'summary': summarize_results(results)}), 200
+
+
+month_revenue.add_url_rule('/batch',
+                  view_func=handleMonthRevenueBatch.as_view(
+                      'handleMonthRevenueBatch'),
+                  methods=['POST'])
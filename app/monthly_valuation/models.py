@@ -38,3 +38,36 @@ db.Index(
     MonthlyValuation.month,
     unique=True
 )
+
+
+class MonthlyValuationStatistics(db.Model):
+    """
+    Per-stock valuation statistics derived from MonthlyValuation.
+
+    Kept up to date by MonthlyValuationService on every write so readers
+    only need a single primary-key lookup.
+    """
+    __tablename__ = 'monthly_valuation_statistics'
+
+    PE_YEARS = 5
+    AVERAGE_PRICE_FIELDS = {3: '近三月均價', 6: '近六月均價'}
+    PE_QUANTILE_FIELDS = {0.25: '本益比25分位', 0.5: '本益比中位數', 0.75: '本益比75分位'}
+
+    stock_id = db.Column(
+        db.String(6), db.ForeignKey(BasicInformation.id),
+        primary_key=True, nullable=False)
+    近三月均價 = db.Column(db.DECIMAL(10, 2))
+    近六月均價 = db.Column(db.DECIMAL(10, 2))
+    本益比25分位 = db.Column(db.DECIMAL(10, 2))
+    本益比中位數 = db.Column(db.DECIMAL(10, 2))
+    本益比75分位 = db.Column(db.DECIMAL(10, 2))
+    update_time = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'MonthlyValuationStatistics({self.stock_id})'
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
@@ -2,12 +2,18 @@ from datetime import datetime
 from app.log_config import get_logger
 
 from marshmallow import ValidationError
+from sqlalchemy import func
 
-from .models import MonthlyValuation
+from .models import MonthlyValuation, MonthlyValuationStatistics
 from .serializer import MonthlyValuationSchema
 from .. import db
+from ..utils.bulk_operations import bulk_upsert
+from ..utils.data_update_date_service import DataUpdateDateService, FUNDAMENTALS_VERSION
+from ..utils.model_utilities import calculate_quantile
+from ..utils.screener_cache import screener_cache
 
 logger = get_logger(__name__)
+data_update_date_service = DataUpdateDateService()
 
 
 class MonthlyValuationService():
@@ -44,7 +50,9 @@ class MonthlyValuationService():
                 if key in validated_data:
                     setattr(existing, key, validated_data[key])
             try:
+                data_update_date_service.bump_data_versions([existing.stock_id], FUNDAMENTALS_VERSION)
                 db.session.commit()
+                self.refresh_valuation_statistics(existing.stock_id)
                 return existing
             except Exception as ex:
                 db.session.rollback()
@@ -57,7 +65,9 @@ class MonthlyValuationService():
         new_monthly_valuation = MonthlyValuation(**validated_data)
         try:
             db.session.add(new_monthly_valuation)
+            data_update_date_service.bump_data_versions([new_monthly_valuation.stock_id], FUNDAMENTALS_VERSION)
             db.session.commit()
+            self.refresh_valuation_statistics(new_monthly_valuation.stock_id)
             return new_monthly_valuation
         except Exception as ex:
             db.session.rollback()
@@ -84,12 +94,130 @@ class MonthlyValuationService():
                 monthly_valuation[key] = monthly_valuation_data[key]
 
         try:
+            data_update_date_service.bump_data_versions([monthly_valuation.stock_id], FUNDAMENTALS_VERSION)
             db.session.commit()
+            self.refresh_valuation_statistics(monthly_valuation.stock_id)
             return monthly_valuation
         except Exception as ex:
             db.session.rollback()
-            logging.exception((
+            logger.exception((
                 'fail update monthly_valuation, ' +
                 f'payload: {monthly_valuation_data}, ex: {ex}'
             ))
             return None
+
+    _STATISTICS_FIELDS = [
+        '近三月均價', '近六月均價', '本益比25分位', '本益比中位數', '本益比75分位'
+    ]
+
+    def get_valuation_statistics(self, stock_ids) -> dict:
+        """
+        Return {stock_id: statistics dict} for stock_ids.
+
+        Stocks without a stored statistics row are calculated on the fly
+        with one extra query, so the lookup never depends on a rebuild.
+        """
+        stock_ids = list(stock_ids)
+        if not stock_ids:
+            return {}
+
+        rows = MonthlyValuationStatistics.query.filter(
+            MonthlyValuationStatistics.stock_id.in_(stock_ids)).all()
+        statistics = {
+            row.stock_id: {
+                field: float(row[field]) if row[field] is not None else None
+                for field in self._STATISTICS_FIELDS
+            }
+            for row in rows
+        }
+
+        missing_stock_ids = [stock_id for stock_id in stock_ids if stock_id not in statistics]
+        if missing_stock_ids:
+            statistics.update(self.calculate_valuation_statistics(missing_stock_ids))
+
+        return statistics
+
+    def calculate_valuation_statistics(self, stock_ids=None) -> dict:
+        """
+        Calculate valuation statistics from the newest MonthlyValuation rows
+        of each stock in a single windowed query.
+
+        Args:
+            stock_ids: Stocks to calculate, None for the whole market
+
+        Returns:
+            dict: {stock_id: {'stock_id': ..., '近三月均價': ..., ...}}
+        """
+        pe_months = MonthlyValuationStatistics.PE_YEARS * 12
+        ranked = db.session.query(
+            MonthlyValuation.stock_id,
+            MonthlyValuation.均價,
+            MonthlyValuation.本益比,
+            func.row_number().over(
+                partition_by=MonthlyValuation.stock_id,
+                order_by=(MonthlyValuation.year.desc(), MonthlyValuation.month.desc())
+            ).label('row_number')
+        )
+        if stock_ids is not None:
+            ranked = ranked.filter(MonthlyValuation.stock_id.in_(stock_ids))
+        ranked = ranked.subquery()
+
+        rows = db.session.query(ranked).filter(ranked.c.row_number <= pe_months).all()
+
+        price_windows = {}
+        pe_windows = {}
+        for row in rows:
+            prices = price_windows.setdefault(row.stock_id, {3: [], 6: []})
+            pe_list = pe_windows.setdefault(row.stock_id, [])
+            if row.均價 is not None:
+                for months, window in prices.items():
+                    if row.row_number <= months:
+                        window.append(float(row.均價))
+            if row.本益比 is not None:
+                pe_list.append(float(row.本益比))
+
+        statistics = {}
+        for stock_id, prices in price_windows.items():
+            record = {'stock_id': stock_id}
+            for months, field in MonthlyValuationStatistics.AVERAGE_PRICE_FIELDS.items():
+                window = prices[months]
+                record[field] = round(sum(window) / len(window), 2) if window else None
+            for quantile, field in MonthlyValuationStatistics.PE_QUANTILE_FIELDS.items():
+                record[field] = calculate_quantile(pe_windows[stock_id], quantile)
+            statistics[stock_id] = record
+
+        return statistics
+
+    def refresh_valuation_statistics(self, stock_id):
+        """Recalculate and store the valuation statistics of a single stock."""
+        try:
+            return self.rebuild_valuation_statistics([stock_id])
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f'fail refresh monthly_valuation_statistics: {stock_id}, ex: {ex}')
+            return 0
+
+    def rebuild_valuation_statistics(self, stock_ids=None) -> int:
+        """
+        Recalculate and bulk upsert valuation statistics.
+
+        Args:
+            stock_ids: Stocks to rebuild, None for the whole market
+
+        Returns:
+            int: Number of statistics rows written
+        """
+        statistics = self.calculate_valuation_statistics(stock_ids)
+        rows = [
+            dict(record, update_time=datetime.utcnow())
+            for record in statistics.values()
+        ]
+
+        count = bulk_upsert(
+            MonthlyValuationStatistics, rows,
+            index_elements=['stock_id'],
+            update_columns=self._STATISTICS_FIELDS + ['update_time']
+        )
+        db.session.commit()
+        screener_cache.invalidate()
+        return count
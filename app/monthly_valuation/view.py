@@ -6,6 +6,8 @@ from flask_jwt_extended import jwt_required
 
 from app import db
 from app.decorators.auth import api_auth_required
+from app.decorators.conditional import conditional_on_data_versions
+from app.utils.data_update_date_service import FUNDAMENTALS_VERSION
 from .monthly_valuation_services import MonthlyValuationService
 from .serializer import MonthlyValuationSchema
 from . import monthly_valuation
@@ -17,7 +19,11 @@ monthly_valuation_service = MonthlyValuationService()
 
 
 class MonthlyValuationListApi(MethodView):
-    decorators = [api_auth_required]
+    decorators = [
+        conditional_on_data_versions(
+            FUNDAMENTALS_VERSION, get_stock_id=lambda kwargs: request.args.get('stock', '2330', type=str)),
+        api_auth_required
+    ]
 
     def get(self):
         stock = request.args.get('stock', '2330', type=str)
@@ -1,14 +1,25 @@
 from app.log_config import get_logger
 from datetime import datetime, date
 
-from app.models import Feed, FeedTag
+from app.models import Feed, FeedTag, FeedFeedTag
+from app.database_setup import BasicInformation, DataUpdateDate
 from app.basic_information.basic_information_services import BasicInformationServices
 from app.utils.data_update_date_service import DataUpdateDateService
+from app.utils.bulk_operations import bulk_upsert, chunked
+from app.utils.model_utilities import get_current_date
+from app.utils.keyset_pagination import paginate_by_keyset
 from app import db
 
 
 logger = get_logger(__name__)
 
+FEED_REQUIRED_FIELDS = ('releaseTime', 'title', 'link', 'source', 'feedType', 'tags')
+FEED_LIST_COLUMNS = [
+    'id', 'stock_id', 'update_date', 'releaseTime',
+    'title', 'link', 'description', 'feedType', 'source'
+]
+FEED_UPDATE_COLUMNS = ['releaseTime', 'title', 'source', 'description', 'feedType', 'stock_id']
+
 
 class FeedServices():
     def __init__(self):
@@ -26,8 +37,32 @@ class FeedServices():
         ).order_by(Feed.releaseTime.desc()).limit(self.feed_size).all()
         return feeds
 
+    @staticmethod
+    def get_feed_list_query(company_name_column=BasicInformation.公司名稱):
+        """
+        Select only the columns FeedSchema emits plus the company name.
+
+        Unlike Feed.query this does not hydrate Feed objects, so the joined
+        BasicInformation row and tags collection are never loaded.
+        """
+        return db.session.query(
+            *[getattr(Feed, column) for column in FEED_LIST_COLUMNS],
+            company_name_column.label('company_name')
+        ).outerjoin(BasicInformation, BasicInformation.id == Feed.stock_id)
+
+    @staticmethod
+    def serialize_feed_rows(rows) -> list:
+        """Serialize get_feed_list_query rows the same way as FeedSchema."""
+        results = []
+        for row in rows:
+            result = row._asdict()
+            result['update_date'] = row.update_date.isoformat() if row.update_date else None
+            result['releaseTime'] = row.releaseTime.isoformat() if row.releaseTime else None
+            results.append(result)
+        return results
+
     def get_feeds_by_stock(self, stock_id, page, page_size, start_date=None, sources=None):
-        query = Feed.query.filter(Feed.stock_id == stock_id)
+        query = self.get_feed_list_query().filter(Feed.stock_id == stock_id)
         if start_date:
             query = query.filter(Feed.releaseTime <= start_date)
         if sources:
@@ -37,8 +72,18 @@ class FeedServices():
         )
         return pagination
 
-    def get_feeds_by_time_range(self, start_time, end_time):
-        feeds = Feed.query.filter(
+    def get_feeds_page_by_stock(self, stock_id, cursor=None, page_size=15,
+                                start_date=None, sources=None, with_total=False):
+        """Keyset paginated version of get_feeds_by_stock, see paginate_by_keyset."""
+        query = self.get_feed_list_query().filter(Feed.stock_id == stock_id)
+        if start_date:
+            query = query.filter(Feed.releaseTime <= start_date)
+        if sources:
+            query = query.filter(Feed.source.in_(sources))
+        return paginate_by_keyset(query, Feed.releaseTime, Feed.id, cursor, page_size, with_total)
+
+    def get_feeds_by_time_range(self, start_time, end_time, company_name_column=BasicInformation.公司名稱):
+        feeds = self.get_feed_list_query(company_name_column).filter(
             Feed.releaseTime.between(start_time, end_time)).order_by(
                 Feed.releaseTime.desc()).all()
         return feeds
@@ -97,3 +142,140 @@ class FeedServices():
             return FeedTag(name=tag_name)
         else:
             return tag
+
+    def create_feeds(self, feeds_data) -> list:
+        """
+        Create or update a batch of feeds in one transaction.
+
+        Existing links, tags and stocks are resolved with one IN query each,
+        missing tags and feed_feedTag rows are bulk inserted, feeds are
+        upserted by link and DataUpdateDate is updated per column for all
+        affected stocks at once. Like create_feed, tags are only added.
+
+        Args:
+            feeds_data: List of feed dicts in the create_feed format
+
+        Returns:
+            list: Per-item {'index', 'link', 'status', 'feed_id', 'error'}, where
+                  status is created, updated, duplicate, invalid or failed
+        """
+        results = []
+        items = {}
+        for index, feed_data in enumerate(feeds_data):
+            result = {'index': index, 'link': None, 'status': None, 'feed_id': None, 'error': None}
+            results.append(result)
+            try:
+                if not isinstance(feed_data, dict):
+                    raise ValueError('Feed must be an object')
+                result['link'] = feed_data.get('link')
+                missing = [field for field in FEED_REQUIRED_FIELDS if field not in feed_data]
+                if missing:
+                    raise ValueError(f"Missing fields: {', '.join(missing)}")
+                release_time = datetime.fromisoformat(feed_data['releaseTime'])
+            except (TypeError, ValueError) as ex:
+                result['status'] = 'invalid'
+                result['error'] = str(ex)
+                continue
+
+            # The last item of a repeated link wins, as if posted one by one
+            if feed_data['link'] in items:
+                items[feed_data['link']][0]['status'] = 'duplicate'
+            stocks = feed_data.get('stocks')
+            stock_id = stocks[0] if isinstance(stocks, list) and stocks else feed_data.get('stock_id')
+            items[feed_data['link']] = (result, feed_data, release_time, stock_id)
+
+        items = {link: item for link, item in items.items() if item[0]['status'] is None}
+        if not items:
+            return results
+
+        try:
+            self._save_feeds(items)
+            db.session.commit()
+        except Exception as ex:
+            logger.exception(ex)
+            db.session.rollback()
+            for result, *_ in items.values():
+                result['status'] = 'failed'
+                result['error'] = str(ex)
+
+        return results
+
+    def _save_feeds(self, items):
+        links = list(items)
+        existing_links = set()
+        stock_ids = {item[3] for item in items.values() if item[3]}
+        existing_stock_ids = set()
+        for chunk in chunked(links):
+            existing_links.update(
+                link for link, in db.session.query(Feed.link).filter(Feed.link.in_(chunk)))
+        for chunk in chunked(list(stock_ids)):
+            existing_stock_ids.update(
+                stock_id for stock_id, in db.session.query(BasicInformation.id).filter(
+                    BasicInformation.id.in_(chunk)))
+
+        tag_names = list({tag for item in items.values() for tag in item[1]['tags']})
+        tag_ids = self._get_or_create_tag_ids(tag_names)
+
+        update_date = get_current_date()
+        feed_rows = []
+        for link, (result, feed_data, release_time, stock_id) in items.items():
+            result['status'] = 'updated' if link in existing_links else 'created'
+            feed_rows.append({
+                'link': link,
+                'update_date': update_date,
+                'releaseTime': release_time,
+                'title': feed_data['title'],
+                'source': feed_data['source'],
+                'description': feed_data.get('description'),
+                'feedType': feed_data['feedType'],
+                'stock_id': stock_id if stock_id in existing_stock_ids else None,
+            })
+        bulk_upsert(Feed, feed_rows, ['link'], FEED_UPDATE_COLUMNS)
+
+        feed_ids = {}
+        for chunk in chunked(links):
+            feed_ids.update(db.session.query(Feed.link, Feed.id).filter(Feed.link.in_(chunk)).all())
+
+        association_rows = []
+        announcement_stock_ids = set()
+        news_dates = {}
+        today = date.today()
+        for link, (result, feed_data, release_time, stock_id) in items.items():
+            result['feed_id'] = feed_ids[link]
+            association_rows += [
+                {'feed_id': feed_ids[link], 'feedTag': tag_ids[tag]}
+                for tag in set(feed_data['tags'])
+            ]
+            if stock_id not in existing_stock_ids:
+                continue
+            if feed_data['feedType'] == 'news':
+                if release_time.date() == today:
+                    news_dates[stock_id] = today
+            elif feed_data['tags']:
+                announcement_stock_ids.add(stock_id)
+        bulk_upsert(FeedFeedTag, association_rows, ['feed_id', 'feedTag'], [])
+
+        bulk_upsert(
+            DataUpdateDate,
+            [{'stock_id': stock_id, 'announcement_last_update': today} for stock_id in announcement_stock_ids],
+            ['stock_id'], ['announcement_last_update']
+        )
+        bulk_upsert(
+            DataUpdateDate,
+            [{'stock_id': stock_id, 'news_last_update': news_date} for stock_id, news_date in news_dates.items()],
+            ['stock_id'], ['news_last_update']
+        )
+
+    def _get_or_create_tag_ids(self, tag_names) -> dict:
+        """Return {tag name: id}, bulk inserting the tags that do not exist yet."""
+        tag_ids = {}
+        for chunk in chunked(tag_names):
+            tag_ids.update(db.session.query(FeedTag.name, FeedTag.id).filter(FeedTag.name.in_(chunk)).all())
+
+        missing = [name for name in tag_names if name not in tag_ids]
+        if missing:
+            bulk_upsert(FeedTag, [{'name': name} for name in missing], ['name'], [])
+            for chunk in chunked(missing):
+                tag_ids.update(
+                    db.session.query(FeedTag.name, FeedTag.id).filter(FeedTag.name.in_(chunk)).all())
+        return tag_ids
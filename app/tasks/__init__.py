@@ -8,6 +8,8 @@ def celery_init_app(name, config_name):
 
     _celery.autodiscover_tasks([
         'app.tasks.feed_task',
+        'app.tasks.screener_task',
+        'app.tasks.search_count_task',
         'app.tasks.test_task'
     ])
 
@@ -1,5 +1,6 @@
 from app import celery, db
 from app.utils.announcement_handler import AnnounceHandler
+from app.utils.announcement_fetcher import AnnouncementFetcher
 from app.utils.model_utilities import get_current_date
 from app.models import AnnouncementIncomeSheetAnalysis
 
@@ -9,13 +10,10 @@ from app.log_config import get_logger
 logger = get_logger(__name__)
 
 
-# rate_limit='10/m' means 10 tasks per minute
-@celery.task(rate_limit='10/m', ignore_result=True)
-def analyze_announcement_incomesheet(feed_id, link, year=2024, season=1):
+def build_announcement_incomesheet(feed_id, link, year, season):
     announce_handler = AnnounceHandler(link)
     try:
         income_sheet = announce_handler.get_incomesheet_announce()
-        print(income_sheet)
         single_season_incomesheet = announce_handler.get_single_season_incomesheet(
             income_sheet, year, season)
         single_season_incomesheet = announce_handler.calculate_income_sheet_annual_growth_rate(
@@ -29,12 +27,29 @@ def analyze_announcement_incomesheet(feed_id, link, year=2024, season=1):
         single_season_incomesheet['season'] = str(season)
         single_season_incomesheet['update_date'] = get_current_date()
 
-    announcement_income_sheet = AnnouncementIncomeSheetAnalysis.query.filter_by(feed_id=feed_id).one_or_none()
+    return single_season_incomesheet
+
+
+def merge_announcement_incomesheet(announcement_income_sheet, single_season_incomesheet, keep_update_date=False):
     if announcement_income_sheet:
         for key in single_season_incomesheet:
+            if keep_update_date and key == 'update_date':
+                continue
             announcement_income_sheet[key] = single_season_incomesheet[key]
     else:
         announcement_income_sheet = AnnouncementIncomeSheetAnalysis(**single_season_incomesheet)
+    return announcement_income_sheet
+
+
+# rate_limit='10/m' means 10 tasks per minute
+@celery.task(rate_limit='10/m', ignore_result=True)
+def analyze_announcement_incomesheet(feed_id, link, year=2024, season=1):
+    single_season_incomesheet = build_announcement_incomesheet(feed_id, link, year, season)
+
+    announcement_income_sheet = merge_announcement_incomesheet(
+        AnnouncementIncomeSheetAnalysis.query.filter_by(feed_id=feed_id).one_or_none(),
+        single_season_incomesheet
+    )
 
     try:
         db.session.add(announcement_income_sheet)
@@ -43,4 +58,77 @@ def analyze_announcement_incomesheet(feed_id, link, year=2024, season=1):
         db.session.rollback()
         logger.error(e)
 
-    return single_season_incomesheet
\ No newline at end of file
+    return single_season_incomesheet
+
+
+@celery.task(ignore_result=True)
+def analyze_announcement_incomesheets(announcements, year=2024, season=1, max_workers=8, offline=None,
+                                      keep_update_date=False):
+    """
+    Analyze a batch of announcements.
+
+    Pages are fetched concurrently by AnnouncementFetcher, which applies the
+    per-host concurrency and rate limits instead of the task rate_limit of
+    analyze_announcement_incomesheet. The single season figures of all
+    announcements are derived with one IncomeSheet query and every
+    analysis is saved in one commit.
+
+    Args:
+        announcements: List of (feed_id, link) pairs
+        offline: Only reparse cached pages, defaults to MOPS_PAGE_CACHE_OFFLINE
+        keep_update_date: Leave update_date of existing analyses unchanged
+    """
+    announcements = [(feed_id, link) for feed_id, link in announcements]
+    fetcher = AnnouncementFetcher(max_workers=max_workers, offline=offline)
+    pages = fetcher.fetch_many([link for _, link in announcements])
+
+    parsed = []
+    for feed_id, link in announcements:
+        announce_handler = AnnounceHandler(link)
+        try:
+            if isinstance(pages.get(link), Exception):
+                raise pages[link]
+            income_sheet = announce_handler.get_incomesheet_announce(pages.get(link))
+            fetcher.store(link, pages[link])
+            income_sheet['stock_id'] = announce_handler._extract_stock_id()
+            income_sheet['year'] = year
+            income_sheet['season'] = season
+            parsed.append((feed_id, income_sheet))
+        except Exception as ex:
+            logger.warning(f"Failed to parse announcement {feed_id} {link}: {ex}")
+            parsed.append((feed_id, None))
+
+    derived = iter(AnnounceHandler().get_single_season_incomesheets(
+        [income_sheet for _, income_sheet in parsed if income_sheet is not None]))
+
+    feed_ids = [feed_id for feed_id, _ in announcements]
+    existing = {
+        analysis.feed_id: analysis
+        for analysis in AnnouncementIncomeSheetAnalysis.query.filter(
+            AnnouncementIncomeSheetAnalysis.feed_id.in_(feed_ids)).all()
+    }
+
+    stats = {'total': len(announcements), 'failed': 0}
+    for feed_id, income_sheet in parsed:
+        single_season_incomesheet = next(derived) if income_sheet is not None else None
+        if not isinstance(single_season_incomesheet, dict):
+            single_season_incomesheet = {'processing_failed': True}
+            stats['failed'] += 1
+        single_season_incomesheet['feed_id'] = feed_id
+        single_season_incomesheet['year'] = year
+        single_season_incomesheet['season'] = str(season)
+        single_season_incomesheet['update_date'] = get_current_date()
+
+        existing[feed_id] = merge_announcement_incomesheet(
+            existing.get(feed_id), single_season_incomesheet, keep_update_date)
+        db.session.add(existing[feed_id])
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(e)
+        stats['failed'] = stats['total']
+
+    logger.info(f"Analyzed {stats['total']} announcements, {stats['failed']} failed")
+    return stats
@@ -0,0 +1,27 @@
+from app import celery
+from app.utils.screener_runner import ScreenerRunner
+
+from app.log_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@celery.task
+def run_screeners(options=None, date=None, max_workers=4, push=True):
+    """
+    Run the screeners with ScreenerRunner. The result is kept in the result
+    backend for result_expires, so the task_id POST /screener/all returns
+    can be used to fetch the per-option timings and save_stats.
+    """
+    runner = ScreenerRunner(options, date, max_workers)
+    result = runner.run()
+    logger.info(
+        f"Screeners finished in {result['elapsed_seconds']}s, "
+        f"valuation {result['valuation']['seconds']}s"
+    )
+
+    if push:
+        runner.push_messages(result)
+
+    return result
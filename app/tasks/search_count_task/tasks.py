@@ -0,0 +1,15 @@
+from app import celery
+from app.utils.stock_search_count_service import StockSearchCountService
+
+from app.log_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@celery.task(ignore_result=True)
+def flush_stock_search_counts():
+    count = StockSearchCountService().flush_stock_search_counts()
+    if count < 0:
+        logger.info('Skipped stock search count flush, another flush is running')
+    return count
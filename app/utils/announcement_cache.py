@@ -0,0 +1,146 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from app.log_config import get_logger
+
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / 'cache' / 'mops_pages.sqlite3'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class PageNotCached(LookupError):
+    """Raised when a page is requested in offline mode but is not cached."""
+
+
+class AnnouncementPageCache:
+    """
+    Compressed announcement page cache keyed by link.
+
+    Pages are stored zlib compressed in a local SQLite file together with
+    their sha256, so every gunicorn and Celery worker on the host shares
+    them. When the compressed size exceeds max_bytes the least recently
+    read pages are evicted until the cache is back under 90% of the budget.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                link TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._connect().execute('CREATE INDEX IF NOT EXISTS ix_pages_accessed_at ON pages (accessed_at)')
+
+    def _connect(self):
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def hash_content(text) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, link):
+        """Return the cached page text of link, or None."""
+        connection = self._connect()
+        row = connection.execute('SELECT body FROM pages WHERE link = ?', (link,)).fetchone()
+        if row is None:
+            return None
+        connection.execute('UPDATE pages SET accessed_at = ? WHERE link = ?', (time.time(), link))
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def get_hash(self, link):
+        row = self._connect().execute('SELECT content_hash FROM pages WHERE link = ?', (link,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, link, text) -> str:
+        """Store the page text of link and return its content hash."""
+        content_hash = self.hash_content(text)
+        body = zlib.compress(text.encode('utf-8'), 6)
+        now = time.time()
+        self._connect().execute(
+            'INSERT OR REPLACE INTO pages (link, content_hash, body, size, fetched_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (link, content_hash, body, len(body), now, now)
+        )
+        self.evict()
+        return content_hash
+
+    def delete(self, link):
+        self._connect().execute('DELETE FROM pages WHERE link = ?', (link,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM pages')
+
+    def total_bytes(self) -> int:
+        return self._connect().execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently read pages while over budget, returning how many were dropped."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+
+        target = self.max_bytes * 0.9
+        connection = self._connect()
+        evicted = []
+        for link, size in connection.execute('SELECT link, size FROM pages ORDER BY accessed_at'):
+            if total <= target:
+                break
+            evicted.append((link,))
+            total -= size
+        connection.executemany('DELETE FROM pages WHERE link = ?', evicted)
+        logger.info(f'Evicted {len(evicted)} pages from the announcement page cache')
+        return len(evicted)
+
+    def get_stats(self) -> dict:
+        count, total = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages').fetchone()
+        return {'pages': count, 'bytes': total, 'max_bytes': self.max_bytes, 'path': str(self.path)}
+
+
+def is_offline() -> bool:
+    """MOPS_PAGE_CACHE_OFFLINE=1 serves announcements from the cache only."""
+    return os.environ.get('MOPS_PAGE_CACHE_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+
+def get_page_cache():
+    """
+    Return the page cache configured by MOPS_PAGE_CACHE_PATH and
+    MOPS_PAGE_CACHE_MAX_BYTES, or None when MOPS_PAGE_CACHE_PATH is 'off'.
+    """
+    path = os.environ.get('MOPS_PAGE_CACHE_PATH') or str(DEFAULT_CACHE_PATH)
+    if path.lower() == 'off':
+        return None
+    max_bytes = int(os.environ.get('MOPS_PAGE_CACHE_MAX_BYTES') or DEFAULT_MAX_BYTES)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None or cache.max_bytes != max_bytes:
+            try:
+                cache = _caches[path] = AnnouncementPageCache(path, max_bytes)
+            except (OSError, sqlite3.Error) as ex:
+                logger.warning(f'Announcement page cache unavailable at {path}: {ex}')
+                return None
+        return cache
@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.log_config import get_logger
+from app.utils.announcement_cache import PageNotCached, get_page_cache, is_offline
+
+
+logger = get_logger(__name__)
+
+DEFAULT_TIMEOUT = (5, 20)  # (connect, read) seconds
+DEFAULT_POOL_SIZE = 10
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+# Per-host (semaphore, token bucket) shared by every fetcher of the process
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+
+
+def create_http_session(pool_size=DEFAULT_POOL_SIZE, retries=3, backoff_factor=0.5) -> requests.Session:
+    """
+    Create a keep-alive session that retries connection errors and
+    429/5xx responses with exponential backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Return the session shared by every fetch in this worker process."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_http_session()
+    return _session
+
+
+def get_host_limit(host, per_host_limit, rate, burst=None):
+    """
+    Return the (semaphore, token bucket) of host shared by every fetcher in
+    this worker process using the same limits, so separate fetches, e.g.
+    concurrent single announcement analyses, are rate limited together.
+    """
+    key = (host, per_host_limit, rate, burst)
+    with _host_limits_lock:
+        if key not in _host_limits:
+            _host_limits[key] = (threading.BoundedSemaphore(per_host_limit), TokenBucket(rate, burst))
+        return _host_limits[key]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `rate` acquisitions per second on
+    average with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AnnouncementFetcher:
+    """
+    Fetch announcement pages concurrently.
+
+    Requests go through the shared pooled session on a bounded thread pool.
+    Each host gets a concurrency limit and token bucket, shared with the
+    other fetchers of the process, so batches and single fetches together
+    do not hammer MOPS; retries and backoff are handled by the session.
+    Pages are read from the announcement page cache, but a fetched page is
+    only written to it by store(), once the caller has parsed it, so error
+    or throttle pages served with a 2xx status are fetched again next time.
+    In offline mode a page missing from the cache raises PageNotCached.
+    """
+
+    def __init__(self, max_workers=8, per_host_limit=4, rate=2.0, burst=None,
+                 timeout=DEFAULT_TIMEOUT, session=None, use_cache=True, offline=None):
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.session = session or get_http_session()
+        self.cache = get_page_cache() if use_cache else None
+        self.offline = is_offline() if offline is None else offline
+        # Links fetched over HTTP that store() may write to the cache
+        self._fetched = set()
+
+    def fetch(self, link) -> str:
+        """Fetch a single page and return its text, raising on HTTP errors."""
+        if self.cache is not None:
+            try:
+                text = self.cache.get(link)
+            except Exception as ex:
+                logger.warning(f"Failed to read cached announcement {link}: {ex}")
+                text = None
+            if text is not None:
+                return text
+        if self.offline:
+            raise PageNotCached(link)
+
+        semaphore, bucket = get_host_limit(urlparse(link).netloc, self.per_host_limit, self.rate, self.burst)
+        with semaphore:
+            bucket.acquire()
+            res = self.session.get(link, timeout=self.timeout)
+        res.raise_for_status()
+
+        self._fetched.add(link)
+        return res.text
+
+    def store(self, link, text):
+        """Cache a page fetched by this fetcher after it was parsed successfully."""
+        if self.cache is None or link not in self._fetched:
+            return
+        try:
+            self.cache.set(link, text)
+        except Exception as ex:
+            logger.warning(f"Failed to cache announcement {link}: {ex}")
+        self._fetched.discard(link)
+
+    def _fetch_result(self, link):
+        try:
+            return self.fetch(link)
+        except Exception as ex:
+            logger.warning(f"Failed to fetch announcement {link}: {ex}")
+            return ex
+
+    def fetch_many(self, links) -> dict:
+        """
+        Fetch every link once.
+
+        Returns:
+            dict: {link: page text, or the exception raised while fetching it}
+        """
+        links = list(dict.fromkeys(links))
+        if not links:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(links))) as executor:
+            return dict(zip(links, executor.map(self._fetch_result, links)))
@@ -1,10 +1,150 @@
-import requests
 import re
+from html.parser import HTMLParser
 from urllib.parse import parse_qs, urlparse
 
-from bs4 import BeautifulSoup
+from sqlalchemy import tuple_
 
+from .. import db
 from ..database_setup import IncomeSheet
+from .announcement_fetcher import AnnouncementFetcher
+from .bulk_operations import chunked
+
+
+# Element types MOPS puts the income sheet text in
+INCOME_SHEET_TAGS = frozenset(['font', 'pre', 'td'])
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer'
+])
+# Whitespace-only strings outside these collapse to one newline or space, as in BeautifulSoup
+PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+# Try '營業收入' first (more specific), fallback to '收入' for summary-only announcements
+PRIMARY_TRIGGER = '營業收入'
+FALLBACK_TRIGGER = '收入'
+
+# Remove unit annotations like (千元), commas, dollar signs and Chinese characters in one pass
+VALUE_NOISE_PATTERN = re.compile(r'\(\D+\)|[,\$]|[一-龥]')
+NEGATIVE_VALUE_PATTERN = re.compile(r'\(\d+\.?\d*\)')   # negative number expressed as (1234)
+PARENTHESES_PATTERN = re.compile(r'[()]')
+# Support both half-width ':' (U+003A) and full-width '：' (U+FF1A)
+SEPARATOR_PATTERN = re.compile(r'[:：]')
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class IncomeSheetBlockFinder(HTMLParser):
+    """
+    Find the income sheet text block of an announcement page in one pass.
+
+    Returns the text of the first font/pre/td element containing
+    PRIMARY_TRIGGER, else of the first one containing FALLBACK_TRIGGER,
+    exactly like searching a BeautifulSoup tree, but without building it.
+    An element containing a trigger is always inside an outermost
+    font/pre/td that contains it too and starts earlier, so only the
+    outermost elements are collected, and parsing stops at the first one
+    containing PRIMARY_TRIGGER.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.parts = []
+        self.pending = []
+        self.block_depth = None
+        self.skip_depth = None
+        self.preserve_depth = None
+        self.closed_void_tags = []
+        self.fallback_text = None
+        self.text = None
+
+    @classmethod
+    def find(cls, html):
+        finder = cls()
+        try:
+            finder.feed(html)
+            finder.close()
+            finder._flush()
+            finder._pop_to(0)
+        except _StopParsing:
+            pass
+        return finder.text if finder.text is not None else finder.fallback_text
+
+    # Start and end tags are handled the way BeautifulSoup's html.parser
+    # builder does, including its bookkeeping of already closed void tags
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag)
+        if tag in VOID_TAGS:
+            self._end(tag)
+            self.closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void_tags:
+            self.closed_void_tags.remove(tag)
+            return
+        self._end(tag)
+
+    def _start(self, tag):
+        self._flush()
+        if self.block_depth is None and tag in INCOME_SHEET_TAGS:
+            self.block_depth = len(self.stack)
+            self.parts = []
+        if self.skip_depth is None and tag in ('script', 'style'):
+            self.skip_depth = len(self.stack)
+        if self.preserve_depth is None and tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth = len(self.stack)
+        self.stack.append(tag)
+
+    def _end(self, tag):
+        self._flush()
+        # Like BeautifulSoup, close the most recent open tag of this name
+        # and everything opened after it; ignore unmatched end tags
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth] == tag:
+                self._pop_to(depth)
+                return
+
+    def handle_data(self, data):
+        if self.block_depth is not None and self.skip_depth is None:
+            self.pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+    def _flush(self):
+        # Text between two tags or comments is one string
+        if not self.pending:
+            return
+        data = ''.join(self.pending)
+        self.pending = []
+        if self.preserve_depth is None and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        self.parts.append(data)
+
+    def _pop_to(self, depth):
+        del self.stack[depth:]
+        if self.skip_depth is not None and self.skip_depth >= depth:
+            self.skip_depth = None
+        if self.preserve_depth is not None and self.preserve_depth >= depth:
+            self.preserve_depth = None
+        if self.block_depth is not None and self.block_depth >= depth:
+            self.block_depth = None
+            text = ''.join(self.parts)
+            if PRIMARY_TRIGGER in text:
+                self.text = text
+                raise _StopParsing()
+            if self.fallback_text is None and FALLBACK_TRIGGER in text:
+                self.fallback_text = text
 
 
 class AnnounceHandler:
@@ -19,6 +159,11 @@ class AnnounceHandler:
             '營業收入合計': '收入',        # '營業收入合計' / '累計收入' / '1月1日累計至本期止營業收入'
             '母公司業主淨利': '母公司',     # '母公司業主淨利' / '歸屬母公司淨利'
         }
+        # One lookahead pattern finds every search term in a line, even overlapping ones;
+        # a line belongs to the first data_key whose search term it contains
+        self._search_keys = {self._search_alias.get(key, key): key for key in self.data_key}
+        self._search_pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(term) for term in self._search_keys) + '))')
 
     def _extract_stock_id(self):
         params = parse_qs(urlparse(self.announce_link).query)
@@ -33,32 +178,35 @@ class AnnounceHandler:
         raise ValueError(f"Cannot extract stock_id from link: {self.announce_link}")
 
     def _parse_value(self, raw):
-        raw = re.sub(r'\(\D+\)', '', raw)           # remove unit annotations like (千元)
-        raw = re.sub(r'[,\$]', '', raw)             # remove commas and dollar signs
-        raw = re.sub(r'[一-龥]', '', raw).strip()  # remove Chinese characters
+        raw = VALUE_NOISE_PATTERN.sub('', raw).strip()
         if not raw:
             return None
-        if re.search(r'\(\d+\.?\d*\)', raw):        # negative number expressed as (1234)
-            return float('-' + re.sub(r'[()]', '', raw))
+        if NEGATIVE_VALUE_PATTERN.search(raw):
+            return float('-' + PARENTHESES_PATTERN.sub('', raw))
         return float(raw)
 
-    def get_incomesheet_announce(self):
-        res = requests.get(self.announce_link)
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        # Search across element types MOPS uses (font, pre, td)
-        # Try '營業收入' first (more specific), fallback to '收入' for summary-only announcements
-        target_text = None
-        for trigger in ('營業收入', '收入'):
-            for tag in soup.find_all(['font', 'pre', 'td']):
-                if trigger in tag.text:
-                    target_text = tag.text
-                    break
-            if target_text is not None:
-                break
+    def _match_data_key(self, line):
+        terms = self._search_pattern.findall(line)
+        if not terms:
+            return None
+        keys = {self._search_keys[term] for term in terms}
+        return next(key for key in self.data_key if key in keys)
+
+    def get_incomesheet_announce(self, html=None):
+        """
+        Parse the income sheet from html, fetching the announcement page when
+        not given. A fetched page is only cached once its income sheet is found.
+        """
+        fetcher = None
+        if html is None:
+            fetcher = AnnouncementFetcher(max_workers=1)
+            html = fetcher.fetch(self.announce_link)
+        target_text = IncomeSheetBlockFinder.find(html)
 
         if target_text is None:
             raise ValueError("Cannot find income sheet data on the announcement page")
+        if fetcher is not None:
+            fetcher.store(self.announce_link, html)
 
         announcement_income_sheet = {
             '營業收入合計': None,
@@ -75,30 +223,87 @@ class AnnounceHandler:
         }
 
         for line in target_text.split('\n'):
-            for key in self.data_key:
-                search_term = self._search_alias.get(key, key)
-                if search_term in line:
-                    # Support both half-width ':' (U+003A) and full-width '：' (U+FF1A)
-                    parts = re.split(r'[:：]', line, maxsplit=1)
-                    if len(parts) < 2:
-                        break
-                    try:
-                        announcement_income_sheet[key] = self._parse_value(parts[1])
-                    except (ValueError, IndexError):
-                        pass
-                    break
+            if ':' not in line and '：' not in line:
+                continue
+            key = self._match_data_key(line)
+            if key is None:
+                continue
+            try:
+                announcement_income_sheet[key] = self._parse_value(SEPARATOR_PATTERN.split(line, maxsplit=1)[1])
+            except (ValueError, IndexError):
+                pass
 
         return announcement_income_sheet
 
     def get_single_season_incomesheet(self, announcement_income_sheet, year, season):
         announcement_income_sheet['stock_id'] = self._extract_stock_id()
         data = IncomeSheet.query.filter_by(stock_id=announcement_income_sheet["stock_id"], year=year).all()
-        for d in data:
-            if int(d.season) >= int(season):
-                continue
-            past_income_sheet = d.serialize
+        self._subtract_prior_seasons(
+            announcement_income_sheet, [d.serialize for d in data if int(d.season) < int(season)])
+        return self._calculate_ratios(announcement_income_sheet)
+
+    def calculate_income_sheet_annual_growth_rate(self, announcement_income_sheet, year, season):
+        last_year = year - 1
+        last_year_income_sheet = IncomeSheet.query.filter_by(
+            stock_id=announcement_income_sheet["stock_id"], year=last_year, season=season).one_or_none()
+
+        return self._calculate_annual_growth_rate(announcement_income_sheet, last_year_income_sheet)
+
+    def get_single_season_incomesheets(self, records) -> list:
+        """
+        Batch version of get_single_season_incomesheet plus
+        calculate_income_sheet_annual_growth_rate.
+
+        The prior seasons of the same year and the same season of last year
+        for every record are loaded in one query, then every record is
+        derived in a single pass.
+
+        Args:
+            records: List of dicts with stock_id, year, season and the
+                     cumulative figures from get_incomesheet_announce
+
+        Returns:
+            list: Per record, the derived single season income sheet or the
+                  exception raised while deriving it
+        """
+        columns = list(dict.fromkeys(self.data_key + self.annual_growth_rate_key))
+        pairs = set()
+        for record in records:
+            pairs.add((record['stock_id'], int(record['year'])))
+            pairs.add((record['stock_id'], int(record['year']) - 1))
+
+        income_sheets = {}
+        for chunk in chunked(sorted(pairs)):
+            rows = db.session.query(
+                IncomeSheet.stock_id, IncomeSheet.year, IncomeSheet.season,
+                *[getattr(IncomeSheet, column) for column in columns]
+            ).filter(tuple_(IncomeSheet.stock_id, IncomeSheet.year).in_(chunk)).all()
+            for row in rows:
+                income_sheets[(row.stock_id, row.year, int(row.season))] = row._asdict()
+
+        results = []
+        for record in records:
+            stock_id, year, season = record['stock_id'], int(record['year']), int(record['season'])
+            try:
+                income_sheet = dict(record)
+                self._subtract_prior_seasons(income_sheet, [
+                    income_sheets[(stock_id, year, prior_season)]
+                    for prior_season in range(1, season) if (stock_id, year, prior_season) in income_sheets
+                ])
+                self._calculate_ratios(income_sheet)
+                results.append(self._calculate_annual_growth_rate(
+                    income_sheet, income_sheets.get((stock_id, year - 1, season))))
+            except Exception as ex:
+                results.append(ex)
+        return results
+
+    def _subtract_prior_seasons(self, announcement_income_sheet, past_income_sheets):
+        for past_income_sheet in past_income_sheets:
             for key in self.data_key:
                 announcement_income_sheet[key] = announcement_income_sheet[key] - past_income_sheet[key]
+        return announcement_income_sheet
+
+    def _calculate_ratios(self, announcement_income_sheet):
         # 下面計算各種比率，除Q1,Q3, 要先撈前幾季的資料剪掉數字後再算
         for key in self.ratio_key:
             announcement_income_sheet[key+'率'] = round((announcement_income_sheet[key] / announcement_income_sheet['營業收入合計'])*100 , 2)
@@ -109,17 +314,15 @@ class AnnounceHandler:
 
         return announcement_income_sheet
 
-    def calculate_income_sheet_annual_growth_rate(self, announcement_income_sheet, year, season):
-        last_year = year - 1
-        last_year_income_sheet = IncomeSheet.query.filter_by(
-            stock_id=announcement_income_sheet["stock_id"], year=last_year, season=season).one_or_none()
-
+    def _calculate_annual_growth_rate(self, announcement_income_sheet, last_year_income_sheet):
         for key in self.annual_growth_rate_key:
-            if last_year_income_sheet is None or announcement_income_sheet[key] < 0:
+            last_year_value = None if last_year_income_sheet is None else last_year_income_sheet[key]
+            if last_year_value in [0, None] or announcement_income_sheet[key] is None \
+                    or announcement_income_sheet[key] < 0:
                 announcement_income_sheet[key+'年增率'] = None
             else:
                 announcement_income_sheet[key+'年增率'] = round(
-                    ((announcement_income_sheet[key] / float(last_year_income_sheet[key]))-1)*100 , 2
+                    ((announcement_income_sheet[key] / float(last_year_value))-1)*100 , 2
                 )
 
         return announcement_income_sheet
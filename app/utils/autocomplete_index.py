@@ -0,0 +1,231 @@
+import threading
+import time
+
+from app.log_config import get_logger
+from ..database_setup import BasicInformation, StockSearchCounts
+from .. import db
+
+
+logger = get_logger(__name__)
+
+
+class _Node:
+    __slots__ = ('children', 'stock_ids', 'top')
+
+    def __init__(self):
+        self.children = {}
+        # Stocks whose key ends at this node
+        self.stock_ids = set()
+        # Best TOP_K stock ids of the subtree, by search count
+        self.top = []
+
+
+class AutocompleteIndex:
+    """
+    In-process stock autocomplete over sii/otc stocks with a search count.
+
+    Stock ids and lower-cased 公司簡稱 go into two prefix tries whose nodes
+    keep the best TOP_K stocks of their subtree by search count, so a
+    lookup is a walk down the prefix and never touches the database.
+
+    The index is built when a worker starts (see gunicorn.conf.py) or on
+    first use. Changes made by this process are applied right away along
+    the changed stock's path, while a background thread picks up changes
+    made by other processes every REFRESH_SECONDS by diffing one query
+    against the index.
+    """
+
+    TOP_K = 8
+    REFRESH_SECONDS = 300
+
+    def __init__(self):
+        self._stocks = {}
+        self._id_root = _Node()
+        self._name_root = _Node()
+        self._built = False
+        self._lock = threading.RLock()
+        self._refresh_thread = None
+
+    def search(self, prefix) -> list:
+        """
+        Return up to TOP_K (stock_id, 公司簡稱) matching prefix, most searched
+        first. A prefix of 1 to 4 digits matches stock ids, anything else
+        matches 公司簡稱.
+        """
+        if not self._built:
+            self.build()
+
+        if prefix.isascii() and prefix.isdigit() and len(prefix) <= 4:
+            node = self._find(self._id_root, prefix)
+        else:
+            node = self._find(self._name_root, prefix.lower())
+        if node is None:
+            return []
+
+        stocks = self._stocks
+        return [(stock_id, stocks[stock_id][0]) for stock_id in node.top if stock_id in stocks]
+
+    def build(self):
+        """Load every indexed stock with one query and rebuild both tries."""
+        stocks = self._load_stocks()
+        with self._lock:
+            self._stocks = {}
+            self._id_root = _Node()
+            self._name_root = _Node()
+            for stock_id, stock in stocks.items():
+                self._insert(stock_id, stock)
+            self._rank_all(self._id_root)
+            self._rank_all(self._name_root)
+            self._built = True
+        logger.info(f'Built autocomplete index of {len(stocks)} stocks')
+
+    def refresh(self) -> int:
+        """
+        Apply the differences between the database and the index.
+
+        Returns:
+            int: Number of stocks added, removed or changed
+        """
+        if not self._built:
+            self.build()
+            return len(self._stocks)
+
+        stocks = self._load_stocks()
+        with self._lock:
+            changed = [
+                stock_id for stock_id in set(stocks) | set(self._stocks)
+                if stocks.get(stock_id) != self._stocks.get(stock_id)
+            ]
+            for stock_id in changed:
+                self._apply(stock_id, stocks.get(stock_id))
+        return len(changed)
+
+    def refresh_stocks(self, stock_ids):
+        """Reload stock_ids from the database, e.g. after a BasicInformation write."""
+        if not self._built:
+            return
+        stocks = self._load_stocks(stock_ids)
+        with self._lock:
+            for stock_id in stock_ids:
+                self._apply(stock_id, stocks.get(stock_id))
+
+    def add_search_count(self, stock_id, count=1):
+        """Raise the search count of an indexed stock by count."""
+        with self._lock:
+            stock = self._stocks.get(stock_id)
+            if stock is None:
+                return
+            name, search_count = stock
+            self._stocks[stock_id] = (name, search_count + count)
+            self._promote(self._path(self._id_root, stock_id), stock_id)
+            self._promote(self._path(self._name_root, name.lower()), stock_id)
+
+    def start(self, app):
+        """Build the index and keep it fresh from a daemon thread."""
+        with app.app_context():
+            try:
+                self.build()
+            except Exception as ex:
+                logger.exception(f'Failed to build autocomplete index: {ex}')
+
+        if self._refresh_thread is None:
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop, args=(app,), name='autocomplete-refresh', daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh_loop(self, app):
+        while True:
+            time.sleep(self.REFRESH_SECONDS)
+            with app.app_context():
+                try:
+                    self.refresh()
+                except Exception as ex:
+                    logger.exception(f'Failed to refresh autocomplete index: {ex}')
+                finally:
+                    db.session.remove()
+
+    @staticmethod
+    def _load_stocks(stock_ids=None) -> dict:
+        query = db.session.query(
+            BasicInformation.id, BasicInformation.公司簡稱, StockSearchCounts.search_count
+        ).join(
+            StockSearchCounts, StockSearchCounts.stock_id == BasicInformation.id
+        ).filter(BasicInformation.exchange_type.in_(['sii', 'otc']))
+        if stock_ids is not None:
+            query = query.filter(BasicInformation.id.in_(list(stock_ids)))
+        return {
+            row.id: (row.公司簡稱 or '', row.search_count or 0)
+            for row in query
+        }
+
+    def _rank_key(self, stock_id):
+        return (-self._stocks[stock_id][1], stock_id)
+
+    def _insert(self, stock_id, stock):
+        self._stocks[stock_id] = stock
+        self._path(self._id_root, stock_id, create=True)[-1].stock_ids.add(stock_id)
+        self._path(self._name_root, stock[0].lower(), create=True)[-1].stock_ids.add(stock_id)
+
+    def _apply(self, stock_id, stock):
+        """Insert, update or remove (stock None) a stock and rerank the paths it touches."""
+        paths = []
+        old = self._stocks.pop(stock_id, None)
+        if old is not None:
+            for root, key in ((self._id_root, stock_id), (self._name_root, old[0].lower())):
+                path = self._path(root, key)
+                path[-1].stock_ids.discard(stock_id)
+                paths.append(path)
+        if stock is not None:
+            self._insert(stock_id, stock)
+            paths.append(self._path(self._id_root, stock_id))
+            paths.append(self._path(self._name_root, stock[0].lower()))
+        for path in paths:
+            self._rerank(path)
+
+    @staticmethod
+    def _find(root, key):
+        node = root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def _path(root, key, create=False) -> list:
+        path = [root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                if not create:
+                    break
+                node = path[-1].children[char] = _Node()
+            path.append(node)
+        return path
+
+    def _rank_node(self, node):
+        candidates = set(node.stock_ids)
+        for child in node.children.values():
+            candidates.update(child.top)
+        node.top = sorted(candidates, key=self._rank_key)[:self.TOP_K]
+
+    def _rank_all(self, node):
+        for child in node.children.values():
+            self._rank_all(child)
+        self._rank_node(node)
+
+    def _rerank(self, path):
+        for node in reversed(path):
+            self._rank_node(node)
+
+    def _promote(self, path, stock_id):
+        """Move a stock whose count went up into the tops of its path, deepest first."""
+        for node in reversed(path):
+            if stock_id not in node.top and len(node.top) == self.TOP_K \
+                    and self._rank_key(stock_id) > self._rank_key(node.top[-1]):
+                # Not good enough here, so not good enough for any ancestor
+                return
+            node.top = sorted(set(node.top) | {stock_id}, key=self._rank_key)[:self.TOP_K]
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,290 @@
+import hashlib
+import json
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import tuple_
+
+from app.log_config import get_logger
+
+from .. import db
+from .model_utilities import get_current_date
+
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def chunked(items, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield successive chunk_size slices of items."""
+    for start in range(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
+
+
+def normalize_value(value):
+    """Canonical string of a value, so 50, 50.0, '50' and Decimal('50.00') compare equal."""
+    if value is None:
+        return None
+    try:
+        return format(Decimal(str(value)).normalize(), 'f')
+    except (InvalidOperation, ValueError):
+        return str(value)
+
+
+def content_hash(row, columns) -> str:
+    """sha1 of the normalized values of columns in row."""
+    content = json.dumps([normalize_value(row.get(column)) for column in columns])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def summarize_results(results) -> dict:
+    """Count the per-record results of a batch endpoint by status."""
+    return dict(Counter(result['status'] for result in results))
+
+
+def fetch_existing_values(column, values, chunk_size=DEFAULT_CHUNK_SIZE) -> set:
+    """Return the subset of values present in column, with one IN query per chunk."""
+    existing = set()
+    for chunk in chunked(sorted(set(values)), chunk_size):
+        existing.update(value for value, in db.session.query(column).filter(column.in_(chunk)))
+    return existing
+
+
+def fetch_rows_by_keys(model, key_columns, columns, keys, chunk_size=DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    Load columns of the rows of model whose key_columns match keys, with one
+    tuple IN query per chunk.
+
+    Returns:
+        dict: {key tuple: {column: value}}
+    """
+    rows = {}
+    key_attributes = [getattr(model, column) for column in key_columns]
+    for chunk in chunked(list(keys), chunk_size):
+        for row in db.session.query(
+            *key_attributes, *[getattr(model, column) for column in columns if column not in key_columns]
+        ).filter(tuple_(*key_attributes).in_(chunk)):
+            row = row._asdict()
+            rows[tuple(row[column] for column in key_columns)] = row
+    return rows
+
+
+def bulk_upsert_records(model, key_columns, value_columns, records, normalize,
+                        digest_column=None, before_commit=None) -> list:
+    """
+    Validate, dedupe, diff and upsert the records of a batch endpoint in one
+    transaction, reporting a status per record.
+
+    Every record must be a dict with all key_columns and no columns other
+    than key_columns, value_columns and update_date. normalize(record)
+    returns its row, the key columns plus the value columns the record
+    supplies, raising TypeError or ValueError for an invalid record. The
+    last record of a repeated key wins and records of stocks missing from
+    BasicInformation (key_columns[0]) are invalid.
+
+    Only the supplied columns are written. Without digest_column the stored
+    rows are loaded with one tuple IN query per chunk and compared by
+    content_hash over the supplied columns. With digest_column, a column
+    holding the content_hash of all value_columns, only (key, digest) pairs
+    are loaded, plus the stored values of partial records and of rows
+    without a digest, and rows are written whole with their new digest.
+    Changed rows are upserted in chunks grouped by their columns.
+
+    Args:
+        model: SQLAlchemy model class
+        key_columns: Columns of the unique key, stock_id first
+        value_columns: Columns a record may set
+        records: Iterable of record dicts
+        normalize: Callable turning a record into its row
+        digest_column: Column storing the content_hash of value_columns
+        before_commit: Callable(created_keys, changed_keys) run in the same
+                       transaction, changed_keys includes created_keys
+
+    Returns:
+        list: Per-record {'index', *key_columns, 'status', 'error'}, where
+              status is created, updated, unchanged, duplicate, invalid or failed
+    """
+    results = []
+    items = {}
+    for index, record in enumerate(records):
+        result = {'index': index, **dict.fromkeys(key_columns), 'status': None, 'error': None}
+        results.append(result)
+        try:
+            row = _validate_record(record, key_columns, value_columns, normalize)
+        except (TypeError, ValueError) as ex:
+            result['status'] = 'invalid'
+            result['error'] = str(ex)
+            if isinstance(record, dict):
+                result[key_columns[0]] = record.get(key_columns[0])
+            continue
+
+        key = tuple(row[column] for column in key_columns)
+        result.update(zip(key_columns, key))
+        # The last record of a repeated key wins
+        if key in items:
+            items[key][0]['status'] = 'duplicate'
+        items[key] = (result, row)
+
+    items = {key: item for key, item in items.items() if item[0]['status'] is None}
+    if not items:
+        return results
+
+    try:
+        created_keys, changed_keys = _save_records(model, key_columns, value_columns, items, digest_column)
+        if before_commit is not None:
+            before_commit(created_keys, changed_keys)
+        db.session.commit()
+    except Exception as ex:
+        logger.exception(ex)
+        db.session.rollback()
+        for result, _ in items.values():
+            result['status'] = 'failed'
+            result['error'] = str(ex)
+
+    return results
+
+
+def _validate_record(record, key_columns, value_columns, normalize) -> dict:
+    if not isinstance(record, dict):
+        raise ValueError('Record must be an object')
+    missing = [column for column in key_columns if record.get(column) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    unknown = [column for column in record if column not in key_columns + value_columns + ['update_date']]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return normalize(record)
+
+
+def _save_records(model, key_columns, value_columns, items, digest_column) -> tuple:
+    from ..database_setup import BasicInformation
+
+    keys = list(items)
+    existing_stock_ids = fetch_existing_values(BasicInformation.id, [key[0] for key in keys])
+
+    legacy_keys = set()
+    if digest_column is None:
+        stored_rows = fetch_rows_by_keys(model, key_columns, value_columns, keys)
+        existing_keys = set(stored_rows)
+    else:
+        digests = {
+            key: row[digest_column]
+            for key, row in fetch_rows_by_keys(model, key_columns, [digest_column], keys).items()
+        }
+        existing_keys = set(digests)
+        # Partial records are merged into the stored values and rows written
+        # before the digest existed are compared column by column once
+        legacy_keys = {key for key, digest in digests.items() if digest is None}
+        stored_keys = legacy_keys | {
+            key for key, (_, row) in items.items()
+            if key in digests and any(column not in row for column in value_columns)
+        }
+        stored_rows = fetch_rows_by_keys(model, key_columns, value_columns, stored_keys) if stored_keys else {}
+        for key in legacy_keys:
+            digests[key] = content_hash(stored_rows[key], value_columns)
+
+    update_date = get_current_date()
+    groups = {}
+    backfill = []
+    created_keys = []
+    changed_keys = []
+    for key, (result, row) in items.items():
+        if key[0] not in existing_stock_ids:
+            result['status'] = 'invalid'
+            result['error'] = f'Unknown stock: {key[0]}'
+            continue
+
+        if digest_column is None:
+            columns = [column for column in value_columns if column in row]
+            unchanged = key in existing_keys and \
+                content_hash(stored_rows[key], columns) == content_hash(row, columns)
+        else:
+            stored_row = stored_rows.get(key, {})
+            row = dict({column: stored_row.get(column) for column in value_columns}, **row)
+            row[digest_column] = content_hash(row, value_columns)
+            columns = value_columns + [digest_column]
+            unchanged = digests.get(key) == row[digest_column]
+
+        if unchanged:
+            result['status'] = 'unchanged'
+            if key in legacy_keys:
+                backfill.append({column: row[column] for column in key_columns + [digest_column]})
+            continue
+
+        result['status'] = 'updated' if key in existing_keys else 'created'
+        if key not in existing_keys:
+            created_keys.append(key)
+        changed_keys.append(key)
+        # bulk_upsert needs rows with the same columns
+        groups.setdefault(tuple(columns), []).append(dict(row, update_date=update_date))
+
+    for columns, rows in groups.items():
+        bulk_upsert(model, rows, key_columns, list(columns) + ['update_date'])
+    if backfill:
+        bulk_upsert(model, backfill, key_columns, [digest_column])
+    return created_keys, changed_keys
+
+
+def build_upsert_statement(table, rows, index_elements, update_columns):
+    """
+    Build a dialect-aware multi-row INSERT that updates update_columns on a
+    key conflict.
+
+    MySQL/MariaDB use ON DUPLICATE KEY UPDATE (any unique key triggers it),
+    PostgreSQL and SQLite use ON CONFLICT (index_elements) DO UPDATE.
+    """
+    dialect = db.engine.dialect.name
+
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        if not update_columns:
+            return stmt.prefix_with('IGNORE')
+        return stmt.on_duplicate_key_update(
+            {column: stmt.inserted[column] for column in update_columns}
+        )
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(rows)
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=index_elements)
+        return stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+
+    raise NotImplementedError(f'Bulk upsert is not supported for dialect: {dialect}')
+
+
+def bulk_upsert(model, rows, index_elements, update_columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Insert or update rows of model in chunked multi-row statements.
+
+    The caller owns the transaction; nothing is committed here.
+
+    Args:
+        model: SQLAlchemy model class
+        rows: List of dicts, every dict must have the same keys
+        index_elements: Columns of the unique key used to detect conflicts
+        update_columns: Columns overwritten when the row already exists
+        chunk_size: Maximum rows per statement
+
+    Returns:
+        int: Number of rows sent to the database
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    for chunk in chunked(rows, chunk_size):
+        db.session.execute(
+            build_upsert_statement(table, chunk, index_elements, update_columns)
+        )
+
+    logger.info(f'Bulk upserted {len(rows)} rows into {table.name}')
+    return len(rows)
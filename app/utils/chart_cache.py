@@ -0,0 +1,168 @@
+import time
+from functools import wraps
+
+from flask import current_app, g, make_response
+from redis.exceptions import LockError, RedisError
+
+from app.log_config import get_logger
+from .. import redis_client
+
+
+logger = get_logger(__name__)
+
+
+class ChartCache:
+    """
+    Redis cache of the stock chart responses of the frontend blueprint.
+
+    Entries are keyed by route and the data version ETag of the request
+    (see app.decorators.conditional), which covers the path, query string
+    and the per-stock version tokens the route depends on. The IncomeSheet,
+    MonthRevenue, MonthlyValuation and DailyInformation write paths replace
+    those tokens in the same transaction as the data, so a commit retires
+    every cached chart of the stock at once and old entries simply expire.
+
+    Only one worker computes a cold key, the others wait for its result.
+    Redis errors are logged and treated as a cache miss.
+    """
+
+    KEY_PREFIX = 'chart_cache'
+    STATS_KEY = f'{KEY_PREFIX}:stats'
+    EXPIRE_SECONDS = 24 * 60 * 60
+    LOCK_SECONDS = 10
+    WAIT_SECONDS = 3
+    POLL_SECONDS = 0.05
+
+    def get_or_compute(self, route, etag, compute):
+        """
+        Return the cached response of route for etag, otherwise the response
+        of compute(), caching it when it is a 200.
+
+        Args:
+            route: Route name, used in the key and the hit-rate metrics
+            etag: Data version ETag of the request, None disables caching
+            compute: Callable returning the view response
+        """
+        if etag is None:
+            return make_response(compute())
+
+        cache_key = f'{self.KEY_PREFIX}:{route}:{etag}'
+        cached = self._get(cache_key, route)
+        if cached is not None:
+            return self._build_response(cached)
+
+        lock = self._acquire_lock(cache_key)
+        if lock is None:
+            cached = self._wait(cache_key)
+            if cached is not None:
+                return self._build_response(cached)
+
+        try:
+            response = make_response(compute())
+            if response.status_code == 200:
+                self._set(cache_key, response.get_data())
+        finally:
+            self._release_lock(lock)
+        return response
+
+    def _get(self, cache_key, route):
+        try:
+            cached = redis_client.get(cache_key)
+            outcome = 'hits' if cached is not None else 'misses'
+            pipeline = redis_client.pipeline()
+            pipeline.hincrby(self.STATS_KEY, outcome, 1)
+            pipeline.hincrby(self.STATS_KEY, f'{route}:{outcome}', 1)
+            pipeline.execute()
+        except RedisError as ex:
+            logger.warning(f'Failed to read chart cache: {ex}')
+            return None
+        return cached
+
+    def _set(self, cache_key, body):
+        try:
+            redis_client.set(cache_key, body, ex=self.EXPIRE_SECONDS)
+        except RedisError as ex:
+            logger.warning(f'Failed to write chart cache: {ex}')
+
+    def _acquire_lock(self, cache_key):
+        """Return the compute lock of cache_key, None if another worker holds it."""
+        try:
+            lock = redis_client.lock(f'{cache_key}:lock', timeout=self.LOCK_SECONDS)
+            return lock if lock.acquire(blocking=False) else None
+        except RedisError as ex:
+            logger.warning(f'Failed to lock chart cache: {ex}')
+            return False
+
+    @staticmethod
+    def _release_lock(lock):
+        if not lock:
+            return
+        try:
+            lock.release()
+        except (LockError, RedisError) as ex:
+            logger.warning(f'Failed to unlock chart cache: {ex}')
+
+    def _wait(self, cache_key):
+        """Poll for the entry another worker is computing, None on timeout."""
+        deadline = time.monotonic() + self.WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(self.POLL_SECONDS)
+            try:
+                cached = redis_client.get(cache_key)
+            except RedisError as ex:
+                logger.warning(f'Failed to read chart cache: {ex}')
+                return None
+            if cached is not None:
+                return cached
+        return None
+
+    @staticmethod
+    def _build_response(body):
+        return current_app.response_class(body, mimetype='application/json')
+
+    def get_stats(self) -> dict:
+        """Return overall and per-route hit/miss counters."""
+        try:
+            raw_stats = redis_client.hgetall(self.STATS_KEY)
+        except RedisError as ex:
+            logger.warning(f'Failed to read chart cache stats: {ex}')
+            raw_stats = {}
+
+        counters = {
+            key.decode('utf-8') if isinstance(key, bytes) else key: int(value)
+            for key, value in raw_stats.items()
+        }
+        hits = counters.pop('hits', 0)
+        misses = counters.pop('misses', 0)
+
+        routes = {}
+        for key, value in counters.items():
+            route, outcome = key.rsplit(':', 1)
+            routes.setdefault(route, {'hits': 0, 'misses': 0})[outcome] = value
+        for counts in routes.values():
+            total = counts['hits'] + counts['misses']
+            counts['hit_rate'] = round(counts['hits'] / total, 4) if total else None
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+            'routes': routes
+        }
+
+
+chart_cache = ChartCache()
+
+
+def cached_chart(route):
+    """
+    Decorator caching a chart view in chart_cache under the ETag computed
+    by conditional_on_data_versions, which must wrap it.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            return chart_cache.get_or_compute(
+                route, g.get('data_version_etag'), lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
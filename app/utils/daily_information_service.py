@@ -0,0 +1,137 @@
+from app.log_config import get_logger
+from .. import db
+from ..daily_price.daily_price_services import DailyPriceService
+from ..database_setup import BasicInformation, DailyInformation
+from .bulk_operations import bulk_upsert, content_hash, fetch_existing_values, fetch_rows_by_keys
+from .data_update_date_service import DataUpdateDateService, DAILY_INFO_VERSION
+from .model_utilities import get_current_date
+from .screener_cache import screener_cache
+
+
+logger = get_logger(__name__)
+
+DAILY_INFORMATION_COLUMNS = [
+    column.name for column in DailyInformation.__table__.columns
+    if column.name not in ('stock_id', 'update_date')
+]
+# Snapshot fields that only go to daily_price
+DAILY_PRICE_ONLY_COLUMNS = ['成交量']
+# Large enough for the whole market in one statement
+SNAPSHOT_CHUNK_SIZE = 2000
+
+
+class DailyInformationService:
+    def __init__(self):
+        pass
+
+    def bulk_upsert_daily_information(self, snapshot) -> dict:
+        """
+        Write an end-of-day snapshot of many stocks to daily_information.
+
+        Existing rows are loaded with one IN query and compared with the
+        snapshot by content hash over the submitted columns and update_date,
+        so resending a snapshot on the same day leaves daily_information
+        untouched. Inserted and updated rows go out in one multi-row upsert
+        per column set.
+
+        Items with 本日收盤價 are also appended to daily_price for
+        update_date in the same transaction.
+
+        Args:
+            snapshot: List of dicts in the handleDailyInfo POST format plus stock_id
+
+        Returns:
+            dict: Counts of inserted, updated, unchanged, duplicate and invalid
+                  items, and {'index', 'stock_id', 'error'} of invalid items
+        """
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0, 'invalid': 0, 'errors': []}
+        update_date = get_current_date()
+
+        rows = {}
+        prices = {}
+        for index, item in enumerate(snapshot):
+            try:
+                row = self._validate_daily_information(item)
+            except (TypeError, ValueError) as ex:
+                stats['invalid'] += 1
+                stats['errors'].append({
+                    'index': index,
+                    'stock_id': item.get('stock_id') if isinstance(item, dict) else None,
+                    'error': str(ex)
+                })
+                continue
+            price = {column: row.pop(column) for column in DAILY_PRICE_ONLY_COLUMNS if column in row}
+            # The last item of a repeated stock_id wins
+            if row['stock_id'] in rows:
+                stats['duplicate'] += 1
+            rows[row['stock_id']] = (index, dict(row, update_date=update_date))
+            prices.pop(row['stock_id'], None)
+            if row.get('本日收盤價') is not None:
+                prices[row['stock_id']] = dict(
+                    price, stock_id=row['stock_id'], trade_date=update_date,
+                    收盤價=row['本日收盤價'], 漲跌=row.get('本日漲跌'))
+
+        if not rows:
+            return stats
+
+        existing_stock_ids = fetch_existing_values(BasicInformation.id, rows, SNAPSHOT_CHUNK_SIZE)
+        existing_rows = fetch_rows_by_keys(
+            DailyInformation, ['stock_id'], ['update_date'] + DAILY_INFORMATION_COLUMNS,
+            [(stock_id,) for stock_id in existing_stock_ids & set(rows)], SNAPSHOT_CHUNK_SIZE)
+
+        groups = {}
+        for stock_id, (index, row) in rows.items():
+            if stock_id not in existing_stock_ids:
+                stats['invalid'] += 1
+                stats['errors'].append({'index': index, 'stock_id': stock_id, 'error': f'Unknown stock: {stock_id}'})
+                continue
+
+            columns = [column for column in ['update_date'] + DAILY_INFORMATION_COLUMNS if column in row]
+            existing = existing_rows.get((stock_id,))
+            if existing is None:
+                stats['inserted'] += 1
+            elif content_hash(existing, columns) == content_hash(row, columns):
+                stats['unchanged'] += 1
+                continue
+            else:
+                stats['updated'] += 1
+            # bulk_upsert needs rows with the same columns
+            groups.setdefault(tuple(columns), []).append(row)
+
+        try:
+            for columns, group in groups.items():
+                bulk_upsert(DailyInformation, group, ['stock_id'], list(columns), SNAPSHOT_CHUNK_SIZE)
+            DailyPriceService().append_daily_prices(
+                [price for stock_id, price in prices.items() if stock_id in existing_stock_ids])
+            DataUpdateDateService().bump_data_versions(
+                [row['stock_id'] for group in groups.values() for row in group], DAILY_INFO_VERSION)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if groups:
+            screener_cache.invalidate()
+        logger.info(
+            f"Daily information snapshot: {stats['inserted']} inserted, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['invalid']} invalid")
+        return stats
+
+    @staticmethod
+    def _validate_daily_information(item):
+        if not isinstance(item, dict):
+            raise ValueError('Daily information must be an object')
+        if item.get('stock_id') is None:
+            raise ValueError('Missing fields: stock_id')
+        unknown = [
+            column for column in item
+            if column not in DAILY_INFORMATION_COLUMNS + DAILY_PRICE_ONLY_COLUMNS + ['stock_id', 'update_date']
+        ]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        row = {column: item[column] for column in DAILY_INFORMATION_COLUMNS if column in item}
+        if item.get('成交量') is not None:
+            row['成交量'] = int(item['成交量'])
+        row['stock_id'] = str(item['stock_id'])
+        return row
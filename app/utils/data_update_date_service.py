@@ -1,11 +1,18 @@
 from ..database_setup import DataUpdateDate
 from app.log_config import get_logger
 from datetime import date
+from uuid import uuid4
 from .. import db
+from .bulk_operations import bulk_upsert
 
 
 logger = get_logger(__name__)
 
+# Version of IncomeSheet, MonthRevenue and MonthlyValuation rows of a stock
+FUNDAMENTALS_VERSION = 'fundamentals_version'
+# Version of the DailyInformation row of a stock
+DAILY_INFO_VERSION = 'daily_info_version'
+
 
 class DataUpdateDateService:
     def __init__(self):
@@ -25,6 +32,26 @@ class DataUpdateDateService:
         db.session.commit()
         return data_update_date
 
+    def bulk_update_last_update(self, stock_ids, column, update_date=None) -> int:
+        """
+        Set column to update_date (today by default) for every stock in
+        stock_ids with one upsert, creating missing rows. Not committed.
+        """
+        update_date = update_date or date.today()
+        rows = [{'stock_id': stock_id, column: update_date} for stock_id in sorted(set(stock_ids))]
+        return bulk_upsert(DataUpdateDate, rows, ['stock_id'], [column], chunk_size=max(len(rows), 1))
+
+    def bump_data_versions(self, stock_ids, column) -> int:
+        """
+        Give every stock in stock_ids a new version token in column
+        (FUNDAMENTALS_VERSION or DAILY_INFO_VERSION) with one upsert,
+        creating missing rows. Not committed, so the new token lands in the
+        same transaction as the data it describes.
+        """
+        version = uuid4().hex
+        rows = [{'stock_id': stock_id, column: version} for stock_id in sorted(set(stock_ids))]
+        return bulk_upsert(DataUpdateDate, rows, ['stock_id'], [column])
+
     def update_announcement_update_date(self, stock_id):
         data_update_date = self.get_data_update_date(stock_id)
 
@@ -0,0 +1,65 @@
+from .bulk_operations import bulk_upsert_records, content_hash
+
+
+STATEMENT_KEY_COLUMNS = ['stock_id', 'year', 'season']
+
+
+def statement_value_columns(model) -> list:
+    """Columns of a statement model covered by its content_digest."""
+    return [
+        column.name for column in model.__table__.columns
+        if column.name not in STATEMENT_KEY_COLUMNS + ['id', 'update_date', 'content_digest']
+    ]
+
+
+def statement_digest(model, statement) -> str:
+    """content_digest of statement, a dict or a model instance."""
+    columns = statement_value_columns(model)
+    if not isinstance(statement, dict):
+        statement = {column: getattr(statement, column) for column in columns}
+    return content_hash(statement, columns)
+
+
+class FinancialStatementServices():
+    """
+    Batch writes for the seasonal statement tables (BalanceSheet, CashFlow)
+    keyed by (stock_id, year, season).
+
+    Every row stores a content_digest of its value columns, so a batch only
+    loads (key, content_digest) pairs to find the rows that changed.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.value_columns = statement_value_columns(model)
+
+    def bulk_upsert_statements(self, statements) -> list:
+        """
+        Create or update many statements in one transaction, see
+        bulk_upsert_records.
+
+        Like the single POST, only the columns present in an item are set;
+        the stored values of the other columns are kept, so the digest is
+        compared over the merged row.
+
+        Args:
+            statements: List of dicts in the single POST format plus stock_id
+
+        Returns:
+            list: Per-item {'index', 'stock_id', 'year', 'season', 'status', 'error'},
+                  where status is created, updated, unchanged, duplicate,
+                  invalid or failed
+        """
+        return bulk_upsert_records(
+            self.model, STATEMENT_KEY_COLUMNS, self.value_columns, statements,
+            self._normalize_statement, digest_column='content_digest'
+        )
+
+    def _normalize_statement(self, statement) -> dict:
+        season = str(statement['season'])
+        if season not in ('1', '2', '3', '4'):
+            raise ValueError('season must be 1, 2, 3, or 4')
+
+        row = {column: statement[column] for column in self.value_columns if column in statement}
+        row.update({'stock_id': str(statement['stock_id']), 'year': int(statement['year']), 'season': season})
+        return row
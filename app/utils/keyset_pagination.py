@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class KeysetPage:
+    """One page of a keyset paginated query."""
+
+    def __init__(self, items, next_cursor, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(time_value, id_value) -> str:
+    """Encode the (time, id) key of the last row into an opaque cursor."""
+    raw = json.dumps([time_value.isoformat(), id_value])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor, raising ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        time_value, id_value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(time_value), int(id_value)
+    except (TypeError, ValueError, UnicodeError) as ex:
+        raise ValueError('Invalid cursor') from ex
+
+
+def paginate_by_keyset(query, time_column, id_column, cursor=None, page_size=15, with_total=False) -> KeysetPage:
+    """
+    Paginate query newest first on (time_column, id_column).
+
+    Each page seeks past the last row of the previous page instead of using
+    OFFSET, so every page costs the same regardless of depth. The COUNT(*)
+    over the filtered query only runs when with_total is set.
+
+    Args:
+        query: Filtered query, without ordering
+        time_column: Datetime column to sort on, e.g. Feed.releaseTime
+        id_column: Unique tie-breaker column, e.g. Feed.id
+        cursor: next_cursor of the previous page, None for the first page
+        page_size: Rows per page
+        with_total: Also count every row matching query
+
+    Returns:
+        KeysetPage
+
+    Raises:
+        ValueError: If cursor is malformed or page_size is below 1
+    """
+    if page_size < 1:
+        raise ValueError('page_size must be at least 1')
+
+    total = query.order_by(None).count() if with_total else None
+
+    if cursor:
+        last_time, last_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            time_column < last_time,
+            and_(time_column == last_time, id_column < last_id)
+        ))
+
+    rows = query.order_by(time_column.desc(), id_column.desc()).limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+
+    return KeysetPage(rows, next_cursor, total)
@@ -10,3 +10,18 @@ def get_current_date() -> date:
 def get_UUID() -> str:
     """Return a random UUID hex string."""
     return uuid.uuid4().hex
+
+
+def calculate_quantile(values, quantile: float = 0.5):
+    """Return the linearly interpolated quantile of values, rounded to 2 places."""
+    if not values:
+        return None
+
+    sorted_values = sorted(values)
+    n = len(sorted_values)
+    idx = quantile * (n - 1)
+    lower = int(idx)
+    upper = min(lower + 1, n - 1)
+    weight = idx - lower
+    quantile_value = sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+    return round(quantile_value, 2)
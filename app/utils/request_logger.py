@@ -41,7 +41,8 @@ def register_request_logging(app):
         if request.method == 'GET' and request.query_string:
             kwargs['query'] = request.query_string.decode('utf-8', errors='replace')
 
-        if request.method in ('POST', 'PUT', 'PATCH'):
+        # CSV uploads are read as a stream by the view, so leave them unread
+        if request.method in ('POST', 'PUT', 'PATCH') and request.mimetype != 'text/csv':
             body = request.get_json(silent=True, force=True)
             if isinstance(body, dict):
                 kwargs['body'] = _mask(body)
@@ -0,0 +1,225 @@
+import calendar
+import time
+from bisect import bisect_right
+from datetime import date, datetime
+
+from app import db
+from app.log_config import get_logger
+from app.database_setup import IncomeSheet
+from app.models.screener_backtest_result import ScreenerBacktestResult
+from app.monthly_valuation.models import MonthlyValuation, MonthlyValuationStatistics
+from app.utils.bulk_operations import DEFAULT_CHUNK_SIZE, bulk_upsert, chunked
+from app.utils.model_utilities import calculate_quantile
+from app.utils.stock_screener import StockScreenerManager
+
+
+logger = get_logger(__name__)
+
+
+class ScreenerBacktest:
+    """
+    Replay a screener option over past month-end dates.
+
+    The option's screener SQL runs once per date to get the candidates;
+    rule based options are instead evaluated in memory over metric arrays
+    loaded once. The IncomeSheet and MonthlyValuation history of every
+    candidate is then loaded once into per-stock sorted arrays, and the
+    valuation check of each date is evaluated point-in-time against those
+    arrays instead of querying per stock. Results are written to screener_backtest_results
+    in bulk as the dates are evaluated.
+
+    DailyInformation only holds the latest close, so the historical price
+    of a stock is the 均價 of the newest month known at that date.
+    """
+
+    RESULT_INDEX_ELEMENTS = ['filter_model', 'backtest_date', 'stock_id']
+
+    def __init__(self, option, start_date, end_date, flush_size=DEFAULT_CHUNK_SIZE):
+        self.option = option
+        self.start_date = self._to_date(start_date)
+        self.end_date = self._to_date(end_date)
+        self.flush_size = flush_size
+        self.income_sheets = {}
+        self.monthly_valuations = {}
+
+    @staticmethod
+    def _to_date(value) -> date:
+        if isinstance(value, str):
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    @staticmethod
+    def get_month_end_dates(start_date, end_date) -> list:
+        """Return every month-end datetime between start_date and end_date."""
+        dates = []
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            month_end = datetime(year, month, calendar.monthrange(year, month)[1])
+            if start_date <= month_end.date() <= end_date:
+                dates.append(month_end)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return dates
+
+    @staticmethod
+    def get_previous_month(backtest_date):
+        """(year, month) of the newest complete month at backtest_date."""
+        if backtest_date.month == 1:
+            return backtest_date.year - 1, 12
+        return backtest_date.year, backtest_date.month - 1
+
+    def get_first_history_year(self) -> int:
+        return self.start_date.year - MonthlyValuationStatistics.PE_YEARS - 1
+
+    def load_history(self, stock_ids):
+        """Load the IncomeSheet and MonthlyValuation history of stock_ids."""
+        first_year = self.get_first_history_year()
+        income_rows = []
+        valuation_rows = []
+        for chunk in chunked(list(stock_ids)):
+            income_rows += db.session.query(
+                IncomeSheet.stock_id, IncomeSheet.year, IncomeSheet.season,
+                IncomeSheet.基本每股盈餘, IncomeSheet.營業利益率, IncomeSheet.稅前淨利率
+            ).filter(
+                IncomeSheet.stock_id.in_(chunk),
+                IncomeSheet.year >= first_year
+            ).all()
+            valuation_rows += db.session.query(
+                MonthlyValuation.stock_id, MonthlyValuation.year, MonthlyValuation.month,
+                MonthlyValuation.均價, MonthlyValuation.本益比
+            ).filter(
+                MonthlyValuation.stock_id.in_(chunk),
+                MonthlyValuation.year >= first_year
+            ).all()
+
+        # Enum columns sort as strings on some backends, so sort numerically here
+        income_sheets = {}
+        for row in sorted(income_rows, key=lambda row: (row.stock_id, row.year, int(row.season))):
+            keys, values = income_sheets.setdefault(row.stock_id, ([], []))
+            keys.append((row.year, int(row.season)))
+            values.append((
+                row.基本每股盈餘,
+                float(row.營業利益率) if row.營業利益率 is not None else None,
+                float(row.稅前淨利率) if row.稅前淨利率 is not None else None,
+            ))
+
+        monthly_valuations = {}
+        for row in sorted(valuation_rows, key=lambda row: (row.stock_id, row.year, int(row.month))):
+            keys, prices, pe_list = monthly_valuations.setdefault(row.stock_id, ([], [], []))
+            keys.append((row.year, int(row.month)))
+            prices.append(float(row.均價) if row.均價 is not None else None)
+            pe_list.append(float(row.本益比) if row.本益比 is not None else None)
+
+        self.income_sheets = income_sheets
+        self.monthly_valuations = monthly_valuations
+        logger.info(
+            f"Loaded backtest history: {len(income_rows)} income sheets, "
+            f"{len(valuation_rows)} monthly valuations"
+        )
+
+    def evaluate(self, stock_id, backtest_date, query_condition) -> bool:
+        """Apply the screener valuation check as of backtest_date."""
+        income_sheets = self.income_sheets.get(stock_id)
+        monthly_valuations = self.monthly_valuations.get(stock_id)
+        if not income_sheets or not monthly_valuations:
+            return False
+
+        keys, values = income_sheets
+        end = bisect_right(keys, (query_condition['year'], query_condition['season']))
+        if end == 0:
+            return False
+        eps, operating_margin, pretax_margin = values[end - 1]
+
+        keys, prices, pe_list = monthly_valuations
+        end = bisect_right(keys, self.get_previous_month(backtest_date))
+        if end == 0:
+            return False
+
+        recent_prices = [price for price in prices[max(0, end - 3):end] if price is not None]
+        pe_window = pe_list[max(0, end - MonthlyValuationStatistics.PE_YEARS * 12):end]
+
+        return StockScreenerManager.is_valuation_acceptable(
+            eps=eps,
+            operating_margin=operating_margin,
+            pretax_margin=pretax_margin,
+            average_monthly_price=round(sum(recent_prices) / len(recent_prices), 2) if recent_prices else None,
+            pe_median=calculate_quantile([pe for pe in pe_window if pe is not None], 0.5),
+            stock_price=prices[end - 1]
+        )
+
+    def _flush(self, rows) -> int:
+        if not rows:
+            return 0
+        try:
+            count = bulk_upsert(ScreenerBacktestResult, rows, self.RESULT_INDEX_ELEMENTS, [])
+            db.session.commit()
+            return count
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Failed to save backtest results for '{self.option}': {ex}", exc_info=True)
+            raise
+
+    def run(self) -> dict:
+        """
+        Run the backtest and store the passed stocks of every date.
+
+        Returns:
+            dict: Per-date passed stock IDs, counts and elapsed seconds
+        """
+        started = time.perf_counter()
+        dates = self.get_month_end_dates(self.start_date, self.end_date)
+
+        # Rule based options are evaluated in memory, sqlSyntax options query per date
+        rule_set = StockScreenerManager.get_rule_set(self.option)
+        metric_arrays = rule_set.load_metric_arrays(self.get_first_history_year()) if rule_set else None
+
+        candidates = []
+        for backtest_date in dates:
+            manager = StockScreenerManager(self.option, backtest_date)
+            if rule_set is not None:
+                stocks = rule_set.evaluate(metric_arrays, backtest_date)
+            else:
+                stocks = manager.get_candidate_stocks()
+            candidates.append((backtest_date, manager.query_condition, stocks))
+
+        stock_ids = {stock[0] for _, _, stocks in candidates for stock in stocks}
+        self.load_history(stock_ids)
+
+        results = {}
+        buffer = []
+        saved = 0
+        create_time = datetime.utcnow()
+        for backtest_date, query_condition, stocks in candidates:
+            passed_stock_ids = list(dict.fromkeys(
+                stock[0] for stock in stocks
+                if self.evaluate(stock[0], backtest_date, query_condition)
+            ))
+            results[query_condition['date']] = passed_stock_ids
+            buffer += [
+                {
+                    'stock_id': stock_id,
+                    'backtest_date': backtest_date.date(),
+                    'filter_model': self.option,
+                    'create_time': create_time,
+                }
+                for stock_id in passed_stock_ids
+            ]
+            if len(buffer) >= self.flush_size:
+                saved += self._flush(buffer)
+                buffer = []
+        saved += self._flush(buffer)
+
+        elapsed = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Backtest '{self.option}' over {len(dates)} dates: "
+            f"{len(stock_ids)} candidate stocks, {saved} results in {elapsed}s"
+        )
+        return {
+            'option': self.option,
+            'date_count': len(dates),
+            'candidate_count': len(stock_ids),
+            'saved': saved,
+            'elapsed_seconds': elapsed,
+            'results': results,
+        }
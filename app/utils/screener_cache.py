@@ -0,0 +1,189 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+
+from app.log_config import get_logger
+from ..database_setup import DataUpdateDate
+from .. import db
+from .. import redis_client
+
+
+logger = get_logger(__name__)
+
+# Column value types of screener rows that JSON cannot hold, tagged by name
+_VALUE_DECODERS = {
+    'decimal': Decimal,
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+}
+
+
+def _encode_value(value):
+    if isinstance(value, Decimal):
+        return {'decimal': str(value)}
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'date': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        (tag, raw), = value.items()
+        return _VALUE_DECODERS[tag](raw)
+    return value
+
+
+class ScreenerCache:
+    """
+    Redis cache of screener results.
+
+    Entries are keyed by (option, query_condition, data watermark) under the
+    current cache generation. The watermark changes whenever income sheet,
+    month revenue or monthly valuation data changes, and ingestion of those
+    and of daily information (prices) bumps the generation through
+    invalidate(), so stale results are never served. The watermark is
+    memoized for WATERMARK_SECONDS so lookups do not query it every time.
+
+    Rows are stored as JSON with Decimal and date values tagged, so reading
+    the cache never runs code from Redis. Redis errors and unreadable
+    entries are logged and treated as a cache miss.
+    """
+
+    KEY_PREFIX = 'screener_cache'
+    GENERATION_KEY = f'{KEY_PREFIX}:generation'
+    STATS_KEY = f'{KEY_PREFIX}:stats'
+    EXPIRE_SECONDS = 24 * 60 * 60
+    WATERMARK_SECONDS = 5
+
+    def __init__(self):
+        self._watermark = None
+        self._watermark_expires = 0
+        self._watermark_lock = threading.Lock()
+
+    def get_data_watermark(self) -> str:
+        """Return the latest change date of the data the screener reads."""
+        from ..monthly_valuation.models import MonthlyValuationStatistics
+
+        valuation_update = select(
+            func.max(MonthlyValuationStatistics.update_time)).scalar_subquery()
+        watermark = db.session.query(
+            func.max(DataUpdateDate.month_revenue_last_update),
+            func.max(DataUpdateDate.income_sheet_last_update),
+            valuation_update
+        ).one()
+        return '|'.join(str(value) for value in watermark)
+
+    def _get_memoized_watermark(self) -> str:
+        with self._watermark_lock:
+            now = time.monotonic()
+            if self._watermark is None or now >= self._watermark_expires:
+                self._watermark = self.get_data_watermark()
+                self._watermark_expires = now + self.WATERMARK_SECONDS
+            return self._watermark
+
+    def _get_generation(self) -> int:
+        generation = redis_client.get(self.GENERATION_KEY)
+        return int(generation) if generation else 0
+
+    def build_key(self, option, query_condition) -> str:
+        """Build the cache key of a screener run, None if Redis is unavailable."""
+        try:
+            generation = self._get_generation()
+        except RedisError as ex:
+            logger.warning(f'Screener cache unavailable: {ex}')
+            return None
+
+        fingerprint = json.dumps(
+            [option, query_condition, self._get_memoized_watermark()],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        digest = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+        return f'{self.KEY_PREFIX}:{generation}:{digest}'
+
+    def get(self, cache_key, option):
+        """Return the cached stock rows or None, counting the hit/miss."""
+        if cache_key is None:
+            return None
+
+        try:
+            cached = redis_client.get(cache_key)
+            outcome = 'hits' if cached is not None else 'misses'
+            pipeline = redis_client.pipeline()
+            pipeline.hincrby(self.STATS_KEY, outcome, 1)
+            pipeline.hincrby(self.STATS_KEY, f'{option}:{outcome}', 1)
+            pipeline.execute()
+        except RedisError as ex:
+            logger.warning(f'Failed to read screener cache: {ex}')
+            return None
+
+        if cached is None:
+            return None
+        try:
+            return [tuple(_decode_value(value) for value in stock) for stock in json.loads(cached)]
+        except (ValueError, TypeError, KeyError) as ex:
+            logger.warning(f'Unreadable screener cache entry {cache_key}: {ex}')
+            return None
+
+    def set(self, cache_key, stocks):
+        """Store the screener result rows."""
+        if cache_key is None:
+            return
+
+        try:
+            payload = json.dumps(
+                [[_encode_value(value) for value in stock] for stock in stocks], ensure_ascii=False)
+        except TypeError as ex:
+            logger.warning(f'Failed to serialize screener result: {ex}')
+            return
+
+        try:
+            redis_client.set(cache_key, payload, ex=self.EXPIRE_SECONDS)
+        except RedisError as ex:
+            logger.warning(f'Failed to write screener cache: {ex}')
+
+    def invalidate(self):
+        """Drop every cached result by moving to a new cache generation."""
+        with self._watermark_lock:
+            self._watermark = None
+        try:
+            redis_client.incr(self.GENERATION_KEY)
+        except RedisError as ex:
+            logger.warning(f'Failed to invalidate screener cache: {ex}')
+
+    def get_stats(self) -> dict:
+        """Return overall and per-option hit/miss counters."""
+        try:
+            raw_stats = redis_client.hgetall(self.STATS_KEY)
+        except RedisError as ex:
+            logger.warning(f'Failed to read screener cache stats: {ex}')
+            raw_stats = {}
+
+        counters = {
+            key.decode('utf-8') if isinstance(key, bytes) else key: int(value)
+            for key, value in raw_stats.items()
+        }
+        hits = counters.pop('hits', 0)
+        misses = counters.pop('misses', 0)
+
+        options = {}
+        for key, value in counters.items():
+            option, outcome = key.rsplit(':', 1)
+            options.setdefault(option, {'hits': 0, 'misses': 0})[outcome] = value
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+            'options': options
+        }
+
+
+screener_cache = ScreenerCache()
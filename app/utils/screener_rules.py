@@ -0,0 +1,283 @@
+import math
+import operator
+
+from sqlalchemy import and_, bindparam, func, or_, select
+
+from app import db
+from app.log_config import get_logger
+from app.database_setup import BasicInformation, IncomeSheet, MonthRevenue
+from app.monthly_valuation.models import MonthlyValuation
+
+
+logger = get_logger(__name__)
+
+
+COMPARATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# source name -> (model, period column name, period type)
+METRIC_SOURCES = {
+    'basic_information': (BasicInformation, None, None),
+    'month_revenue': (MonthRevenue, 'month', 'month'),
+    'monthly_valuation': (MonthlyValuation, 'month', 'month'),
+    'income_sheet': (IncomeSheet, 'season', 'season'),
+}
+
+
+def get_newest_month(screen_date):
+    """(year, month) of the newest published month revenue at screen_date."""
+    if screen_date.month == 1:
+        return screen_date.year - 1, 12
+    return screen_date.year, screen_date.month - 1
+
+
+def get_newest_season(screen_date):
+    """(year, season) of the newest published income sheet at screen_date."""
+    season = (math.ceil(screen_date.month / 3) - 2) % 4 + 1
+    year = screen_date.year - 1 if season == 4 else screen_date.year
+    return year, season
+
+
+def get_period_window(period_type, screen_date, lookback):
+    """Return the newest lookback periods at screen_date, newest first."""
+    if period_type == 'month':
+        year, period = get_newest_month(screen_date)
+        periods_per_year = 12
+    else:
+        year, period = get_newest_season(screen_date)
+        periods_per_year = 4
+
+    window = []
+    for _ in range(lookback):
+        window.append((year, period))
+        year, period = (year - 1, periods_per_year) if period == 1 else (year, period - 1)
+    return window
+
+
+class ScreenerMetric:
+    """A 'source.column' metric, e.g. 'month_revenue.去年同月增減'."""
+
+    def __init__(self, name):
+        source, _, column_name = name.partition('.')
+        if source not in METRIC_SOURCES:
+            raise ValueError(f"Unknown metric source '{source}' in '{name}'")
+
+        model, period_name, period_type = METRIC_SOURCES[source]
+        if column_name not in model.__table__.columns:
+            raise ValueError(f"Unknown metric column '{column_name}' in '{name}'")
+
+        self.name = name
+        self.model = model
+        self.column = getattr(model, column_name)
+        self.period_column = getattr(model, period_name) if period_name else None
+        self.period_type = period_type
+
+    @property
+    def stock_column(self):
+        return self.model.id if self.model is BasicInformation else self.model.stock_id
+
+    def period_clause(self, param_prefix):
+        return and_(
+            self.model.year == bindparam(f'{param_prefix}_year'),
+            self.period_column == bindparam(f'{param_prefix}_period'),
+        )
+
+    @staticmethod
+    def period_params(param_prefix, period) -> dict:
+        year, value = period
+        return {f'{param_prefix}_year': year, f'{param_prefix}_period': str(value)}
+
+
+class ScreenerRule:
+    """
+    metric <comparator> value, holding in each of the newest lookback periods.
+
+    Built from a rule dict of screener_format.json:
+        {"metric": "month_revenue.去年同月增減", "comparator": ">", "value": 20, "lookback": 3}
+    """
+
+    def __init__(self, index, metric, comparator, value, lookback=1):
+        if comparator not in COMPARATORS:
+            raise ValueError(f"Unknown comparator '{comparator}'")
+
+        self.metric = ScreenerMetric(metric)
+        if self.metric.period_type is None and lookback != 1:
+            raise ValueError(f"'{metric}' has no periods, lookback must be 1")
+        if lookback < 1:
+            raise ValueError('lookback must be at least 1')
+
+        self.param_prefix = f'rule{index}'
+        self.comparator = comparator
+        self.value = value
+        self.lookback = lookback
+
+    def build_condition(self):
+        """Return the WHERE clause on basic_information.id, using bound parameters only."""
+        compare = COMPARATORS[self.comparator]
+        value = bindparam(f'{self.param_prefix}_value')
+        metric = self.metric
+        if metric.period_type is None:
+            return compare(metric.column, value)
+
+        matched = select(metric.stock_column).where(
+            or_(*[metric.period_clause(f'{self.param_prefix}_{i}') for i in range(self.lookback)]),
+            compare(metric.column, value)
+        ).group_by(metric.stock_column).having(func.count() == self.lookback)
+        return BasicInformation.id.in_(matched)
+
+    def get_params(self, screen_date) -> dict:
+        params = {f'{self.param_prefix}_value': self.value}
+        if self.metric.period_type is not None:
+            window = get_period_window(self.metric.period_type, screen_date, self.lookback)
+            for i, period in enumerate(window):
+                params.update(self.metric.period_params(f'{self.param_prefix}_{i}', period))
+        return params
+
+    def evaluate(self, series, screen_date) -> bool:
+        """
+        Evaluate the rule on a stock's metric series.
+
+        Args:
+            series: The metric value for basic_information metrics, else
+                    {(year, period): value} of the stock
+            screen_date: Date the screener is run for
+        """
+        compare = COMPARATORS[self.comparator]
+        if self.metric.period_type is None:
+            return series is not None and compare(series, self.value)
+
+        if not series:
+            return False
+        for period in get_period_window(self.metric.period_type, screen_date, self.lookback):
+            value = series.get(period)
+            if value is None or not compare(value, self.value):
+                return False
+        return True
+
+
+class ScreenerRuleSet:
+    """
+    A declarative screener option compiled once into a parameterized query.
+
+    The SELECT statement only contains bound parameters, so it is built once
+    per option and reused for every date; only the parameter values change
+    between runs. evaluate() applies the same rules to metric arrays loaded
+    by load_metric_arrays(), for evaluating many dates without querying.
+
+    Result rows are (stock_id, *columns), where each column is read at the
+    newest period of screen_date, same as the rows of a sqlSyntax option.
+    """
+
+    def __init__(self, rules, columns=None):
+        if not rules:
+            raise ValueError('A rule based screener needs at least one rule')
+
+        self.rules = [ScreenerRule(index, **rule) for index, rule in enumerate(rules)]
+        column_names = columns or list(dict.fromkeys(rule.metric.name for rule in self.rules))
+        self.columns = [ScreenerMetric(name) for name in column_names]
+        self.statement = self._build_statement()
+
+    @classmethod
+    def from_format(cls, screener_format):
+        return cls(screener_format['rules'], screener_format.get('columns'))
+
+    @property
+    def metrics(self) -> list:
+        metrics = {metric.name: metric for metric in self.columns}
+        metrics.update({rule.metric.name: rule.metric for rule in self.rules})
+        return list(metrics.values())
+
+    def _build_statement(self):
+        selected = [BasicInformation.id]
+        for index, metric in enumerate(self.columns):
+            if metric.period_type is None:
+                selected.append(metric.column)
+                continue
+            selected.append(
+                select(metric.column).where(
+                    metric.stock_column == BasicInformation.id,
+                    metric.period_clause(f'column{index}')
+                ).scalar_subquery()
+            )
+
+        return select(*selected).where(
+            *[rule.build_condition() for rule in self.rules]
+        ).order_by(BasicInformation.id)
+
+    def get_params(self, screen_date) -> dict:
+        params = {}
+        for rule in self.rules:
+            params.update(rule.get_params(screen_date))
+        for index, metric in enumerate(self.columns):
+            if metric.period_type is not None:
+                newest = get_period_window(metric.period_type, screen_date, 1)[0]
+                params.update(metric.period_params(f'column{index}', newest))
+        return params
+
+    def execute(self, screen_date) -> list:
+        """Run the compiled statement for screen_date."""
+        return db.session.execute(self.statement, self.get_params(screen_date)).fetchall()
+
+    def load_metric_arrays(self, first_year=None, stock_ids=None) -> dict:
+        """
+        Load every metric the rule set reads, one query per metric.
+
+        Returns:
+            dict: {metric name: {stock_id: value}} for basic_information
+                  metrics, else {metric name: {stock_id: {(year, period): value}}}
+        """
+        arrays = {}
+        for metric in self.metrics:
+            if metric.period_type is None:
+                query = db.session.query(metric.stock_column, metric.column)
+            else:
+                query = db.session.query(
+                    metric.stock_column, metric.model.year, metric.period_column, metric.column)
+                if first_year is not None:
+                    query = query.filter(metric.model.year >= first_year)
+            if stock_ids is not None:
+                query = query.filter(metric.stock_column.in_(stock_ids))
+
+            values = {}
+            for row in query.all():
+                if metric.period_type is None:
+                    values[row[0]] = row[1]
+                else:
+                    values.setdefault(row[0], {})[(row[1], int(row[2]))] = row[3]
+            arrays[metric.name] = values
+        return arrays
+
+    def evaluate(self, metric_arrays, screen_date) -> list:
+        """In-memory equivalent of execute() over load_metric_arrays() output."""
+        stock_ids = set(metric_arrays[self.rules[0].metric.name])
+        for rule in self.rules[1:]:
+            stock_ids &= set(metric_arrays[rule.metric.name])
+
+        newest_periods = {
+            period_type: get_period_window(period_type, screen_date, 1)[0]
+            for period_type in ('month', 'season')
+        }
+
+        rows = []
+        for stock_id in sorted(stock_ids):
+            if not all(
+                rule.evaluate(metric_arrays[rule.metric.name].get(stock_id), screen_date)
+                for rule in self.rules
+            ):
+                continue
+
+            row = [stock_id]
+            for metric in self.columns:
+                series = metric_arrays[metric.name].get(stock_id)
+                if metric.period_type is None:
+                    row.append(series)
+                else:
+                    row.append((series or {}).get(newest_periods[metric.period_type]))
+            rows.append(tuple(row))
+        return rows
@@ -0,0 +1,140 @@
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.log_config import get_logger
+from app.utils.discord_bot import DiscordBot
+from app.utils.screener_cache import screener_cache
+from app.utils.stock_screener import StockScreenerManager
+
+
+logger = get_logger(__name__)
+
+
+class ScreenerRunner:
+    """
+    Run several screener options concurrently.
+
+    Each option's screener SQL and save step run on a bounded thread pool,
+    every worker inside its own app context and therefore with its own
+    session and pooled DB connection. The valuation check runs once over
+    the union of all options' candidates, so a stock shared by several
+    options is only valued once.
+    """
+
+    def __init__(self, options=None, date=None, max_workers=4):
+        self.options = list(options or StockScreenerManager.load_screener_formats().keys())
+        # Celery and the CLI pass the date as 'YYYY-MM-DD'
+        self.date = datetime.strptime(date, '%Y-%m-%d') if isinstance(date, str) else date
+        self.max_workers = max(1, min(max_workers, len(self.options) or 1))
+
+    @staticmethod
+    def _call_in_app_context(app, func, *args):
+        with app.app_context():
+            return func(*args)
+
+    def _map(self, func, items):
+        app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(
+                lambda item: self._call_in_app_context(app, func, item), items))
+
+    @staticmethod
+    def _fetch_candidates(manager):
+        started = time.perf_counter()
+        result = {'cache_key': None, 'cached_stocks': None, 'candidates': [], 'error': None}
+        try:
+            result['cache_key'] = screener_cache.build_key(manager.option, manager.query_condition)
+            result['cached_stocks'] = screener_cache.get(result['cache_key'], manager.option)
+            if result['cached_stocks'] is None:
+                result['candidates'] = [tuple(stock) for stock in manager.get_candidate_stocks()]
+        except Exception as ex:
+            logger.error(f"Screener '{manager.option}' query failed: {ex}", exc_info=True)
+            result['error'] = str(ex)
+        result['query_seconds'] = round(time.perf_counter() - started, 3)
+        return result
+
+    @staticmethod
+    def _save(job):
+        manager, filter_stocks = job
+        started = time.perf_counter()
+        result = {'save_stats': {"added": 0, "skipped": 0, "total": 0}, 'messages': [], 'error': None}
+        try:
+            if filter_stocks:
+                result['save_stats'] = manager.save_recommended_stock(filter_stocks)
+                result['messages'] = manager.format_screener_message(filter_stocks)
+        except Exception as ex:
+            logger.error(f"Screener '{manager.option}' save failed: {ex}", exc_info=True)
+            result['error'] = str(ex)
+        result['save_seconds'] = round(time.perf_counter() - started, 3)
+        return result
+
+    def run(self) -> dict:
+        """
+        Run every option and save the recommended stocks.
+
+        Returns:
+            dict: Overall timing, shared valuation stats and per-option
+                  timings, save_stats and messages
+        """
+        started = time.perf_counter()
+        managers = [StockScreenerManager(option, self.date) for option in self.options]
+        logger.info(f"Running {len(managers)} screener options with {self.max_workers} workers")
+
+        fetched = self._map(self._fetch_candidates, managers)
+
+        # Value every distinct candidate once, shared by all options
+        valuation_started = time.perf_counter()
+        candidate_ids = list(dict.fromkeys(
+            stock[0]
+            for fetch in fetched if fetch['cached_stocks'] is None
+            for stock in fetch['candidates']
+        ))
+        passed_stock_ids = managers[0].check_stocks_valuation(candidate_ids) if candidate_ids else set()
+        valuation_seconds = round(time.perf_counter() - valuation_started, 3)
+
+        jobs = []
+        for manager, fetch in zip(managers, fetched):
+            if fetch['cached_stocks'] is not None:
+                filter_stocks = fetch['cached_stocks']
+            else:
+                filter_stocks = [stock for stock in fetch['candidates'] if stock[0] in passed_stock_ids]
+                if fetch['error'] is None:
+                    screener_cache.set(fetch['cache_key'], filter_stocks)
+            jobs.append((manager, filter_stocks))
+
+        saved = self._map(self._save, jobs)
+
+        options = {}
+        for manager, fetch, (_, filter_stocks), save in zip(managers, fetched, jobs, saved):
+            options[manager.option] = {
+                'cached': fetch['cached_stocks'] is not None,
+                'candidate_count': len(fetch['candidates']),
+                'stock_count': len(filter_stocks),
+                'query_seconds': fetch['query_seconds'],
+                'save_seconds': save['save_seconds'],
+                'save_stats': save['save_stats'],
+                'messages': save['messages'],
+                'error': fetch['error'] or save['error'],
+            }
+
+        return {
+            'date': managers[0].query_condition['date'] if managers else None,
+            'elapsed_seconds': round(time.perf_counter() - started, 3),
+            'valuation': {
+                'candidate_count': len(candidate_ids),
+                'passed_count': len(passed_stock_ids),
+                'seconds': valuation_seconds,
+            },
+            'options': options,
+        }
+
+    @staticmethod
+    def push_messages(result):
+        """Push every option's messages to Discord."""
+        discord_bot = DiscordBot()
+        for option, option_result in result['options'].items():
+            for message in option_result['messages']:
+                discord_bot.push_message(option, message)
@@ -5,9 +5,12 @@ import os
 from pathlib import Path
 from app.log_config import get_logger
 
-from sqlalchemy import text
-from app.database_setup import BasicInformation
+from sqlalchemy import text, func
+from app.database_setup import BasicInformation, IncomeSheet, DailyInformation
+from app.monthly_valuation.monthly_valuation_services import MonthlyValuationService
 from app.models.recommended_stock import RecommendedStock
+from app.utils.screener_cache import screener_cache
+from app.utils.screener_rules import ScreenerRuleSet
 
 from .. import db
 
@@ -15,6 +18,8 @@ logger = get_logger(__name__)
 
 
 class StockScreenerManager:
+    # {config path: (mtime, formats, compiled rule sets)}, reloaded when the file changes
+    _format_cache = {}
 
     def __init__(self, option, date=None):
         self.option = option
@@ -29,7 +34,8 @@ class StockScreenerManager:
             "monthList": month_list
         }
 
-    def get_screener_format(self, option):
+    @staticmethod
+    def get_screener_format_path() -> Path:
         override = os.environ.get('SCREENER_FORMAT_PATH')
         if override:
             config_path = Path(override)
@@ -37,30 +43,93 @@ class StockScreenerManager:
                 config_path = Path(__file__).parent.parent.parent / config_path
         else:
             config_path = Path(__file__).parent.parent.parent / 'critical_file' / 'screener_format.json'
+        return config_path
 
+    @classmethod
+    def _load_format_cache(cls):
+        config_path = cls.get_screener_format_path()
         try:
-            with open(config_path, 'r', encoding='utf-8') as reader:
-                config = json.load(reader)
-                if option not in config:
-                    logger.error(f"Option '{option}' not found in screener_format.json")
-                    raise KeyError(f"Invalid screener option: {option}")
-                return config[option]
+            mtime = config_path.stat().st_mtime
         except FileNotFoundError:
             logger.error(f"Screener format file not found at: {config_path}")
             raise
+
+        cached = cls._format_cache.get(str(config_path))
+        if cached and cached[0] == mtime:
+            return cached
+
+        try:
+            with open(config_path, 'r', encoding='utf-8') as reader:
+                formats = json.load(reader)
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in screener_format.json: {e}")
             raise
 
+        # Compile the rule based options once per file version
+        rule_sets = {
+            option: ScreenerRuleSet.from_format(screener_format)
+            for option, screener_format in formats.items()
+            if 'rules' in screener_format
+        }
+        cls._format_cache[str(config_path)] = (mtime, formats, rule_sets)
+        return cls._format_cache[str(config_path)]
+
+    @classmethod
+    def load_screener_formats(cls) -> dict:
+        """Load every option defined in screener_format.json."""
+        return cls._load_format_cache()[1]
+
+    @classmethod
+    def get_rule_set(cls, option):
+        """Compiled ScreenerRuleSet of a rule based option, None for sqlSyntax options."""
+        return cls._load_format_cache()[2].get(option)
+
+    def get_screener_format(self, option):
+        config = self.load_screener_formats()
+        if option not in config:
+            logger.error(f"Option '{option}' not found in screener_format.json")
+            raise KeyError(f"Invalid screener option: {option}")
+        return config[option]
+
+    def get_candidate_stocks(self) -> list:
+        """Run the option's screener query and return the candidate rows."""
+        rule_set = self.get_rule_set(self.option)
+        if rule_set is not None:
+            return rule_set.execute(self.now)
+
+        sql_command = self.screener_format['sqlSyntax'].format(**self.query_condition)
+        with db.engine.connect() as conn:
+            return conn.execute(text(sql_command)).fetchall()
+
+    def filter_stocks_by_valuation(self, stocks) -> list:
+        """Keep the candidate rows whose stock passes the batch valuation check."""
+        passed_stock_ids = self.check_stocks_valuation([stock[0] for stock in stocks])
+        return [stock for stock in stocks if stock[0] in passed_stock_ids]
+
+    def get_screened_stocks(self) -> list:
+        """
+        Candidate rows that passed the valuation check.
+
+        Served from ScreenerCache while the underlying data is unchanged.
+        """
+        cache_key = screener_cache.build_key(self.option, self.query_condition)
+        filter_stocks = screener_cache.get(cache_key, self.option)
+        if filter_stocks is not None:
+            logger.info(f"Screener cache hit for '{self.option}': {len(filter_stocks)} stocks")
+            return filter_stocks
+
+        stocks = self.get_candidate_stocks()
+        logger.info(f"Found {len(stocks)} stocks from initial query")
+
+        filter_stocks = self.filter_stocks_by_valuation(stocks) if stocks else []
+        logger.info(f"After valuation check: {len(filter_stocks)} stocks passed")
+
+        screener_cache.set(cache_key, filter_stocks)
+        return filter_stocks
+
     def screener(self) -> list:
         try:
-            sql_command = self.screener_format['sqlSyntax'].format(**self.query_condition)
-            with db.engine.connect() as conn:
-                stocks = conn.execute(text(sql_command)).fetchall()
-
-            logger.info(f"Found {len(stocks)} stocks from initial query")
-            filter_stocks = [stock for stock in stocks if self.check_stock_valuation(stock[0])]
-            logger.info(f"After valuation check: {len(filter_stocks)} stocks passed")
+            filter_stocks = self.get_screened_stocks()
 
             if not filter_stocks:
                 return []
@@ -105,7 +174,7 @@ class StockScreenerManager:
         try:
             # Extract stock IDs from the result tuples
             stock_ids = [stock[0] for stock in stocks]
-            update_date = self.query_condition['date']
+            update_date = datetime.strptime(self.query_condition['date'], '%Y-%m-%d').date()
 
             # Bulk query existing records to avoid N+1 problem
             existing_stocks = db.session.query(RecommendedStock.stock_id).filter(
@@ -159,21 +228,11 @@ class StockScreenerManager:
         """
         logger.info(f"Starting screener workflow for '{self.option}' on {self.query_condition['date']}")
 
-        # Get raw stock data
-        sql_command = self.screener_format['sqlSyntax'].format(**self.query_condition)
-        with db.engine.connect() as conn:
-            stocks = conn.execute(text(sql_command)).fetchall()
-
-        if not stocks:
-            logger.info(f"No stocks found for '{self.option}'")
-            return {"messages": [], "save_stats": {"added": 0, "skipped": 0, "total": 0}}
-
-        # Filter stocks
-        logger.info(f"Found {len(stocks)} stocks, applying valuation checks...")
-        filter_stocks = [stock for stock in stocks if self.check_stock_valuation(stock[0])]
-        logger.info(f"{len(filter_stocks)} stocks passed valuation checks")
+        # Get stocks that passed the screener query and valuation checks
+        filter_stocks = self.get_screened_stocks()
 
         if not filter_stocks:
+            logger.info(f"No stocks passed '{self.option}'")
             return {"messages": [], "save_stats": {"added": 0, "skipped": 0, "total": 0}}
 
         # Save to database
@@ -250,48 +309,118 @@ class StockScreenerManager:
         if not stock:
             return False
 
-        # Get required data and check for None early
         last_income_sheet = stock.get_newest_season_income_sheet()
         if not last_income_sheet:
             return False
 
-        average_monthly_price = stock.get_average_monthly_price(3)
-        if average_monthly_price is None:
-            return False
+        return self.is_valuation_acceptable(
+            eps=getattr(last_income_sheet, '基本每股盈餘', None),
+            operating_margin=getattr(last_income_sheet, '營業利益率', None),
+            pretax_margin=getattr(last_income_sheet, '稅前淨利率', None),
+            average_monthly_price=stock.get_average_monthly_price(3),
+            pe_median=stock.get_pe_quantile(0.5, 5),
+            stock_price=stock.daily_information.本日收盤價 if stock.daily_information else None
+        )
 
-        # Check if daily_information exists before accessing
-        if not stock.daily_information or stock.daily_information.本日收盤價 is None:
-            return False
+    def check_stocks_valuation(self, stock_ids) -> set:
+        """
+        Batch version of check_stock_valuation for a whole candidate list.
+
+        The newest income sheet, the valuation statistics and the
+        DailyInformation row of every candidate are loaded with one query
+        each, so the number of queries stays constant regardless of how many
+        candidates the screener SQL returns.
 
-        # Get EPS - use consistent attribute access
-        last_income_sheet_eps = getattr(last_income_sheet, '基本每股盈餘', None)
-        if last_income_sheet_eps is None or last_income_sheet_eps <= 0.3:
+        Args:
+            stock_ids: Iterable of stock IDs
+
+        Returns:
+            set: Stock IDs that passed the valuation checks
+        """
+        stock_ids = list(dict.fromkeys(stock_ids))
+        if not stock_ids:
+            return set()
+
+        income_sheets = self._load_newest_income_sheets(stock_ids)
+        valuation_statistics = MonthlyValuationService().get_valuation_statistics(stock_ids)
+        stock_prices = dict(
+            db.session.query(DailyInformation.stock_id, DailyInformation.本日收盤價).filter(
+                DailyInformation.stock_id.in_(stock_ids)
+            ).all()
+        )
+
+        passed_stock_ids = set()
+        for stock_id in stock_ids:
+            income_sheet = income_sheets.get(stock_id)
+            statistics = valuation_statistics.get(stock_id)
+            if income_sheet is None or statistics is None:
+                continue
+
+            if self.is_valuation_acceptable(
+                eps=income_sheet.基本每股盈餘,
+                operating_margin=income_sheet.營業利益率,
+                pretax_margin=income_sheet.稅前淨利率,
+                average_monthly_price=statistics['近三月均價'],
+                pe_median=statistics['本益比中位數'],
+                stock_price=stock_prices.get(stock_id)
+            ):
+                passed_stock_ids.add(stock_id)
+
+        logger.info(f"Batch valuation: {len(passed_stock_ids)}/{len(stock_ids)} stocks passed")
+        return passed_stock_ids
+
+    @staticmethod
+    def _load_newest_income_sheets(stock_ids) -> dict:
+        """Return {stock_id: row} of the newest season income sheet per stock."""
+        ranked = db.session.query(
+            IncomeSheet.stock_id,
+            IncomeSheet.基本每股盈餘,
+            IncomeSheet.營業利益率,
+            IncomeSheet.稅前淨利率,
+            func.row_number().over(
+                partition_by=IncomeSheet.stock_id,
+                order_by=(IncomeSheet.year.desc(), IncomeSheet.season.desc())
+            ).label('row_number')
+        ).filter(IncomeSheet.stock_id.in_(stock_ids)).subquery()
+
+        rows = db.session.query(ranked).filter(ranked.c.row_number == 1).all()
+        return {row.stock_id: row for row in rows}
+
+    @staticmethod
+    def is_valuation_acceptable(
+        eps, operating_margin, pretax_margin,
+        average_monthly_price, pe_median, stock_price
+    ) -> bool:
+        """
+        Apply the screener valuation rules to already loaded figures.
+
+        - EPS of the newest season must be above 0.3
+        - core business ratio (營業利益率 / 稅前淨利率) must be above 0.7
+        - price must be below 1.25x the recent average monthly price
+        - annualized PE must be below the 5 year PE median
+        """
+        if average_monthly_price is None or stock_price is None:
             return False
 
-        # Calculate core business ratio
-        營業利益率 = getattr(last_income_sheet, '營業利益率', None)
-        稅前淨利率 = getattr(last_income_sheet, '稅前淨利率', None)
+        if eps is None or eps <= 0.3:
+            return False
 
-        if 營業利益率 is None or 稅前淨利率 is None or 稅前淨利率 == 0:
+        if operating_margin is None or pretax_margin is None or pretax_margin == 0:
             return False
 
-        core_business_ratio = 營業利益率 / 稅前淨利率
+        core_business_ratio = operating_margin / pretax_margin
         if core_business_ratio <= 0.7:
             return False
 
-        # Get PE average
-        pe_average = stock.get_pe_quantile(0.5, 5)
-        if pe_average is None:
+        if pe_median is None:
             return False
 
-        # Parse stock price
         try:
-            stock_price = float(stock.daily_information.本日收盤價)
+            stock_price = float(stock_price)
         except (ValueError, TypeError):
             return False
 
-        # Final valuation checks
         return (
             stock_price < (average_monthly_price * 1.25) and
-            (stock_price / (last_income_sheet_eps * 4)) < pe_average
+            (stock_price / (eps * 4)) < pe_median
         )
@@ -1,15 +1,43 @@
 from app.log_config import get_logger
 from datetime import datetime, timedelta
 
+from redis.exceptions import LockError, RedisError
+from sqlalchemy import case, update
+
 from ..database_setup import StockSearchCounts
 from .. import db
 from .. import redis_client
+from .autocomplete_index import autocomplete_index
 
 
 logger = get_logger(__name__)
 
+# Counts a search once per user and day: SADD to the user's set of the day,
+# and only when it was new, expire the set at midnight and add one to the
+# pending delta of the stock. Returns 1 when counted, 0 otherwise.
+INCREASE_SEARCH_COUNT_SCRIPT = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('EXPIREAT', KEYS[1], ARGV[2])
+redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+return 1
+"""
+
 
 class StockSearchCountService:
+    """
+    Search counts are accumulated in Redis and written to stock_search_counts
+    by flush_stock_search_counts, so a stock page view takes one Redis round
+    trip instead of a row lock on the stock.
+    """
+
+    DELTAS_KEY = 'stock_search_count:deltas'
+    # Deltas taken by a flush, kept until they are committed
+    FLUSHING_KEY = 'stock_search_count:flushing'
+    FLUSH_LOCK_KEY = 'stock_search_count:flush_lock'
+    FLUSH_LOCK_SECONDS = 60
+
     def __init__(self):
         pass
 
@@ -42,20 +70,81 @@ class StockSearchCountService:
             return None
 
     def increase_stock_search_count(self, user_email, stock_id):
-        redis_search_count_key = f'{user_email}:search_count'
-        if redis_client.sismember(redis_search_count_key, stock_id):
-            return None
+        """
+        Count a view of stock_id, at most once per user and day.
 
-        redis_client.sadd(redis_search_count_key, stock_id)
-        redis_client.expireat(
-            redis_search_count_key,
-            datetime.today().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(1)
-        )
+        Returns:
+            bool: Whether the view was counted
+        """
+        expire_at = datetime.today().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(1)
+        try:
+            counted = redis_client.eval(
+                INCREASE_SEARCH_COUNT_SCRIPT, 2,
+                f'{user_email}:search_count', self.DELTAS_KEY,
+                stock_id, int(expire_at.timestamp())
+            )
+        except RedisError as ex:
+            logger.warning(f'Failed to increase stock {stock_id} search count: {ex}')
+            return False
+
+        if counted:
+            autocomplete_index.add_search_count(stock_id)
+        return bool(counted)
+
+    def flush_stock_search_counts(self) -> int:
+        """
+        Add the search counts accumulated in Redis to stock_search_counts
+        with one UPDATE.
+
+        The deltas are moved to FLUSHING_KEY first, so views counted during
+        the flush go to the next one, and deltas of a failed flush are
+        retried by the next one. FLUSHING_KEY is cleared right after the
+        commit; if Redis fails at that point the error is logged with the
+        deltas, which the next flush would apply again.
+
+        Returns:
+            int: Number of stocks updated, -1 when another flush is running
+        """
+        lock = redis_client.lock(self.FLUSH_LOCK_KEY, timeout=self.FLUSH_LOCK_SECONDS)
+        if not lock.acquire(blocking=False):
+            return -1
 
         try:
-            stock_search_count = StockSearchCounts.query.with_for_update().get(stock_id)
-            stock_search_count.search_count += 1
-            db.session.commit()
-        except Exception as ex:
-            db.session.rollback()
-            logger.exception(f'Failed to increase stock {stock_id} search count: {ex}')
+            if not redis_client.exists(self.FLUSHING_KEY):
+                if not redis_client.exists(self.DELTAS_KEY):
+                    return 0
+                redis_client.rename(self.DELTAS_KEY, self.FLUSHING_KEY)
+
+            deltas = {
+                (stock_id.decode('utf-8') if isinstance(stock_id, bytes) else stock_id): int(delta)
+                for stock_id, delta in redis_client.hgetall(self.FLUSHING_KEY).items()
+            }
+            if not deltas:
+                redis_client.delete(self.FLUSHING_KEY)
+                return 0
+
+            try:
+                db.session.execute(
+                    update(StockSearchCounts)
+                    .where(StockSearchCounts.stock_id.in_(list(deltas)))
+                    .values(search_count=StockSearchCounts.search_count + case(
+                        deltas, value=StockSearchCounts.stock_id, else_=0))
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                redis_client.delete(self.FLUSHING_KEY)
+            except RedisError as ex:
+                # Committed, but the next flush will apply these deltas again
+                logger.error(f'Failed to clear flushed stock search counts {deltas}: {ex}')
+            except Exception as ex:
+                db.session.rollback()
+                logger.exception(f'Failed to flush stock search counts: {ex}')
+                raise
+
+            logger.info(f'Flushed search counts of {len(deltas)} stocks')
+            return len(deltas)
+        finally:
+            try:
+                lock.release()
+            except (LockError, RedisError) as ex:
+                logger.warning(f'Failed to release stock search count flush lock: {ex}')
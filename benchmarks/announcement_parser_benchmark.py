@@ -0,0 +1,198 @@
+"""
+Announcement parser micro-benchmark.
+
+Measures AnnounceHandler.get_incomesheet_announce throughput in pages per
+second over a corpus of saved announcement pages, next to the previous
+BeautifulSoup based parser, and checks that both return the same values.
+
+The corpus is every *.html file in --pages (the test fixtures by default)
+or every page in an announcement page cache file:
+
+    python -m benchmarks.announcement_parser_benchmark --output baseline.json
+    python -m benchmarks.announcement_parser_benchmark --cache cache/mops_pages.sqlite3 --compare baseline.json
+"""
+import argparse
+import json
+import re
+import sqlite3
+import statistics
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.screener_benchmark import get_git_commit
+
+
+DEFAULT_PAGES_DIR = Path(__file__).parent.parent / 'tests' / 'fixtures' / 'announcements'
+
+
+def parse_with_soup(handler, html):
+    """The BeautifulSoup parser get_incomesheet_announce used before, kept as reference."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    target_text = None
+    for trigger in ('營業收入', '收入'):
+        for tag in soup.find_all(['font', 'pre', 'td']):
+            if trigger in tag.text:
+                target_text = tag.text
+                break
+        if target_text is not None:
+            break
+    if target_text is None:
+        raise ValueError("Cannot find income sheet data on the announcement page")
+
+    announcement_income_sheet = dict.fromkeys([
+        '營業收入合計', '營業毛利', '營業毛利率', '營業利益', '營業利益率', '稅前淨利',
+        '稅前淨利率', '本期淨利', '本期淨利率', '母公司業主淨利', '基本每股盈餘'
+    ])
+    for line in target_text.split('\n'):
+        for key in handler.data_key:
+            search_term = handler._search_alias.get(key, key)
+            if search_term in line:
+                parts = re.split(r'[:：]', line, maxsplit=1)
+                if len(parts) < 2:
+                    break
+                try:
+                    raw = re.sub(r'\(\D+\)', '', parts[1])
+                    raw = re.sub(r'[,\$]', '', raw)
+                    raw = re.sub(r'[一-龥]', '', raw).strip()
+                    if not raw:
+                        value = None
+                    elif re.search(r'\(\d+\.?\d*\)', raw):
+                        value = float('-' + re.sub(r'[()]', '', raw))
+                    else:
+                        value = float(raw)
+                    announcement_income_sheet[key] = value
+                except (ValueError, IndexError):
+                    pass
+                break
+    return announcement_income_sheet
+
+
+def load_pages_dir(pages_dir) -> dict:
+    return {path.name: path.read_text(encoding='utf-8') for path in sorted(Path(pages_dir).glob('*.html'))}
+
+
+def load_page_cache(cache_path) -> dict:
+    connection = sqlite3.connect(cache_path)
+    try:
+        return {
+            link: zlib.decompress(body).decode('utf-8')
+            for link, body in connection.execute('SELECT link, body FROM pages ORDER BY link')
+        }
+    finally:
+        connection.close()
+
+
+def parse_result(parse, handler, html):
+    try:
+        return parse(handler, html)
+    except ValueError as ex:
+        return {'error': str(ex)}
+
+
+def measure_throughput(parse, handler, pages, repeat) -> dict:
+    """Parse every page repeat times and return the median pages per second."""
+    rates = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in pages:
+            parse_result(parse, handler, html)
+        rates.append(len(pages) / max(time.perf_counter() - started, 1e-9))
+    return {
+        'pages_per_second': round(statistics.median(rates), 1),
+        'max_pages_per_second': round(max(rates), 1),
+    }
+
+
+def run_benchmark(pages, repeat) -> dict:
+    from app.utils.announcement_handler import AnnounceHandler
+
+    handler = AnnounceHandler()
+    mismatches = [
+        name for name, html in pages.items()
+        if parse_result(AnnounceHandler.get_incomesheet_announce, handler, html)
+        != parse_result(parse_with_soup, handler, html)
+    ]
+    corpus = list(pages.values())
+    return {
+        'page_count': len(corpus),
+        'corpus_bytes': sum(len(html.encode('utf-8')) for html in corpus),
+        'streaming': measure_throughput(AnnounceHandler.get_incomesheet_announce, handler, corpus, repeat),
+        'soup': measure_throughput(parse_with_soup, handler, corpus, repeat),
+        'mismatches': mismatches,
+    }
+
+
+def compare_results(baseline, current, threshold) -> list:
+    """Return a regression message if streaming throughput dropped more than threshold."""
+    base = baseline.get('results', {}).get('streaming', {}).get('pages_per_second')
+    rate = current['results']['streaming']['pages_per_second']
+    if base and rate < base * (1 - threshold):
+        return [f'streaming: {base} -> {rate} pages/s']
+    return []
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--pages', default=str(DEFAULT_PAGES_DIR), help='Directory of saved *.html pages')
+    parser.add_argument('--cache', help='Announcement page cache file to use as corpus instead of --pages')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed throughput drop ratio before it counts as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pages = load_page_cache(args.cache) if args.cache else load_pages_dir(args.pages)
+    if not pages:
+        print('No announcement pages found')
+        return 1
+
+    results = run_benchmark(pages, args.repeat)
+    print(
+        f"{results['page_count']} pages ({results['corpus_bytes']} bytes): "
+        f"streaming {results['streaming']['pages_per_second']} pages/s, "
+        f"soup {results['soup']['pages_per_second']} pages/s"
+    )
+    for name in results['mismatches']:
+        print(f'  result differs from the soup parser: {name}')
+
+    report = {
+        'meta': {
+            'commit': get_git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'corpus': args.cache or args.pages,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        print(f'Wrote results to {args.output}')
+
+    if results['mismatches']:
+        return 1
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            print('Regressions against ' + args.compare + ':')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print(f'No regressions against {args.compare}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
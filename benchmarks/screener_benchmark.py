@@ -0,0 +1,217 @@
+"""
+Screener benchmark suite.
+
+Times StockScreenerManager.screener, run_and_save, check_stock_valuation,
+check_stocks_valuation and save_recommended_stock per screener option on a
+synthetic market, and records wall time and query counts to a JSON file
+that later runs can be compared against.
+
+Runs on its own database (SQLite by default), never on the app database:
+
+    python -m benchmarks.screener_benchmark --generate --output baseline.json
+    python -m benchmarks.screener_benchmark --compare baseline.json
+
+Options come from benchmarks/screener_format.json unless
+SCREENER_FORMAT_PATH is set.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+BENCHMARK_DIR = Path(__file__).parent
+DEFAULT_DATABASE_URL = f'sqlite:///{BENCHMARK_DIR / "benchmark.db"}'
+DEFAULT_FORMAT_PATH = BENCHMARK_DIR / 'screener_format.json'
+
+
+class QueryCounter:
+    """Count the statements executed on an engine inside a with block."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc_info):
+        from sqlalchemy import event
+
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+def measure(func, repeat, setup=None) -> dict:
+    """Run func repeat times and return the median/min wall time and query count."""
+    from app import db
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with QueryCounter(db.engine) as counter:
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        queries = counter.count
+
+    return {
+        'seconds': round(statistics.median(timings), 4),
+        'min_seconds': round(min(timings), 4),
+        'queries': queries,
+    }
+
+
+def benchmark_option(option, screen_date, repeat) -> dict:
+    """Benchmark every screener step of a single option."""
+    from app import db
+    from app.models.recommended_stock import RecommendedStock
+    from app.utils.screener_cache import screener_cache
+    from app.utils.stock_screener import StockScreenerManager
+
+    manager = StockScreenerManager(option, screen_date)
+
+    def reset():
+        # Start every run from a cold screener cache and no saved recommendations
+        screener_cache.invalidate()
+        RecommendedStock.query.filter_by(filter_model=option).delete()
+        db.session.commit()
+
+    candidates = manager.get_candidate_stocks()
+    candidate_ids = [stock[0] for stock in candidates]
+    passed = manager.filter_stocks_by_valuation(candidates)
+
+    return {
+        'candidate_count': len(candidates),
+        'passed_count': len(passed),
+        'screener': measure(manager.screener, repeat, reset),
+        'check_stock_valuation': measure(
+            lambda: [manager.check_stock_valuation(stock_id) for stock_id in candidate_ids], repeat),
+        'check_stocks_valuation': measure(
+            lambda: manager.check_stocks_valuation(candidate_ids), repeat),
+        'save_recommended_stock': measure(
+            lambda: manager.save_recommended_stock(passed), repeat, reset),
+        'run_and_save': measure(manager.run_and_save, repeat, reset),
+    }
+
+
+def compare_results(baseline, current, threshold) -> list:
+    """Return the benchmarks that got slower than threshold or run more queries."""
+    regressions = []
+    for option, benchmarks in current['results'].items():
+        for name, result in benchmarks.items():
+            base = baseline.get('results', {}).get(option, {}).get(name)
+            if not isinstance(result, dict) or not isinstance(base, dict):
+                continue
+            if result['seconds'] > base['seconds'] * (1 + threshold):
+                regressions.append(
+                    f"{option}.{name}: {base['seconds']}s -> {result['seconds']}s")
+            if result['queries'] > base['queries']:
+                regressions.append(
+                    f"{option}.{name}: {base['queries']} -> {result['queries']} queries")
+    return regressions
+
+
+def get_git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database-url', default=DEFAULT_DATABASE_URL)
+    parser.add_argument('--generate', action='store_true', help='Regenerate the synthetic market')
+    parser.add_argument('--stocks', type=int, default=1800)
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--end-year', type=int, default=2024)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--option', dest='options', action='append', help='Option to run (all if omitted)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown ratio before a benchmark counts as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # The benchmark owns its database; point the testing config at it
+    os.environ['TEST_DATABASE_URL'] = args.database_url
+    os.environ.setdefault('SCREENER_FORMAT_PATH', str(DEFAULT_FORMAT_PATH))
+
+    from app import create_app, db
+    from app.utils.stock_screener import StockScreenerManager
+    from benchmarks.synthetic_market import generate_market
+
+    app = create_app('testing')
+    with app.app_context():
+        db.engine.echo = False
+        db.create_all()
+
+        if args.generate:
+            started = time.perf_counter()
+            counts = generate_market(args.stocks, args.years, args.end_year, args.seed)
+            print(f'Generated synthetic market in {time.perf_counter() - started:.1f}s: {counts}')
+
+        # May: Q1 income sheets and April revenue are the newest published data
+        screen_date = datetime(args.end_year, 5, 15)
+        options = args.options or list(StockScreenerManager.load_screener_formats().keys())
+
+        results = {}
+        for option in options:
+            results[option] = benchmark_option(option, screen_date, args.repeat)
+            print(f'{option}: ' + ', '.join(
+                f"{name} {result['seconds']}s/{result['queries']}q"
+                for name, result in results[option].items() if isinstance(result, dict)
+            ))
+
+    report = {
+        'meta': {
+            'commit': get_git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'dialect': args.database_url.split(':', 1)[0],
+            'stocks': args.stocks,
+            'years': args.years,
+            'end_year': args.end_year,
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        print(f'Wrote results to {args.output}')
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            print('Regressions against ' + args.compare + ':')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print(f'No regressions against {args.compare}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
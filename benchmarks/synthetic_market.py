@@ -0,0 +1,200 @@
+"""
+Synthetic market dataset for screener benchmarks.
+
+Generates BasicInformation, MonthRevenue, IncomeSheet, MonthlyValuation and
+DailyInformation rows with realistic shapes (per-stock growth trends,
+seasonality, margins, PE random walks) from a fixed seed, so every run on
+every commit screens the same market.
+"""
+import random
+from datetime import date
+
+from sqlalchemy import delete
+
+from app import db
+from app.database_setup import (
+    BasicInformation, DailyInformation, IncomeSheet, MonthRevenue
+)
+from app.models.recommended_stock import RecommendedStock
+from app.models.screener_backtest_result import ScreenerBacktestResult
+from app.monthly_valuation.models import MonthlyValuation, MonthlyValuationStatistics
+from app.monthly_valuation.monthly_valuation_services import MonthlyValuationService
+from app.utils.bulk_operations import chunked
+from app.log_config import get_logger
+
+
+logger = get_logger(__name__)
+
+INSERT_CHUNK_SIZE = 5000
+INDUSTRIES = ['半導體業', '電子零組件業', '電腦及週邊設備業', '光電業', '通信網路業',
+              '航運業', '金融保險業', '鋼鐵工業', '塑膠工業', '生技醫療業', '食品工業', '其他']
+
+SYNTHETIC_TABLES = [
+    RecommendedStock, ScreenerBacktestResult, MonthlyValuationStatistics, MonthlyValuation,
+    DailyInformation, IncomeSheet, MonthRevenue, BasicInformation
+]
+
+
+def _insert(model, rows):
+    for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+        db.session.execute(model.__table__.insert(), chunk)
+
+
+def clear_market():
+    """Delete every row of the tables the generator fills."""
+    for model in SYNTHETIC_TABLES:
+        db.session.execute(delete(model))
+    db.session.commit()
+
+
+def _generate_stock(stock_id, rng, first_year, end_year):
+    """Return the rows of a single stock keyed by model."""
+    capital = rng.choice([5, 10, 20, 50, 100, 250]) * 10 ** 8
+    shares = capital // 10
+    base_revenue = capital * rng.uniform(0.05, 0.6)
+    annual_growth = rng.gauss(0.06, 0.12)
+    gross_margin = rng.uniform(8, 55)
+    operating_margin = gross_margin * rng.uniform(0.2, 0.7)
+    pe = rng.uniform(8, 30)
+
+    basic_information = {
+        'id': stock_id,
+        'update_date': date(end_year, 1, 1),
+        '公司名稱': f'合成{stock_id}股份有限公司',
+        '公司簡稱': f'合成{stock_id}',
+        '產業類別': rng.choice(INDUSTRIES),
+        'exchange_type': rng.choice(['sii', 'otc']),
+        '實收資本額': capital,
+        '已發行普通股數或TDR原發行股數': shares,
+    }
+
+    month_revenues = []
+    monthly_valuations = []
+    income_sheets = []
+    revenues = {}
+    ttm_eps = []
+    price = None
+    for year in range(first_year, end_year + 1):
+        for month in range(1, 13):
+            trend = (1 + annual_growth) ** (year - first_year + month / 12)
+            seasonal = 1 + 0.08 * ((month % 12) - 6) / 6
+            revenue = int(base_revenue / 12 * trend * seasonal * rng.uniform(0.85, 1.15))
+            revenues[(year, month)] = revenue
+
+            last_month = revenues.get((year, month - 1) if month > 1 else (year - 1, 12))
+            last_year = revenues.get((year - 1, month))
+            accumulated = sum(revenues[(year, m)] for m in range(1, month + 1))
+            last_accumulated = sum(revenues.get((year - 1, m), 0) for m in range(1, month + 1))
+            month_revenues.append({
+                'stock_id': stock_id,
+                'year': year,
+                'month': str(month),
+                'update_date': date(year + 1, 1, 10) if month == 12 else date(year, month + 1, 10),
+                '當月營收': revenue,
+                '上月營收': last_month,
+                '去年當月營收': last_year,
+                '上月比較增減': round((revenue / last_month - 1) * 100, 2) if last_month else None,
+                '去年同月增減': round((revenue / last_year - 1) * 100, 2) if last_year else None,
+                '當月累計營收': accumulated,
+                '去年累計營收': last_accumulated or None,
+                '前期比較增減': round((accumulated / last_accumulated - 1) * 100, 2) if last_accumulated else None,
+            })
+
+            if month % 3 == 0:
+                season = month // 3
+                season_revenue = sum(revenues[(year, m)] for m in range(month - 2, month + 1))
+                season_gross_margin = gross_margin + rng.gauss(0, 2)
+                season_operating_margin = operating_margin + rng.gauss(0, 2)
+                pretax_margin = season_operating_margin + rng.uniform(-1, 4)
+                net_margin = pretax_margin * 0.8
+                net_income = int(season_revenue * net_margin / 100)
+                eps = round(net_income / shares, 2)
+                ttm_eps = (ttm_eps + [eps])[-4:]
+                income_sheets.append({
+                    'stock_id': stock_id,
+                    'year': year,
+                    'season': str(season),
+                    'update_date': date(year + 1, 3, 31) if season == 4 else date(year, month + 2, 14),
+                    '營業收入合計': season_revenue,
+                    '營業成本合計': int(season_revenue * (1 - season_gross_margin / 100)),
+                    '營業毛利': int(season_revenue * season_gross_margin / 100),
+                    '營業毛利率': round(season_gross_margin, 2),
+                    '營業利益': int(season_revenue * season_operating_margin / 100),
+                    '營業利益率': round(season_operating_margin, 2),
+                    '稅前淨利': int(season_revenue * pretax_margin / 100),
+                    '稅前淨利率': round(pretax_margin, 2),
+                    '本期淨利': net_income,
+                    '本期淨利率': round(net_margin, 2),
+                    '母公司業主淨利': net_income,
+                    '基本每股盈餘': eps,
+                    '稀釋每股盈餘': eps,
+                })
+
+            pe = min(max(pe * rng.uniform(0.92, 1.08), 5), 60)
+            eps_sum = sum(ttm_eps) if ttm_eps else 0
+            price = round(max(eps_sum * pe, 5 + rng.uniform(0, 20)), 2)
+            monthly_valuations.append({
+                'stock_id': stock_id,
+                'year': year,
+                'month': str(month),
+                '本益比': round(pe, 2) if eps_sum > 0 else None,
+                '淨值比': round(rng.uniform(0.6, 6), 2),
+                '殖利率': round(rng.uniform(0, 8), 2),
+                '均價': price,
+            })
+
+    close = round(price * rng.uniform(0.85, 1.2), 2)
+    daily_information = {
+        'stock_id': stock_id,
+        'update_date': date(end_year, 12, 31),
+        '本日收盤價': close,
+        '本日漲跌': round(close * rng.gauss(0, 0.02), 2),
+        '近四季每股盈餘': round(sum(ttm_eps), 2),
+        '本益比': round(close / sum(ttm_eps), 2) if sum(ttm_eps) > 0 else None,
+        '殖利率': round(rng.uniform(0, 8), 2),
+        '股價淨值比': round(rng.uniform(0.6, 6), 2),
+    }
+
+    return {
+        BasicInformation: [basic_information],
+        MonthRevenue: month_revenues,
+        IncomeSheet: income_sheets,
+        MonthlyValuation: monthly_valuations,
+        DailyInformation: [daily_information],
+    }
+
+
+def generate_market(stock_count=1800, years=20, end_year=2024, seed=42) -> dict:
+    """
+    Replace the market tables with a synthetic market.
+
+    Args:
+        stock_count: Number of BasicInformation rows
+        years: Years of history ending at end_year
+        end_year: Last year of history
+        seed: Random seed, the same seed always generates the same market
+
+    Returns:
+        dict: Row count per table
+    """
+    rng = random.Random(seed)
+    first_year = end_year - years + 1
+    clear_market()
+
+    counts = {}
+    stock_ids = [str(1101 + index) for index in range(stock_count)]
+    # Insert in batches of stocks so memory stays flat for large markets
+    for batch in chunked(stock_ids, 100):
+        rows = {}
+        for stock_id in batch:
+            for model, model_rows in _generate_stock(stock_id, rng, first_year, end_year).items():
+                rows.setdefault(model, []).extend(model_rows)
+        for model in [BasicInformation, MonthRevenue, IncomeSheet, MonthlyValuation, DailyInformation]:
+            _insert(model, rows[model])
+            counts[model.__tablename__] = counts.get(model.__tablename__, 0) + len(rows[model])
+        db.session.commit()
+        logger.info(f'Generated {counts[BasicInformation.__tablename__]}/{stock_count} synthetic stocks')
+
+    counts[MonthlyValuationStatistics.__tablename__] = \
+        MonthlyValuationService().rebuild_valuation_statistics()
+    return counts
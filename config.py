@@ -58,6 +58,12 @@ class Config:
     broker_connection_retry_on_startup = True
     result_expires = 1800
     worker_concurrency = os.environ.get('CELERY_WORKER_CONCURRENCY') or 2
+    beat_schedule = {
+        'flush-stock-search-counts': {
+            'task': 'app.tasks.search_count_task.tasks.flush_stock_search_counts',
+            'schedule': float(os.environ.get('STOCK_SEARCH_COUNT_FLUSH_SECONDS') or 60)
+        }
+    }
 
     CLIENT_SECRET = client_secret
 
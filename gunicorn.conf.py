@@ -60,3 +60,9 @@ def on_starting(server):
 
     _add_rotating_handler('gunicorn.access', 'log/gunicorn_access.log')
     _add_rotating_handler('gunicorn.error',  'log/gunicorn_error.log')
+
+
+def post_worker_init(worker):
+    # Answer /f/autocomplete from memory, built before the worker takes requests
+    from app.utils.autocomplete_index import autocomplete_index
+    autocomplete_index.start(worker.wsgi)
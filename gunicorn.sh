@@ -40,4 +40,5 @@ if [ -f "$PIDFILE" ]; then
 fi
 
 # nohup celery -A celery_worker.celery worker &
+# nohup celery -A celery_worker.celery beat &  # flushes stock search counts
 exit 0
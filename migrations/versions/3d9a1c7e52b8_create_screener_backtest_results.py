@@ -0,0 +1,41 @@
+"""create_screener_backtest_results
+
+Revision ID: 3d9a1c7e52b8
+Revises: 6b4f682f4781
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9a1c7e52b8'
+down_revision = '6b4f682f4781'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'screener_backtest_results',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stock_id', sa.String(length=6), nullable=False),
+        sa.Column('backtest_date', sa.Date(), nullable=False),
+        sa.Column('filter_model', sa.String(length=100), nullable=False),
+        sa.Column('create_time', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['stock_id'], ['basic_information.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('filter_model', 'backtest_date', 'stock_id', name='uix_backtest_filter_date_stock'),
+    )
+    with op.batch_alter_table('screener_backtest_results', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_screener_backtest_results_backtest_date'), ['backtest_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_screener_backtest_results_filter_model'), ['filter_model'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('screener_backtest_results', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_screener_backtest_results_filter_model'))
+        batch_op.drop_index(batch_op.f('ix_screener_backtest_results_backtest_date'))
+
+    op.drop_table('screener_backtest_results')
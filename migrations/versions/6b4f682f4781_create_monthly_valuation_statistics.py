@@ -0,0 +1,35 @@
+"""create_monthly_valuation_statistics
+
+Revision ID: 6b4f682f4781
+Revises: ab67d43d772d
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b4f682f4781'
+down_revision = 'ab67d43d772d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'monthly_valuation_statistics',
+        sa.Column('stock_id', sa.String(length=6), nullable=False),
+        sa.Column('近三月均價', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('近六月均價', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('本益比25分位', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('本益比中位數', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('本益比75分位', sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column('update_time', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['stock_id'], ['basic_information.id']),
+        sa.PrimaryKeyConstraint('stock_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('monthly_valuation_statistics')
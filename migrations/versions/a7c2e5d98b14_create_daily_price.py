@@ -0,0 +1,49 @@
+"""create daily_price
+
+Revision ID: a7c2e5d98b14
+Revises: f3a91c6d0b25
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e5d98b14'
+down_revision = 'f3a91c6d0b25'
+branch_labels = None
+depends_on = None
+
+
+# Yearly partitions created up front, later years are split off pmax by
+# DailyPriceService.ensure_year_partitions
+FIRST_PARTITION_YEAR = 2010
+LAST_PARTITION_YEAR = 2027
+
+
+def upgrade():
+    op.create_table(
+        'daily_price',
+        sa.Column('stock_id', sa.String(length=6), nullable=False),
+        sa.Column('trade_date', sa.Date(), nullable=False),
+        sa.Column('收盤價', sa.Float(), nullable=True),
+        sa.Column('漲跌', sa.Float(), nullable=True),
+        sa.Column('成交量', sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint('stock_id', 'trade_date')
+    )
+
+    if op.get_bind().dialect.name in ('mysql', 'mariadb'):
+        partitions = ', '.join(
+            f'PARTITION p{year} VALUES LESS THAN ({year + 1})'
+            for year in range(FIRST_PARTITION_YEAR, LAST_PARTITION_YEAR + 1)
+        )
+        op.execute(text(
+            f'ALTER TABLE daily_price PARTITION BY RANGE (YEAR(trade_date)) '
+            f'({partitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)'
+        ))
+
+
+def downgrade():
+    op.drop_table('daily_price')
@@ -0,0 +1,26 @@
+"""data_update_date add fundamentals and daily info versions
+
+Revision ID: b52d8e0f7a31
+Revises: a7c2e5d98b14
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52d8e0f7a31'
+down_revision = 'a7c2e5d98b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('data_update_date', sa.Column('fundamentals_version', sa.String(length=32), nullable=True))
+    op.add_column('data_update_date', sa.Column('daily_info_version', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    op.drop_column('data_update_date', 'daily_info_version')
+    op.drop_column('data_update_date', 'fundamentals_version')
@@ -0,0 +1,32 @@
+"""backfill data versions of existing stocks
+
+Revision ID: c8e4f1a2d9b6
+Revises: b52d8e0f7a31
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e4f1a2d9b6'
+down_revision = 'b52d8e0f7a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Give every stock a version so its charts get ETags and cache entries
+    # before the next write replaces them
+    op.execute(text("""
+        INSERT INTO data_update_date (stock_id)
+        SELECT id FROM basic_information
+        WHERE id NOT IN (SELECT stock_id FROM data_update_date)
+    """))
+    op.execute(text("UPDATE data_update_date SET fundamentals_version = 'initial' WHERE fundamentals_version IS NULL"))
+    op.execute(text("UPDATE data_update_date SET daily_info_version = 'initial' WHERE daily_info_version IS NULL"))
+
+
+def downgrade():
+    pass
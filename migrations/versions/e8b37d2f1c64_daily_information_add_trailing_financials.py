@@ -0,0 +1,26 @@
+"""daily_information_add_trailing_financials
+
+Revision ID: e8b37d2f1c64
+Revises: 3d9a1c7e52b8
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b37d2f1c64'
+down_revision = '3d9a1c7e52b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('daily_information', sa.Column('近四季營業收入合計', sa.BigInteger(), nullable=True))
+    op.add_column('daily_information', sa.Column('近四季本期淨利', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('daily_information', '近四季本期淨利')
+    op.drop_column('daily_information', '近四季營業收入合計')
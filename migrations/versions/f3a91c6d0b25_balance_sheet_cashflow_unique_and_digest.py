@@ -0,0 +1,65 @@
+"""add unique constraints and content digests to balance_sheet and cashflow
+
+Revision ID: f3a91c6d0b25
+Revises: e8b37d2f1c64
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a91c6d0b25'
+down_revision = 'e8b37d2f1c64'
+branch_labels = None
+depends_on = None
+
+
+TABLES = {
+    'balance_sheet': 'uix_balance_sheet_stock_year_season',
+    'cashflow': 'uix_cashflow_stock_year_season',
+}
+
+
+def constraint_exists(conn, table_name, constraint_name):
+    """Check if a constraint already exists."""
+    result = conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.TABLE_CONSTRAINTS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = :table_name
+          AND CONSTRAINT_NAME = :constraint_name
+    """), {"table_name": table_name, "constraint_name": constraint_name})
+    return result.scalar() > 0
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    for table_name, constraint_name in TABLES.items():
+        # Remove duplicate records (keep the one with latest update_date, or highest id)
+        conn.execute(text(f"""
+            DELETE t1 FROM {table_name} t1
+            INNER JOIN {table_name} t2
+            WHERE t1.stock_id = t2.stock_id
+              AND t1.year = t2.year
+              AND t1.season = t2.season
+              AND (t1.update_date < t2.update_date
+                   OR (t1.update_date = t2.update_date AND t1.id < t2.id))
+        """))
+
+        if not constraint_exists(conn, table_name, constraint_name):
+            op.create_unique_constraint(constraint_name, table_name, ['stock_id', 'year', 'season'])
+
+        op.add_column(table_name, sa.Column('content_digest', sa.String(length=40), nullable=True))
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    for table_name, constraint_name in TABLES.items():
+        op.drop_column(table_name, 'content_digest')
+
+        if constraint_exists(conn, table_name, constraint_name):
+            op.drop_constraint(constraint_name, table_name, type_='unique')
@@ -1,5 +1,6 @@
 import os
 import json
+import click
 from app.log_config import get_logger
 
 from flask import (request, jsonify, make_response)
@@ -57,6 +58,126 @@ def make_shell_context():
     return dict(app=app, db=db)
 
 
+@app.cli.command('rebuild-valuation-statistics')
+@click.argument('stock_ids', nargs=-1)
+def rebuild_valuation_statistics(stock_ids):
+    """Rebuild monthly valuation statistics (all stocks if none given)."""
+    from app.monthly_valuation.monthly_valuation_services import MonthlyValuationService
+
+    count = MonthlyValuationService().rebuild_valuation_statistics(list(stock_ids) or None)
+    click.echo(f'Rebuilt valuation statistics for {count} stocks')
+
+
+@app.cli.command('rebuild-trailing-financials')
+@click.argument('stock_ids', nargs=-1)
+def rebuild_trailing_financials(stock_ids):
+    """Rebuild trailing four season EPS, revenue and net income (all stocks if none given)."""
+    from app.income_sheet.income_sheet_services import IncomeSheetServices
+
+    count = IncomeSheetServices().rebuild_trailing_financials(list(stock_ids) or None)
+    click.echo(f'Rebuilt trailing financials for {count} stocks')
+
+
+@app.cli.command('rollup-daily-prices')
+@click.option('--start', required=True, help='First trade date, YYYY-MM-DD')
+@click.option('--end', required=True, help='Last trade date, YYYY-MM-DD')
+@click.argument('stock_ids', nargs=-1)
+def rollup_daily_prices(start, end, stock_ids):
+    """Derive monthly valuation 均價 from daily prices (all stocks if none given)."""
+    from datetime import datetime
+    from app.daily_price.daily_price_services import DailyPriceService
+
+    count = DailyPriceService().rollup_monthly_average_prices(
+        datetime.strptime(start, '%Y-%m-%d').date(),
+        datetime.strptime(end, '%Y-%m-%d').date(),
+        list(stock_ids) or None
+    )
+    click.echo(f'Rolled up {count} monthly average prices')
+
+
+@app.cli.command('prune-daily-prices')
+@click.option('--keep-years', default=3, show_default=True, help='Calendar years to keep, including this one')
+def prune_daily_prices(keep_years):
+    """Roll up and remove daily prices older than the kept years."""
+    from app.daily_price.daily_price_services import DailyPriceService
+
+    removed = DailyPriceService().prune_daily_prices(keep_years)
+    click.echo(f'Pruned {removed} daily price years (partitions) or rows')
+
+
+@app.cli.command('run-screeners')
+@click.option('--option', 'options', multiple=True, help='Screener option (all if omitted)')
+@click.option('--date', default=None, help='Screener date, YYYY-MM-DD')
+@click.option('--workers', default=4, show_default=True, help='Concurrent screener workers')
+@click.option('--push/--no-push', default=False, help='Push results to Discord')
+def run_screeners(options, date, workers, push):
+    """Run screener options concurrently and save the recommended stocks."""
+    from app.utils.screener_runner import ScreenerRunner
+
+    runner = ScreenerRunner(list(options) or None, date, workers)
+    result = runner.run()
+    for option, option_result in result['options'].items():
+        click.echo(
+            f"{option}: {option_result['stock_count']} stocks, "
+            f"query {option_result['query_seconds']}s, save {option_result['save_seconds']}s"
+            + (f", error: {option_result['error']}" if option_result['error'] else '')
+        )
+    click.echo(
+        f"Valuation of {result['valuation']['candidate_count']} candidates: "
+        f"{result['valuation']['seconds']}s, total {result['elapsed_seconds']}s"
+    )
+
+    if push:
+        runner.push_messages(result)
+
+
+@app.cli.command('backtest-screener')
+@click.argument('option')
+@click.option('--start', required=True, help='First date, YYYY-MM-DD')
+@click.option('--end', required=True, help='Last date, YYYY-MM-DD')
+def backtest_screener(option, start, end):
+    """Replay a screener option at every month-end between start and end."""
+    from app.utils.screener_backtest import ScreenerBacktest
+
+    result = ScreenerBacktest(option, start, end).run()
+    for backtest_date, stock_ids in result['results'].items():
+        click.echo(f"{backtest_date}: {', '.join(stock_ids) or '-'}")
+    click.echo(
+        f"{result['date_count']} dates, {result['candidate_count']} candidate stocks, "
+        f"{result['saved']} results saved in {result['elapsed_seconds']}s"
+    )
+
+
+@app.cli.command('reparse-announcements')
+@click.option('--start', required=True, help='First analysis update date, YYYY-MM-DD')
+@click.option('--end', required=True, help='Last analysis update date, YYYY-MM-DD')
+@click.option('--offline/--online', default=True, show_default=True,
+              help='Only reparse pages in the announcement page cache')
+def reparse_announcements(start, end, offline):
+    """Rerun the announcement income sheet parser over existing analyses."""
+    from datetime import datetime
+    from app.models import AnnouncementIncomeSheetAnalysis, Feed
+    from app.tasks.feed_task.tasks import analyze_announcement_incomesheets
+
+    start_date = datetime.strptime(start, '%Y-%m-%d').date()
+    end_date = datetime.strptime(end, '%Y-%m-%d').date()
+    rows = db.session.query(
+        AnnouncementIncomeSheetAnalysis.feed_id, Feed.link,
+        AnnouncementIncomeSheetAnalysis.year, AnnouncementIncomeSheetAnalysis.season
+    ).join(Feed, Feed.id == AnnouncementIncomeSheetAnalysis.feed_id).filter(
+        AnnouncementIncomeSheetAnalysis.update_date.between(start_date, end_date),
+        AnnouncementIncomeSheetAnalysis.year.isnot(None)
+    ).all()
+
+    periods = {}
+    for feed_id, link, year, season in rows:
+        periods.setdefault((year, int(season)), []).append((feed_id, link))
+    for (year, season), announcements in sorted(periods.items()):
+        stats = analyze_announcement_incomesheets(
+            announcements, year, season, offline=offline, keep_update_date=True)
+        click.echo(f"{year}Q{season}: {stats['total']} announcements, {stats['failed']} failed")
+
+
 if __name__ == '__main__':
     app.debug = True
 
@@ -0,0 +1,111 @@
+"""API tests for BalanceSheet endpoints."""
+import pytest
+import json
+
+from app import db
+from app.database_setup import BalanceSheet
+from app.utils.financial_statement_services import statement_digest, statement_value_columns
+
+
+def balance_sheet_payload(balance_sheet, **overrides):
+    payload = {
+        column: balance_sheet[column]
+        for column in ['stock_id', 'year', 'season'] + statement_value_columns(BalanceSheet)
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.mark.usefixtures('app_context')
+class TestBalanceSheetBatchAPI:
+    """Tests for POST /api/v0/balance_sheet/batch endpoint."""
+
+    @pytest.fixture
+    def cleanup_batch_balance_sheet(self, sample_basic_info):
+        yield
+        BalanceSheet.query.filter_by(stock_id=sample_basic_info.id, year=2030).delete()
+        db.session.commit()
+
+    def test_batch_create_update_and_unchanged(self, authenticated_client, sample_balance_sheet,
+                                               cleanup_batch_balance_sheet):
+        """Test per-item status, including a row written before content_digest existed."""
+        stock_id = sample_balance_sheet.stock_id
+        assert sample_balance_sheet.content_digest is None
+
+        response = authenticated_client.post(
+            '/api/v0/balance_sheet/batch',
+            data=json.dumps([
+                balance_sheet_payload(sample_balance_sheet),
+                {'stock_id': stock_id, 'year': 2030, 'season': '1', '存貨': 100},
+                {'stock_id': stock_id, 'year': 2030, 'season': '1', '存貨': 200},
+                {'stock_id': stock_id, 'year': 2030, 'season': '5'},
+                {'stock_id': stock_id, 'year': 2030, 'season': '2', '不存在': 1},
+            ]),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [r['status'] for r in data['results']] == [
+            'unchanged', 'duplicate', 'created', 'invalid', 'invalid'
+        ]
+        assert 'Unknown fields' in data['results'][4]['error']
+
+        db.session.expire_all()
+        assert sample_balance_sheet.content_digest == statement_digest(BalanceSheet, sample_balance_sheet)
+        created = BalanceSheet.query.filter_by(stock_id=stock_id, year=2030, season='1').one()
+        assert created.存貨 == 200
+        assert created.content_digest == statement_digest(BalanceSheet, created)
+
+        response = authenticated_client.post(
+            '/api/v0/balance_sheet/batch',
+            data=json.dumps([
+                balance_sheet_payload(sample_balance_sheet, 存貨=5),
+                {'stock_id': stock_id, 'year': 2030, 'season': 1, '存貨': 200.0},
+            ]),
+            content_type='application/json'
+        )
+        assert [r['status'] for r in json.loads(response.data)['results']] == ['updated', 'unchanged']
+
+    def test_batch_partial_item_keeps_other_columns(self, authenticated_client, sample_balance_sheet):
+        """Test that a batch item only sets the columns it supplies, like the single POST."""
+        stock_id = sample_balance_sheet.stock_id
+        payload = balance_sheet_payload(sample_balance_sheet)
+        other_columns = {
+            column: value for column, value in payload.items()
+            if column not in ('stock_id', 'year', 'season', '存貨') and value is not None
+        }
+        assert other_columns
+
+        response = authenticated_client.post(
+            '/api/v0/balance_sheet/batch',
+            data=json.dumps([{'stock_id': stock_id, 'year': payload['year'],
+                              'season': payload['season'], '存貨': 12345}]),
+            content_type='application/json'
+        )
+
+        assert [r['status'] for r in json.loads(response.data)['results']] == ['updated']
+        db.session.expire_all()
+        assert sample_balance_sheet.存貨 == 12345
+        assert {column: sample_balance_sheet[column] for column in other_columns} == other_columns
+        assert sample_balance_sheet.content_digest == statement_digest(BalanceSheet, sample_balance_sheet)
+
+    def test_single_post_keeps_digest(self, client, sample_basic_info, cleanup_batch_balance_sheet):
+        """Test that the single POST stores the digest a batch compares against."""
+        payload = {'stock_id': sample_basic_info.id, 'year': 2030, 'season': '3', '存貨': 300}
+        client.post(f'/api/v0/balance_sheet/{sample_basic_info.id}', data=json.dumps(payload),
+                    content_type='application/json')
+
+        saved = BalanceSheet.query.filter_by(stock_id=sample_basic_info.id, year=2030, season='3').one()
+        assert saved.content_digest == statement_digest(BalanceSheet, payload)
+        assert 'content_digest' not in saved.serialize
+
+    def test_batch_requires_array(self, authenticated_client):
+        """Test that a non-array body is rejected."""
+        response = authenticated_client.post(
+            '/api/v0/balance_sheet/batch',
+            data=json.dumps({'stock_id': '2330'}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,32 @@
+"""API tests for CashFlow endpoints."""
+import pytest
+import json
+
+from app import db
+from app.database_setup import CashFlow
+
+
+@pytest.mark.usefixtures('app_context')
+class TestCashFlowBatchAPI:
+    """Tests for POST /api/v0/cash_flow/batch endpoint."""
+
+    def test_batch_create_then_unchanged(self, authenticated_client, sample_basic_info):
+        """Test that resending the same statements writes nothing."""
+        payload = [
+            {'stock_id': sample_basic_info.id, 'year': 2030, 'season': season, '折舊費用': 1000 * int(season)}
+            for season in ['1', '2']
+        ]
+        try:
+            response = authenticated_client.post(
+                '/api/v0/cash_flow/batch', data=json.dumps(payload), content_type='application/json')
+            assert response.status_code == 200
+            assert json.loads(response.data)['summary'] == {'created': 2}
+
+            response = authenticated_client.post(
+                '/api/v0/cash_flow/batch', data=json.dumps(payload), content_type='application/json')
+            assert json.loads(response.data)['summary'] == {'unchanged': 2}
+            assert CashFlow.query.filter_by(
+                stock_id=sample_basic_info.id, year=2030, season='2').one().折舊費用 == 2000
+        finally:
+            CashFlow.query.filter_by(stock_id=sample_basic_info.id, year=2030).delete()
+            db.session.commit()
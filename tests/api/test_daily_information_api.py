@@ -0,0 +1,68 @@
+"""API tests for DailyInformation endpoints."""
+import pytest
+import json
+from unittest.mock import patch
+
+from app import db
+from app.database_setup import DailyInformation
+from app.utils.model_utilities import get_current_date
+
+
+@pytest.mark.usefixtures('app_context')
+class TestDailyInformationBatchAPI:
+    """Tests for POST /api/v0/daily_information/batch endpoint."""
+
+    def test_batch_snapshot_counts(self, authenticated_client, sample_daily_info, sample_basic_info_2):
+        """Test inserted, updated, unchanged and invalid counts of a snapshot."""
+        snapshot = [
+            {'stock_id': sample_daily_info.stock_id, '本日收盤價': 600.0, '本日漲跌': 20.0, '本益比': 18.46},
+            {'stock_id': sample_basic_info_2.id, '本日收盤價': 106.5, '殖利率': 5.2},
+            {'stock_id': '9999', '本日收盤價': 1.0},
+            {'stock_id': sample_basic_info_2.id, '不存在': 1},
+        ]
+        try:
+            response = authenticated_client.post(
+                '/api/v0/daily_information/batch', data=json.dumps(snapshot), content_type='application/json')
+
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert {key: data[key] for key in ('inserted', 'updated', 'unchanged', 'invalid')} == {
+                'inserted': 1, 'updated': 1, 'unchanged': 0, 'invalid': 2
+            }
+            assert sorted(error['index'] for error in data['errors']) == [2, 3]
+
+            db.session.expire_all()
+            updated = DailyInformation.query.filter_by(stock_id=sample_daily_info.stock_id).one()
+            assert updated.本日收盤價 == 600.0
+            assert updated.近四季每股盈餘 == 32.5
+            assert updated.update_date == get_current_date()
+
+            response = authenticated_client.post(
+                '/api/v0/daily_information/batch', data=json.dumps(snapshot[:2]), content_type='application/json')
+            assert json.loads(response.data)['unchanged'] == 2
+        finally:
+            DailyInformation.query.filter_by(stock_id=sample_basic_info_2.id).delete()
+            db.session.commit()
+
+    def test_batch_invalidates_screener_cache(self, authenticated_client, sample_daily_info):
+        """Test that changed prices drop cached screener results and unchanged ones keep them."""
+        snapshot = [{'stock_id': sample_daily_info.stock_id, '本日收盤價': 612.0}]
+
+        with patch('app.utils.daily_information_service.screener_cache.invalidate') as invalidate:
+            authenticated_client.post(
+                '/api/v0/daily_information/batch', data=json.dumps(snapshot), content_type='application/json')
+            assert invalidate.call_count == 1
+
+            authenticated_client.post(
+                '/api/v0/daily_information/batch', data=json.dumps(snapshot), content_type='application/json')
+            assert invalidate.call_count == 1
+
+    def test_batch_requires_array(self, authenticated_client):
+        """Test that a non-array body is rejected."""
+        response = authenticated_client.post(
+            '/api/v0/daily_information/batch',
+            data=json.dumps({'stock_id': '2330'}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
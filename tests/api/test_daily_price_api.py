@@ -0,0 +1,145 @@
+"""API tests for DailyPrice endpoints."""
+import pytest
+import json
+from datetime import date
+from decimal import Decimal
+
+from app import db
+from app.daily_price.daily_price_services import DailyPriceService
+from app.daily_price.models import DailyPrice
+from app.monthly_valuation.models import MonthlyValuation, MonthlyValuationStatistics
+from app.utils.model_utilities import get_current_date
+
+
+@pytest.fixture
+def sample_daily_prices(sample_basic_info):
+    """Daily prices of TSMC (2330) over the first trading days of 2024."""
+    prices = [
+        (date(2024, 1, 2), 593.0, 0.0, 22000000),
+        (date(2024, 1, 3), 578.0, -15.0, 40000000),
+        (date(2024, 2, 1), 628.0, 4.0, 30000000),
+        (date(2024, 2, 2), 630.0, 2.0, 25000000),
+    ]
+    DailyPriceService().append_daily_prices([
+        {'stock_id': sample_basic_info.id, 'trade_date': trade_date,
+         '收盤價': close, '漲跌': change, '成交量': volume}
+        for trade_date, close, change, volume in prices
+    ])
+    db.session.commit()
+
+    yield prices
+
+    DailyPrice.query.filter_by(stock_id=sample_basic_info.id).delete()
+    db.session.commit()
+
+
+@pytest.mark.usefixtures('app_context')
+class TestDailyPriceAPI:
+    """Tests for GET /api/v0/daily_price endpoint."""
+
+    def test_get_price_history_columnar(self, authenticated_client, sample_daily_prices, sample_basic_info):
+        """Test that the requested range is returned as date ordered arrays per stock."""
+        response = authenticated_client.get(
+            f'/api/v0/daily_price?stocks={sample_basic_info.id},9999&start_date=2024-01-03&end_date=2024-02-01')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert list(data) == [sample_basic_info.id]
+        assert data[sample_basic_info.id] == {
+            'trade_date': ['2024-01-03', '2024-02-01'],
+            '收盤價': [578.0, 628.0],
+            '漲跌': [-15.0, 4.0],
+            '成交量': [40000000, 30000000],
+        }
+
+    def test_get_requires_stocks(self, authenticated_client):
+        """Test that a missing stocks parameter is rejected."""
+        response = authenticated_client.get('/api/v0/daily_price')
+
+        assert response.status_code == 400
+
+    def test_get_rejects_invalid_dates(self, authenticated_client):
+        """Test that malformed and reversed date ranges are rejected."""
+        response = authenticated_client.get('/api/v0/daily_price?stocks=2330&start_date=2024/01/01')
+        assert response.status_code == 400
+
+        response = authenticated_client.get(
+            '/api/v0/daily_price?stocks=2330&start_date=2024-02-01&end_date=2024-01-01')
+        assert response.status_code == 400
+
+
+@pytest.mark.usefixtures('app_context')
+class TestDailyPriceRollup:
+    """Tests for DailyPriceService monthly rollups and the snapshot feed."""
+
+    def test_rollup_monthly_average_prices(self, sample_daily_prices, sample_basic_info):
+        """Test that monthly 均價 is the average close of each month."""
+        try:
+            count = DailyPriceService().rollup_monthly_average_prices(date(2024, 1, 1), date(2024, 2, 29))
+
+            assert count == 2
+            averages = {
+                valuation.month: valuation.均價
+                for valuation in MonthlyValuation.query.filter_by(stock_id=sample_basic_info.id, year=2024)
+            }
+            assert averages == {'1': Decimal('585.50'), '2': Decimal('629.00')}
+        finally:
+            MonthlyValuation.query.filter_by(stock_id=sample_basic_info.id, year=2024).delete()
+            MonthlyValuationStatistics.query.filter_by(stock_id=sample_basic_info.id).delete()
+            db.session.commit()
+
+    def test_prune_rolls_up_month_starting_on_first_trading_day(self, sample_daily_prices, sample_basic_info):
+        """Test that history starting on the first trading day of a month rolls that month up."""
+        db.session.add(MonthlyValuation(stock_id=sample_basic_info.id, year=2024, month='1', 均價=Decimal('590.00')))
+        db.session.commit()
+        try:
+            removed = DailyPriceService().prune_daily_prices(keep_years=date.today().year - 2024)
+
+            assert removed == len(sample_daily_prices)
+            averages = {
+                valuation.month: valuation.均價
+                for valuation in MonthlyValuation.query.filter_by(stock_id=sample_basic_info.id, year=2024)
+            }
+            assert averages == {'1': Decimal('585.50'), '2': Decimal('629.00')}
+        finally:
+            MonthlyValuation.query.filter_by(stock_id=sample_basic_info.id, year=2024).delete()
+            MonthlyValuationStatistics.query.filter_by(stock_id=sample_basic_info.id).delete()
+            db.session.commit()
+
+    def test_prune_skips_partial_first_month(self, sample_daily_prices, sample_basic_info):
+        """Test that pruning rolls up whole months only and keeps the crawled 均價 of the first one."""
+        DailyPriceService().append_daily_prices([
+            {'stock_id': sample_basic_info.id, 'trade_date': date(2023, 12, 15), '收盤價': 580.0}
+        ])
+        db.session.add(MonthlyValuation(stock_id=sample_basic_info.id, year=2023, month='12', 均價=Decimal('577.00')))
+        db.session.commit()
+        try:
+            removed = DailyPriceService().prune_daily_prices(keep_years=date.today().year - 2024)
+
+            assert removed == len(sample_daily_prices) + 1
+            averages = {
+                (valuation.year, valuation.month): valuation.均價
+                for valuation in MonthlyValuation.query.filter_by(stock_id=sample_basic_info.id)
+            }
+            assert averages == {
+                (2023, '12'): Decimal('577.00'), (2024, '1'): Decimal('585.50'), (2024, '2'): Decimal('629.00')
+            }
+        finally:
+            MonthlyValuation.query.filter_by(stock_id=sample_basic_info.id).delete()
+            MonthlyValuationStatistics.query.filter_by(stock_id=sample_basic_info.id).delete()
+            db.session.commit()
+
+    def test_daily_information_batch_appends_prices(self, authenticated_client, sample_daily_info):
+        """Test that the end-of-day snapshot appends daily_price rows."""
+        snapshot = [{'stock_id': sample_daily_info.stock_id, '本日收盤價': 600.0, '本日漲跌': 20.0, '成交量': 31000000}]
+        try:
+            response = authenticated_client.post(
+                '/api/v0/daily_information/batch', data=json.dumps(snapshot), content_type='application/json')
+
+            assert response.status_code == 200
+            price = DailyPrice.query.filter_by(
+                stock_id=sample_daily_info.stock_id, trade_date=get_current_date()).one()
+            assert (price.收盤價, price.漲跌, price.成交量) == (600.0, 20.0, 31000000)
+        finally:
+            DailyPrice.query.filter_by(stock_id=sample_daily_info.stock_id).delete()
+            db.session.commit()
@@ -80,6 +80,66 @@ class TestGetStockFeedAPI:
         finally:
             cleanup_feed(feed)
 
+    def test_get_stock_feed_cursor_pagination(self, client, app_context, sample_basic_info):
+        """Test that following next_cursor returns every feed once, newest first."""
+        feeds = []
+        for i in range(5):
+            feed = Feed(
+                stock_id=sample_basic_info.id,
+                # Two feeds share each releaseTime to exercise the id tie-breaker
+                releaseTime=datetime(2024, 4, 1 + i // 2, 10, 0, 0),
+                title=f"Cursor Test {i}",
+                link=f"https://example.com/feed/cursor-test-{i}",
+                feedType="announcement"
+            )
+            feeds.append(feed)
+            db.session.add(feed)
+        db.session.commit()
+
+        try:
+            url = f'/api/v0/feed/{sample_basic_info.id}?start_date=2024-04-30&page_size=2'
+            response = client.get(url + '&mode=cursor&include_total=true')
+            data = json.loads(response.data)
+            assert response.status_code == 200
+            assert data['total'] == 5
+            assert 'page' not in data
+
+            seen = [f['id'] for f in data['feeds']]
+            while data['next_cursor']:
+                response = client.get(url + f"&cursor={data['next_cursor']}")
+                data = json.loads(response.data)
+                assert 'total' not in data
+                seen += [f['id'] for f in data['feeds']]
+
+            expected = sorted(feeds, key=lambda f: (f.releaseTime, f.id), reverse=True)
+            assert seen == [f.id for f in expected]
+            assert data['has_next'] is False
+        finally:
+            for feed in feeds:
+                cleanup_feed(feed)
+
+    def test_get_stock_feed_defaults_to_page_numbers(self, client, sample_feed):
+        """Test that a request without page or cursor keeps the page number response."""
+        response = client.get(f'/api/v0/feed/{sample_feed.stock_id}')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['page'] == 1
+        assert {'total', 'pages', 'has_next', 'has_prev'} <= set(data)
+        assert 'next_cursor' not in data
+
+    @pytest.mark.parametrize('page_size', [0, -1])
+    def test_get_stock_feed_invalid_page_size(self, client, app_context, page_size):
+        """Test that a page_size below 1 is rejected in both pagination modes."""
+        assert client.get(f'/api/v0/feed/2330?page_size={page_size}').status_code == 400
+        assert client.get(f'/api/v0/feed/2330?mode=cursor&page_size={page_size}').status_code == 400
+
+    def test_get_stock_feed_invalid_cursor(self, client, app_context):
+        """Test that a malformed cursor is rejected."""
+        response = client.get('/api/v0/feed/2330?cursor=garbage')
+
+        assert response.status_code == 400
+
     def test_get_stock_feed_empty_result(self, client, app_context):
         """Test retrieval for stock with no feeds."""
         response = client.get('/api/v0/feed/9999')
@@ -414,6 +474,96 @@ class TestHandleFeedPostAPI:
             cleanup_feed_by_link('https://example.com/feed/update-by-link-test')
 
 
+@pytest.mark.usefixtures('test_app')
+class TestHandleFeedBatchAPI:
+    """Tests for POST /feed/batch endpoint."""
+
+    def _payload(self, stock_id, link, **overrides):
+        payload = {
+            'stock_id': stock_id,
+            'releaseTime': '2024-03-26T10:30:00',
+            'title': 'Batch Test Feed',
+            'link': link,
+            'source': 'mops',
+            'feedType': 'announcement',
+            'tags': ['earnings']
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_batch_create_and_update(self, authenticated_client, app_context, sample_basic_info):
+        """Test that a batch creates new feeds and updates existing links."""
+        existing = Feed(
+            stock_id=sample_basic_info.id,
+            releaseTime=datetime(2024, 3, 26, 9, 0, 0),
+            title="Batch Initial Title",
+            link="https://example.com/feed/batch-existing",
+            source="mops",
+            feedType="announcement"
+        )
+        db.session.add(existing)
+        db.session.commit()
+
+        links = ['https://example.com/feed/batch-existing', 'https://example.com/feed/batch-new']
+        try:
+            response = authenticated_client.post(
+                '/api/v0/feed/batch',
+                data=json.dumps([
+                    self._payload(sample_basic_info.id, links[0], title='Batch Updated Title',
+                                  tags=['earnings', 'batch-tag']),
+                    self._payload(sample_basic_info.id, links[1], tags=['batch-tag']),
+                ]),
+                content_type='application/json'
+            )
+
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert [r['status'] for r in data['results']] == ['updated', 'created']
+            assert data['summary'] == {'updated': 1, 'created': 1}
+
+            updated = Feed.query.filter_by(link=links[0]).one()
+            assert updated.title == 'Batch Updated Title'
+            assert {tag.name for tag in updated.tags} == {'earnings', 'batch-tag'}
+            created = Feed.query.filter_by(link=links[1]).one()
+            assert created.id == data['results'][1]['feed_id']
+            assert created.stock_id == sample_basic_info.id
+        finally:
+            for link in links:
+                cleanup_feed_by_link(link)
+
+    def test_batch_reports_invalid_and_duplicate_items(self, authenticated_client, app_context, sample_basic_info):
+        """Test per-item status for invalid and repeated links."""
+        link = 'https://example.com/feed/batch-duplicate'
+        try:
+            response = authenticated_client.post(
+                '/api/v0/feed/batch',
+                data=json.dumps([
+                    self._payload(sample_basic_info.id, link, title='First'),
+                    self._payload(sample_basic_info.id, link, title='Second'),
+                    {'link': 'https://example.com/feed/batch-invalid'},
+                ]),
+                content_type='application/json'
+            )
+
+            assert response.status_code == 200
+            results = json.loads(response.data)['results']
+            assert [r['status'] for r in results] == ['duplicate', 'created', 'invalid']
+            assert 'Missing fields' in results[2]['error']
+            assert Feed.query.filter_by(link=link).one().title == 'Second'
+        finally:
+            cleanup_feed_by_link(link)
+
+    def test_batch_requires_array(self, authenticated_client, app_context):
+        """Test that a non-array body is rejected."""
+        response = authenticated_client.post(
+            '/api/v0/feed/batch',
+            data=json.dumps({'link': 'x'}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+
+
 @pytest.mark.usefixtures('test_app')
 class TestFeedAPIIntegration:
     """Integration tests for Feed API."""
@@ -523,3 +673,14 @@ class TestFeedSerializer:
             assert release_time is not None
             # Should contain date separator
             assert 'T' in release_time or '-' in release_time
+
+    def test_serializer_matches_feed_schema(self, client, sample_feed):
+        """Test that the column projection serializes feeds exactly like FeedSchema."""
+        from app.schemas.feed_schema import FeedSchema
+
+        response = client.get(f'/api/v0/feed/{sample_feed.stock_id}')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        item = next(f for f in data['feeds'] if f['id'] == sample_feed.id)
+        assert item == json.loads(json.dumps(FeedSchema().dump(sample_feed)))
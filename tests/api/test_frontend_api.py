@@ -0,0 +1,124 @@
+"""API tests for frontend endpoints."""
+import pytest
+import json
+
+from app import db
+from app.utils.data_update_date_service import DataUpdateDateService, FUNDAMENTALS_VERSION
+
+
+@pytest.mark.usefixtures('app_context')
+class TestStockDashboardAPI:
+    """Tests for GET /api/v0/f/stock_dashboard/<stock_id> endpoint."""
+
+    SECTIONS = 'daily_info,month_revenue,eps,income_sheet,profit_analysis,op_expense_analysis'
+
+    def test_dashboard_matches_chart_endpoints(
+            self, authenticated_client, sample_basic_info, sample_daily_info,
+            sample_income_sheet_list, sample_month_revenue_list):
+        """Test that every section equals the response of its single chart endpoint."""
+        response = authenticated_client.get(
+            f'/api/v0/f/stock_dashboard/{sample_basic_info.id}?sections={self.SECTIONS}')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert sorted(data) == sorted(self.SECTIONS.split(','))
+        assert len(data['eps']) == len(sample_income_sheet_list)
+        for section in self.SECTIONS.split(','):
+            single = authenticated_client.get(f'/api/v0/f/{section}/{sample_basic_info.id}')
+            assert data[section] == json.loads(single.data), section
+
+    def test_dashboard_selected_sections(self, authenticated_client, sample_basic_info, sample_income_sheet_list):
+        """Test that only the requested sections are returned."""
+        response = authenticated_client.get(
+            f'/api/v0/f/stock_dashboard/{sample_basic_info.id}?sections=eps,daily_info')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert sorted(data) == ['daily_info', 'eps']
+        assert data['eps'][0] == {'Year/Season': '2023Q1', '基本每股盈餘': pytest.approx(7.92)}
+        assert sorted(data['daily_info']) == sorted(['本日收盤價', '本日漲跌', '本益比', '近四季每股盈餘', '殖利率', '股價淨值比'])
+
+    def test_dashboard_rejects_unknown_section(self, authenticated_client, sample_basic_info):
+        """Test that an unknown section is rejected."""
+        response = authenticated_client.get(
+            f'/api/v0/f/stock_dashboard/{sample_basic_info.id}?sections=eps,balance_sheet')
+
+        assert response.status_code == 400
+
+    def test_dashboard_unknown_stock(self, authenticated_client):
+        """Test that an unknown stock returns 404."""
+        response = authenticated_client.get(f'/api/v0/f/stock_dashboard/9999?sections={self.SECTIONS}')
+
+        assert response.status_code == 404
+
+    def test_dashboard_etag(self, authenticated_client, sample_basic_info, sample_daily_info, sample_income_sheet_list):
+        """Test that the dashboard returns 304 until the daily information changes."""
+        # The eps section depends on the fundamentals version, which the fixtures leave unset
+        DataUpdateDateService().bump_data_versions([sample_basic_info.id], FUNDAMENTALS_VERSION)
+        db.session.commit()
+
+        url = f'/api/v0/f/stock_dashboard/{sample_basic_info.id}?sections=eps,daily_info'
+        snapshot = [{'stock_id': sample_basic_info.id, '本日收盤價': 600.0}]
+        authenticated_client.post(
+            '/api/v0/daily_information/batch', data=json.dumps(snapshot), content_type='application/json')
+
+        response = authenticated_client.get(url)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert authenticated_client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+        snapshot[0]['本日收盤價'] = 610.0
+        authenticated_client.post(
+            '/api/v0/daily_information/batch', data=json.dumps(snapshot), content_type='application/json')
+        response = authenticated_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert json.loads(response.data)['daily_info']['本日收盤價'] == 610.0
+
+
+@pytest.mark.usefixtures('app_context')
+class TestMarketFeedAPI:
+    """Tests for GET /api/v0/f/feed endpoint."""
+
+    def test_market_feed_defaults_to_page_numbers(self, authenticated_client):
+        """Test that a request without page or cursor keeps the next_page response."""
+        response = authenticated_client.get('/api/v0/f/feed?targetDate=2024-01-02')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert 'next_page' in data
+        assert 'next_cursor' not in data
+
+    def test_market_feed_cursor_mode(self, authenticated_client):
+        """Test that mode=cursor opts into cursor pagination."""
+        response = authenticated_client.get('/api/v0/f/feed?targetDate=2024-01-02&mode=cursor')
+
+        assert response.status_code == 200
+        assert 'next_cursor' in json.loads(response.data)
+
+    def test_market_feed_invalid_page_size(self, authenticated_client):
+        """Test that a page_size below 1 is rejected."""
+        response = authenticated_client.get('/api/v0/f/feed?page_size=0')
+
+        assert response.status_code == 400
+
+
+@pytest.mark.usefixtures('app_context')
+class TestStockAutocompleteAPI:
+    """Tests for GET /api/v0/f/autocomplete endpoint."""
+
+    def test_autocomplete_by_id_and_name(self, authenticated_client, sample_stock_search_counts):
+        """Test that stocks are found by id and name prefix from the in-memory index."""
+        from app.utils.autocomplete_index import autocomplete_index
+        autocomplete_index.build()
+
+        by_id = authenticated_client.get('/api/v0/f/autocomplete?search_stock=23')
+        by_name = authenticated_client.get('/api/v0/f/autocomplete?search_stock=台積')
+
+        assert json.loads(by_id.data) == [{'stock': '2330', 'name': '台積電'}]
+        assert json.loads(by_name.data) == [{'stock': '2330', 'name': '台積電'}]
+
+    def test_autocomplete_without_search_stock(self, authenticated_client):
+        """Test that a missing search_stock returns no stocks."""
+        response = authenticated_client.get('/api/v0/f/autocomplete')
+
+        assert json.loads(response.data) == {'stocks': []}
@@ -320,11 +320,11 @@ class TestIncomeSheetPostAPI:
 
 @pytest.mark.usefixtures('test_app')
 class TestCheckFourSeasonEPS:
-    """Tests for checkFourSeasonEPS function."""
+    """Tests for the trailing four season EPS update after a POST."""
 
     def test_four_season_eps_calculated(self, authenticated_client, temp_income_sheets_with_eps, sample_basic_info):
         """Test that four season EPS is calculated and stored."""
-        # POST to trigger checkFourSeasonEPS
+        # POST to trigger the trailing financials refresh
         payload = {
             'stock_id': sample_basic_info.id,
             'year': 2024,
@@ -369,7 +369,7 @@ class TestCheckFourSeasonEPS:
             db.session.add(income)
         db.session.commit()
 
-        # POST to trigger checkFourSeasonEPS
+        # POST to trigger the trailing financials refresh
         payload = {
             'stock_id': sample_basic_info.id,
             'year': 2023,
@@ -391,6 +391,150 @@ class TestCheckFourSeasonEPS:
         db.session.commit()
 
 
+
+@pytest.mark.usefixtures('test_app')
+class TestIncomeSheetBatchAPI:
+    """Tests for POST /income_sheet/batch endpoint."""
+
+    def test_batch_create_update_and_unchanged(self, authenticated_client, temp_income_sheet, sample_basic_info):
+        """Test per-item status for new, changed and unchanged income sheets."""
+        stock_id = sample_basic_info.id
+        try:
+            response = authenticated_client.post(
+                '/api/v0/income_sheet/batch',
+                data=json.dumps([
+                    {'stock_id': stock_id, 'year': 2024, 'season': '2', '營業收入合計': 5000000000.0},
+                    {'stock_id': stock_id, 'year': 2024, 'season': '2', '基本每股盈餘': 6.0},
+                    {'stock_id': stock_id, 'year': 2024, 'season': '3', '營業收入合計': 6000000000},
+                    {'stock_id': '9999', 'year': 2024, 'season': '3'},
+                    {'stock_id': stock_id, 'year': 2024, 'season': '5'},
+                    {'stock_id': stock_id, 'year': 2024},
+                ]),
+                content_type='application/json'
+            )
+
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert [r['status'] for r in data['results']] == [
+                'duplicate', 'updated', 'created', 'invalid', 'invalid', 'invalid'
+            ]
+            assert 'Missing fields' in data['results'][5]['error']
+            assert data['summary'] == {'duplicate': 1, 'updated': 1, 'created': 1, 'invalid': 3}
+
+            db.session.expire_all()
+            assert IncomeSheet.query.filter_by(stock_id=stock_id, year=2024, season='2').one().基本每股盈餘 == 6.0
+            assert IncomeSheet.query.filter_by(
+                stock_id=stock_id, year=2024, season='3').one().營業收入合計 == 6000000000
+
+            response = authenticated_client.post(
+                '/api/v0/income_sheet/batch',
+                data=json.dumps([{'stock_id': stock_id, 'year': 2024, 'season': '3', '營業收入合計': 6000000000}]),
+                content_type='application/json'
+            )
+            assert json.loads(response.data)['summary'] == {'unchanged': 1}
+        finally:
+            IncomeSheet.query.filter_by(stock_id=stock_id, year=2024, season='3').delete()
+            db.session.commit()
+
+    def test_batch_updates_four_season_eps(self, authenticated_client, sample_basic_info):
+        """Test that 近四季每股盈餘 matches the single POST calculation."""
+        stock_id = sample_basic_info.id
+        DailyInformation.query.filter_by(stock_id=stock_id).delete()
+        db.session.commit()
+        try:
+            response = authenticated_client.post(
+                '/api/v0/income_sheet/batch',
+                data=json.dumps([
+                    {'stock_id': stock_id, 'year': 2023, 'season': season, '基本每股盈餘': eps}
+                    for season, eps in [('1', 1.5), ('2', 2.0), ('3', 2.5), ('4', 3.0)]
+                ]),
+                content_type='application/json'
+            )
+
+            assert response.status_code == 200
+            daily_info = DailyInformation.query.filter_by(stock_id=stock_id).one()
+            assert daily_info.近四季每股盈餘 == 9.0
+        finally:
+            IncomeSheet.query.filter_by(stock_id=stock_id, year=2023).delete()
+            DailyInformation.query.filter_by(stock_id=stock_id).delete()
+            db.session.commit()
+
+    def test_batch_requires_array(self, authenticated_client):
+        """Test that a non-array body is rejected."""
+        response = authenticated_client.post(
+            '/api/v0/income_sheet/batch',
+            data=json.dumps({'stock_id': '2330'}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+
+
+
+@pytest.mark.usefixtures('test_app')
+class TestTrailingFinancials:
+    """Tests for the trailing four season figures of DailyInformation."""
+
+    @pytest.fixture
+    def income_sheets_5_seasons(self, sample_basic_info):
+        incomes = []
+        for year, season, revenue, net_income, eps in [
+            (2023, '1', 900, 90, 0.9), (2023, '2', 1000, 100, 1.0), (2023, '3', 2000, 200, 2.0),
+            (2023, '4', None, 300, None), (2024, '1', 4000, 400, 4.0),
+        ]:
+            income = IncomeSheet(
+                stock_id=sample_basic_info.id, year=year, season=season,
+                營業收入合計=revenue, 本期淨利=net_income, 基本每股盈餘=eps
+            )
+            incomes.append(income)
+            db.session.add(income)
+        db.session.commit()
+
+        yield incomes
+
+        for income in incomes:
+            db.session.delete(income)
+        DailyInformation.query.filter_by(stock_id=sample_basic_info.id).delete()
+        db.session.commit()
+
+    def test_calculate_newest_four_seasons(self, income_sheets_5_seasons, sample_basic_info):
+        """Test that only the newest four seasons are summed."""
+        from app.income_sheet.income_sheet_services import IncomeSheetServices
+
+        result = IncomeSheetServices().calculate_trailing_financials([sample_basic_info.id])
+
+        assert result[sample_basic_info.id] == {
+            'stock_id': sample_basic_info.id,
+            '近四季每股盈餘': 7.0,
+            '近四季營業收入合計': None,
+            '近四季本期淨利': 1000,
+        }
+
+    def test_rebuild_endpoint(self, authenticated_client, income_sheets_5_seasons, sample_basic_info):
+        """Test POST /income_sheet/trailing writes DailyInformation."""
+        response = authenticated_client.post(
+            '/api/v0/income_sheet/trailing',
+            data=json.dumps({'stock_ids': [sample_basic_info.id]}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == {'count': 1}
+        daily_info = DailyInformation.query.filter_by(stock_id=sample_basic_info.id).one()
+        assert daily_info.近四季每股盈餘 == 7.0
+        assert daily_info.近四季本期淨利 == 1000
+
+    def test_rebuild_endpoint_invalid_stock_ids(self, authenticated_client):
+        """Test that stock_ids must be an array."""
+        response = authenticated_client.post(
+            '/api/v0/income_sheet/trailing',
+            data=json.dumps({'stock_ids': '2330'}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+
+
 @pytest.fixture
 def cleanup_integration_income_sheet(sample_basic_info):
     """Cleanup fixture for integration tests."""
@@ -506,3 +650,43 @@ class TestIncomeSheetSerializer:
                 assert len(update_date) == 10
                 assert update_date[4] == '-'
                 assert update_date[7] == '-'
+
+
+@pytest.mark.usefixtures('test_app')
+class TestIncomeSheetConditionalGet:
+    """Tests for ETag support of GET /api/v0/income_sheet/<stock_id>."""
+
+    def test_etag_revalidation(self, authenticated_client, sample_basic_info, cleanup_integration_income_sheet):
+        """Test that an unchanged income sheet returns 304 until the next write."""
+        payload = {'stock_id': sample_basic_info.id, 'year': 2024, 'season': '1', '基本每股盈餘': 5.5}
+        response = authenticated_client.post(
+            f'/api/v0/income_sheet/{sample_basic_info.id}',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+
+        url = f'/api/v0/income_sheet/{sample_basic_info.id}?mode=single&year=2024&season=1'
+        response = authenticated_client.get(url)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        response = authenticated_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+        other = authenticated_client.get(
+            f'/api/v0/income_sheet/{sample_basic_info.id}?mode=multiple', headers={'If-None-Match': etag})
+        assert other.status_code == 200
+
+        response = authenticated_client.post(
+            '/api/v0/income_sheet/batch',
+            data=json.dumps([dict(payload, 基本每股盈餘=6.0)]),
+            content_type='application/json'
+        )
+        assert response.status_code == 200
+
+        response = authenticated_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert json.loads(response.data)[0]['基本每股盈餘'] == 6.0
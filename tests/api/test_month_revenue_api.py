@@ -282,6 +282,74 @@ class TestMonthRevenuePostAPI:
         assert response.status_code == 400
 
 
+
+@pytest.mark.usefixtures('app_context')
+class TestMonthRevenueBatchAPI:
+    """Tests for POST /api/v0/month_revenue/batch endpoint."""
+
+    @pytest.fixture
+    def cleanup_batch_month_revenue(self, sample_basic_info):
+        yield
+        MonthRevenue.query.filter_by(stock_id=sample_basic_info.id, year=2030).delete()
+        db.session.commit()
+
+    def test_batch_json(self, authenticated_client, sample_basic_info, cleanup_batch_month_revenue):
+        """Test per-item status and 不適用 normalization for a JSON array."""
+        stock_id = sample_basic_info.id
+        response = authenticated_client.post(
+            '/api/v0/month_revenue/batch',
+            data=json.dumps([
+                {'stock_id': stock_id, 'year': 2030, 'month': '1', '當月營收': 100, '上月比較增減': '不適用'},
+                {'stock_id': stock_id, 'year': 2030, 'month': 2, '當月營收': 200},
+                {'stock_id': stock_id, 'year': 2030, 'month': '2', '當月營收': 250},
+                {'stock_id': '9999', 'year': 2030, 'month': '1'},
+                {'stock_id': stock_id, 'year': 2030, 'month': '13'},
+            ]),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [r['status'] for r in data['results']] == ['created', 'duplicate', 'created', 'invalid', 'invalid']
+        assert data['summary'] == {'created': 2, 'duplicate': 1, 'invalid': 2}
+
+        january = MonthRevenue.query.filter_by(stock_id=stock_id, year=2030, month='1').one()
+        assert january.當月營收 == 100
+        assert january.上月比較增減 is None
+        assert MonthRevenue.query.filter_by(stock_id=stock_id, year=2030, month='2').one().當月營收 == 250
+
+    def test_batch_csv(self, authenticated_client, sample_basic_info, cleanup_batch_month_revenue):
+        """Test that a CSV body is normalized like JSON and unchanged rows are skipped."""
+        stock_id = sample_basic_info.id
+        body = (
+            '\ufeffstock_id,year,month,當月營收,去年同月增減,備註\n'
+            f'{stock_id},2030,03,"1,500",不適用,\n'
+        ).encode('utf-8')
+
+        response = authenticated_client.post('/api/v0/month_revenue/batch', data=body, content_type='text/csv')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['summary'] == {'created': 1}
+        saved = MonthRevenue.query.filter_by(stock_id=stock_id, year=2030, month='3').one()
+        assert saved.當月營收 == 1500
+        assert saved.去年同月增減 is None
+        assert saved.備註 is None
+
+        response = authenticated_client.post('/api/v0/month_revenue/batch', data=body, content_type='text/csv')
+        assert json.loads(response.data)['summary'] == {'unchanged': 1}
+
+    @pytest.mark.parametrize('data,content_type', [
+        (json.dumps({'stock_id': '2330'}), 'application/json'),
+        (json.dumps([]), 'application/json'),
+        ('', 'text/csv'),
+    ])
+    def test_batch_empty_or_invalid_body(self, authenticated_client, data, content_type):
+        """Test that bodies without month revenues are rejected."""
+        response = authenticated_client.post('/api/v0/month_revenue/batch', data=data, content_type=content_type)
+
+        assert response.status_code == 400
+
+
 @pytest.mark.usefixtures('app_context')
 class TestMonthRevenueAPIIntegration:
     """Integration tests for MonthRevenue API."""
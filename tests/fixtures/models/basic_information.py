@@ -51,9 +51,11 @@ def sample_basic_info(app_context):
             db.session.execute(text("DELETE FROM cashflow WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM daily_information WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM monthly_valuation WHERE stock_id = :sid"), {"sid": stock_id})
+            db.session.execute(text("DELETE FROM monthly_valuation_statistics WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM stock_commodity WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM data_update_date WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM recommended_stocks WHERE stock_id = :sid"), {"sid": stock_id})
+            db.session.execute(text("DELETE FROM screener_backtest_results WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM feed WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM announcement_income_sheet_analysis WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM earnings_call WHERE stock_id = :sid"), {"sid": stock_id})
@@ -101,9 +103,11 @@ def sample_basic_info_2(app_context):
             db.session.execute(text("DELETE FROM cashflow WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM daily_information WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM monthly_valuation WHERE stock_id = :sid"), {"sid": stock_id})
+            db.session.execute(text("DELETE FROM monthly_valuation_statistics WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM stock_commodity WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM data_update_date WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM recommended_stocks WHERE stock_id = :sid"), {"sid": stock_id})
+            db.session.execute(text("DELETE FROM screener_backtest_results WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM feed WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM announcement_income_sheet_analysis WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM earnings_call WHERE stock_id = :sid"), {"sid": stock_id})
@@ -158,9 +162,11 @@ def sample_basic_info_list(app_context):
             db.session.execute(text("DELETE FROM cashflow WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM daily_information WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM monthly_valuation WHERE stock_id = :sid"), {"sid": stock_id})
+            db.session.execute(text("DELETE FROM monthly_valuation_statistics WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM stock_commodity WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM data_update_date WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM recommended_stocks WHERE stock_id = :sid"), {"sid": stock_id})
+            db.session.execute(text("DELETE FROM screener_backtest_results WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM feed WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM announcement_income_sheet_analysis WHERE stock_id = :sid"), {"sid": stock_id})
             db.session.execute(text("DELETE FROM earnings_call WHERE stock_id = :sid"), {"sid": stock_id})
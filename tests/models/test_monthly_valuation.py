@@ -248,3 +248,81 @@ class TestMonthlyValuation:
 
         # Average price should be positive
         assert mock_monthly_valuation.均價 > 0
+
+
+@pytest.mark.usefixtures('app_context')
+class TestMonthlyValuationStatistics:
+    """Test suite for the derived MonthlyValuationStatistics table."""
+
+    def _cleanup(self, stock_id):
+        from app import db
+        from app.monthly_valuation.models import MonthlyValuationStatistics
+
+        MonthlyValuationStatistics.query.filter_by(stock_id=stock_id).delete()
+        MonthlyValuation.query.filter_by(stock_id=stock_id).delete()
+        db.session.commit()
+
+    def test_rebuild_matches_live_calculation(self, sample_basic_info, sample_monthly_valuation_list):
+        """Rebuilt statistics equal the values calculated from MonthlyValuation rows."""
+        from app import db
+        from app.monthly_valuation.models import MonthlyValuationStatistics
+        from app.monthly_valuation.monthly_valuation_services import MonthlyValuationService
+
+        expected_price = sample_basic_info.get_average_monthly_price(3)
+        expected_pe = sample_basic_info.get_pe_quantile(0.5, 5)
+
+        count = MonthlyValuationService().rebuild_valuation_statistics([sample_basic_info.id])
+
+        statistics = db.session.get(MonthlyValuationStatistics, sample_basic_info.id)
+        assert count == 1
+        assert float(statistics.近三月均價) == expected_price
+        assert float(statistics.本益比中位數) == expected_pe
+        assert sample_basic_info.get_average_monthly_price(3) == expected_price
+        assert sample_basic_info.get_pe_quantile(0.5, 5) == expected_pe
+
+        MonthlyValuationStatistics.query.filter_by(stock_id=sample_basic_info.id).delete()
+        db.session.commit()
+
+    def test_create_monthly_valuation_refreshes_statistics(self, sample_basic_info):
+        """Writing through the service keeps the statistics row current."""
+        from app import db
+        from app.monthly_valuation.models import MonthlyValuationStatistics
+        from app.monthly_valuation.monthly_valuation_services import MonthlyValuationService
+
+        self._cleanup(sample_basic_info.id)
+        service = MonthlyValuationService()
+
+        service.create_monthly_valuation({
+            'stock_id': sample_basic_info.id, 'year': 2024, 'month': '1',
+            '本益比': '20.00', '均價': '600.00'
+        })
+        service.create_monthly_valuation({
+            'stock_id': sample_basic_info.id, 'year': 2024, 'month': '2',
+            '本益比': '10.00', '均價': '500.00'
+        })
+
+        statistics = db.session.get(MonthlyValuationStatistics, sample_basic_info.id)
+        assert statistics.近三月均價 == Decimal('550.00')
+        assert statistics.本益比中位數 == Decimal('15.00')
+
+        service.update_monthly_valuation({
+            'stock_id': sample_basic_info.id, 'year': 2024, 'month': '2', '均價': '700.00'
+        })
+        db.session.expire_all()
+
+        statistics = db.session.get(MonthlyValuationStatistics, sample_basic_info.id)
+        assert statistics.近三月均價 == Decimal('650.00')
+
+        self._cleanup(sample_basic_info.id)
+
+    def test_get_valuation_statistics_falls_back_without_row(
+        self, sample_basic_info, sample_monthly_valuation_list
+    ):
+        """Stocks without a statistics row are calculated on the fly."""
+        from app.monthly_valuation.monthly_valuation_services import MonthlyValuationService
+
+        statistics = MonthlyValuationService().get_valuation_statistics([sample_basic_info.id, '9999'])
+
+        assert '9999' not in statistics
+        assert statistics[sample_basic_info.id]['近三月均價'] == \
+            sample_basic_info.get_average_monthly_price(3)
@@ -1,5 +1,8 @@
 import pytest
 from pathlib import Path
+from unittest.mock import patch
+
+from redis.exceptions import ConnectionError as RedisConnectionError
 
 
 TEST_SCREENER_FORMAT_PATH = Path(__file__).parent.parent / 'fixtures' / 'screener_format.json'
@@ -9,3 +12,172 @@ TEST_SCREENER_FORMAT_PATH = Path(__file__).parent.parent / 'fixtures' / 'screene
 def patch_screener_format_path(monkeypatch):
     """Use test fixture screener_format.json instead of critical_file/ in tests."""
     monkeypatch.setenv('SCREENER_FORMAT_PATH', str(TEST_SCREENER_FORMAT_PATH))
+
+
+@pytest.fixture(autouse=True)
+def patch_page_cache_path(monkeypatch, tmp_path):
+    """Keep the announcement page cache of each test in its own temporary file."""
+    monkeypatch.setenv('MOPS_PAGE_CACHE_PATH', str(tmp_path / 'mops_pages.sqlite3'))
+    monkeypatch.delenv('MOPS_PAGE_CACHE_OFFLINE', raising=False)
+
+
+# ============================================================================
+# In-memory Redis
+# ============================================================================
+# Test modules of Redis backed code set REDIS_CLIENT to the redis_client they
+# use, e.g. 'app.utils.chart_cache.redis_client', and request fake_redis or
+# broken_redis to patch it.
+# ============================================================================
+
+class FakeLock:
+    """Non-blocking lock kept as a plain key, like redis-py's Lock."""
+
+    def __init__(self, redis, name):
+        self.redis = redis
+        self.name = name
+
+    def acquire(self, blocking=True):
+        if self.name in self.redis.store:
+            return False
+        self.redis.store[self.name] = b'1'
+        return True
+
+    def release(self):
+        self.redis.store.pop(self.name, None)
+
+
+class FakePipeline:
+    """Queues commands and runs them in one round trip on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return self.redis.run_server_side(
+            lambda: [command(*args, **kwargs) for command, args, kwargs in commands])
+
+
+class FakeRedis:
+    """
+    Minimal dict-backed Redis supporting the commands of the Redis caches
+    and counters. Lua scripts run the Python function registered for them
+    in scripts. round_trips counts commands, pipelines and scripts sent.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.hashes = {}
+        self.sets = {}
+        self.scripts = {}
+        self.round_trips = 0
+        self._server_side = False
+
+    def _round_trip(self):
+        if not self._server_side:
+            self.round_trips += 1
+
+    def run_server_side(self, fn):
+        """Run fn as one round trip, e.g. a pipeline or script."""
+        self._round_trip()
+        self._server_side = True
+        try:
+            return fn()
+        finally:
+            self._server_side = False
+
+    def get(self, key):
+        self._round_trip()
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self._round_trip()
+        self.store[key] = value
+
+    def incr(self, key):
+        self._round_trip()
+        self.store[key] = str(int(self.store.get(key, 0)) + 1).encode()
+        return int(self.store[key])
+
+    def exists(self, *keys):
+        self._round_trip()
+        return sum(key in self.store or key in self.hashes or key in self.sets for key in keys)
+
+    def rename(self, source, target):
+        self._round_trip()
+        for data in (self.store, self.hashes, self.sets):
+            if source in data:
+                data[target] = data.pop(source)
+
+    def delete(self, *keys):
+        self._round_trip()
+        for key in keys:
+            for data in (self.store, self.hashes, self.sets):
+                data.pop(key, None)
+
+    def expireat(self, key, when):
+        self._round_trip()
+
+    def hincrby(self, name, key, amount=1):
+        self._round_trip()
+        bucket = self.hashes.setdefault(name, {})
+        field = key.encode() if isinstance(key, str) else key
+        bucket[field] = str(int(bucket.get(field, 0)) + amount).encode()
+        return int(bucket[field])
+
+    def hgetall(self, name):
+        self._round_trip()
+        return dict(self.hashes.get(name, {}))
+
+    def sadd(self, name, *values):
+        self._round_trip()
+        members = self.sets.setdefault(name, set())
+        added = [value for value in values if value not in members]
+        members.update(added)
+        return len(added)
+
+    def sismember(self, name, value):
+        self._round_trip()
+        return value in self.sets.get(name, set())
+
+    def eval(self, script, numkeys, *keys_and_args):
+        return self.run_server_side(
+            lambda: self.scripts[script](self, keys_and_args[:numkeys], keys_and_args[numkeys:]))
+
+    def lock(self, name, timeout=None):
+        return FakeLock(self, name)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class BrokenRedis:
+    """Redis client whose every command fails."""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise RedisConnectionError('redis is down')
+        return fail
+
+
+@pytest.fixture
+def fake_redis(request):
+    """Patch the REDIS_CLIENT of the test module with a FakeRedis."""
+    redis = FakeRedis()
+    with patch(request.module.REDIS_CLIENT, redis):
+        yield redis
+
+
+@pytest.fixture
+def broken_redis(request):
+    """Patch the REDIS_CLIENT of the test module with a BrokenRedis."""
+    redis = BrokenRedis()
+    with patch(request.module.REDIS_CLIENT, redis):
+        yield redis
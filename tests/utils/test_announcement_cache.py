@@ -0,0 +1,102 @@
+import pytest
+
+from app.utils.announcement_cache import AnnouncementPageCache, PageNotCached, get_page_cache
+from app.utils.announcement_fetcher import AnnouncementFetcher
+from tests.utils.test_announcement_fetcher import FakeSession
+
+
+@pytest.fixture
+def page_cache(tmp_path):
+    return AnnouncementPageCache(tmp_path / 'pages.sqlite3', max_bytes=10 ** 6)
+
+
+class TestAnnouncementPageCache:
+
+    def test_round_trip(self, page_cache):
+        content_hash = page_cache.set('https://mops.example/1', '<pre>營業收入合計:1,000</pre>')
+
+        assert page_cache.get('https://mops.example/1') == '<pre>營業收入合計:1,000</pre>'
+        assert page_cache.get_hash('https://mops.example/1') == content_hash
+        assert content_hash == AnnouncementPageCache.hash_content('<pre>營業收入合計:1,000</pre>')
+        assert page_cache.get('https://mops.example/2') is None
+
+    def test_pages_are_compressed(self, page_cache):
+        page_cache.set('https://mops.example/1', '營業收入' * 10000)
+
+        assert page_cache.get_stats()['bytes'] < 1000
+
+    def test_shared_between_instances(self, page_cache):
+        page_cache.set('https://mops.example/1', 'page')
+
+        other = AnnouncementPageCache(page_cache.path)
+
+        assert other.get('https://mops.example/1') == 'page'
+
+    def test_evicts_least_recently_read(self, tmp_path):
+        page_cache = AnnouncementPageCache(tmp_path / 'pages.sqlite3', max_bytes=10 ** 6)
+        pages = {f'https://mops.example/{i}': str(i) * 100 for i in range(5)}
+        for link, text in pages.items():
+            page_cache.set(link, text)
+        page_cache.get('https://mops.example/0')
+        page_size = page_cache.total_bytes() // 5
+
+        page_cache.max_bytes = page_size * 4
+        page_cache.set('https://mops.example/5', '5' * 100)
+
+        assert page_cache.get('https://mops.example/0') is not None
+        assert page_cache.get('https://mops.example/1') is None
+        assert page_cache.total_bytes() <= page_cache.max_bytes
+
+    def test_get_page_cache_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv('MOPS_PAGE_CACHE_PATH', 'off')
+
+        assert get_page_cache() is None
+
+
+class TestFetcherWithPageCache:
+
+    def test_second_fetch_is_served_from_cache(self):
+        session = FakeSession()
+
+        fetcher = AnnouncementFetcher(rate=1000, session=session)
+        fetcher.store('https://mops.example/1', fetcher.fetch('https://mops.example/1'))
+        text = AnnouncementFetcher(rate=1000, session=session).fetch('https://mops.example/1')
+
+        assert text == 'page https://mops.example/1'
+        assert len(session.calls) == 1
+
+    def test_offline_mode(self, monkeypatch):
+        session = FakeSession()
+        fetcher = AnnouncementFetcher(rate=1000, session=session)
+        fetcher.store('https://mops.example/1', fetcher.fetch('https://mops.example/1'))
+        monkeypatch.setenv('MOPS_PAGE_CACHE_OFFLINE', '1')
+        fetcher = AnnouncementFetcher(rate=1000, session=session)
+
+        assert fetcher.fetch('https://mops.example/1') == 'page https://mops.example/1'
+        with pytest.raises(PageNotCached):
+            fetcher.fetch('https://mops.example/2')
+        assert len(session.calls) == 1
+
+    def test_failed_pages_are_not_cached(self):
+        session = FakeSession(status_codes={'https://mops.example/bad': 503})
+
+        AnnouncementFetcher(rate=1000, session=session).fetch_many(['https://mops.example/bad'])
+
+        assert get_page_cache().get('https://mops.example/bad') is None
+
+    def test_pages_are_cached_only_when_stored(self):
+        session = FakeSession()
+        fetcher = AnnouncementFetcher(rate=1000, session=session)
+
+        fetcher.fetch('https://mops.example/throttled')
+        fetcher.fetch('https://mops.example/throttled')
+
+        assert get_page_cache().get('https://mops.example/throttled') is None
+        assert len(session.calls) == 2
+
+    def test_store_skips_pages_not_fetched_over_http(self):
+        fetcher = AnnouncementFetcher(rate=1000, session=FakeSession())
+
+        fetcher.store('https://mops.example/1', 'page')
+
+        assert get_page_cache().get('https://mops.example/1') is None
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from app.utils.announcement_fetcher import AnnouncementFetcher, TokenBucket, create_http_session
+
+
+class FakeResponse:
+
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} Error')
+
+
+class FakeSession:
+    """Records calls and the highest number of concurrent requests."""
+
+    def __init__(self, delay=0.02, status_codes=None):
+        self.delay = delay
+        self.status_codes = status_codes or {}
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def get(self, link, timeout=None):
+        with self.lock:
+            self.calls.append((link, timeout))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return FakeResponse(f'page {link}', self.status_codes.get(link, 200))
+
+
+class TestTokenBucket:
+
+    def test_burst_is_immediate(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+
+        assert time.monotonic() - started < 0.1
+
+    def test_waits_for_refill(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        started = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+
+        assert time.monotonic() - started >= 0.09
+
+
+class TestAnnouncementFetcher:
+
+    def test_fetch_many_returns_page_per_link(self):
+        session = FakeSession()
+        fetcher = AnnouncementFetcher(max_workers=4, rate=1000, session=session, timeout=(1, 2))
+        links = [f'https://mops.example/{i}' for i in range(6)]
+
+        pages = fetcher.fetch_many(links + links[:2])
+
+        assert pages == {link: f'page {link}' for link in links}
+        assert len(session.calls) == 6
+        assert all(timeout == (1, 2) for _, timeout in session.calls)
+
+    def test_per_host_limit(self):
+        session = FakeSession(delay=0.05)
+        fetcher = AnnouncementFetcher(max_workers=8, per_host_limit=2, rate=1000, session=session)
+
+        fetcher.fetch_many([f'https://mops.example/{i}' for i in range(8)])
+
+        assert session.max_active == 2
+
+    def test_hosts_are_limited_separately(self):
+        session = FakeSession(delay=0.05)
+        fetcher = AnnouncementFetcher(max_workers=8, per_host_limit=1, rate=1000, session=session)
+
+        fetcher.fetch_many([f'https://host{i % 2}.example/{i}' for i in range(6)])
+
+        assert session.max_active == 2
+
+    def test_fetchers_share_host_limit(self):
+        session = FakeSession(delay=0.05)
+        fetchers = [
+            AnnouncementFetcher(max_workers=1, per_host_limit=1, rate=1000, session=session, use_cache=False)
+            for _ in range(4)
+        ]
+        threads = [
+            threading.Thread(target=fetcher.fetch, args=(f'https://shared.example/{i}',))
+            for i, fetcher in enumerate(fetchers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(session.calls) == 4
+        assert session.max_active == 1
+
+    def test_errors_are_returned_per_link(self):
+        session = FakeSession(status_codes={'https://mops.example/bad': 503})
+        fetcher = AnnouncementFetcher(rate=1000, session=session)
+
+        pages = fetcher.fetch_many(['https://mops.example/ok', 'https://mops.example/bad'])
+
+        assert pages['https://mops.example/ok'] == 'page https://mops.example/ok'
+        assert isinstance(pages['https://mops.example/bad'], requests.HTTPError)
+
+    def test_fetch_raises(self):
+        session = FakeSession(status_codes={'https://mops.example/bad': 404})
+        fetcher = AnnouncementFetcher(rate=1000, session=session)
+
+        with pytest.raises(requests.HTTPError):
+            fetcher.fetch('https://mops.example/bad')
+
+
+def test_http_session_retries_with_backoff():
+    session = create_http_session(pool_size=4, retries=5, backoff_factor=1)
+    adapter = session.get_adapter('https://mops.twse.com.tw')
+
+    assert adapter.max_retries.total == 5
+    assert adapter.max_retries.backoff_factor == 1
+    assert 503 in adapter.max_retries.status_forcelist
@@ -0,0 +1,156 @@
+"""
+Announcement Parser Tests
+
+The streaming parser must return exactly what the BeautifulSoup parser it
+replaced returned, so every fixture page is checked against that reference.
+"""
+import pytest
+
+from app.utils.announcement_handler import AnnounceHandler, IncomeSheetBlockFinder
+from benchmarks.announcement_parser_benchmark import (
+    DEFAULT_PAGES_DIR, compare_results, load_pages_dir, main, parse_with_soup
+)
+
+
+PAGES = load_pages_dir(DEFAULT_PAGES_DIR)
+
+
+@pytest.fixture
+def handler():
+    return AnnounceHandler()
+
+
+class TestIncomeSheetBlockFinder:
+
+    def test_first_primary_trigger_block(self):
+        html = '<td>收入:1</td><td><font>營業收入:2</font>\n其他</td><pre>營業收入:3</pre>'
+
+        assert IncomeSheetBlockFinder.find(html) == '營業收入:2\n其他'
+
+    def test_fallback_trigger(self):
+        assert IncomeSheetBlockFinder.find('<p>營業收入</p><td>a</td><pre>累計收入:5</pre>') == '累計收入:5'
+
+    def test_script_and_comments_are_ignored(self):
+        html = '<td><script>var a = "營業收入";</script><!-- 營業收入 -->x</td>'
+
+        assert IncomeSheetBlockFinder.find(html) is None
+
+    def test_unclosed_cells_nest_until_their_row_ends(self):
+        html = '<table><tr><td>說明<td>營業收入:1\n</tr><tr><td>營業收入:2</td></tr></table>'
+
+        assert IncomeSheetBlockFinder.find(html) == '說明營業收入:1\n'
+
+    def test_whitespace_only_strings_collapse_outside_pre(self):
+        assert IncomeSheetBlockFinder.find('<td>營業收入<b>x</b>\n\n\n<b>y</b></td>') == '營業收入x\ny'
+        assert IncomeSheetBlockFinder.find('<pre>營業收入<b>x</b>\n\n<b>y</b></pre>') == '營業收入x\n\ny'
+
+
+class TestGetIncomesheetAnnounce:
+
+    @pytest.mark.parametrize('name', [name for name in PAGES if name != 'no_income_sheet.html'])
+    def test_matches_soup_parser(self, handler, name):
+        assert handler.get_incomesheet_announce(PAGES[name]) == parse_with_soup(handler, PAGES[name])
+
+    def test_quarterly_report(self, handler):
+        income_sheet = handler.get_incomesheet_announce(PAGES['quarterly_report_pre.html'])
+
+        assert income_sheet['營業收入合計'] == 1298213000
+        assert income_sheet['營業毛利'] == 690000000
+        assert income_sheet['基本每股盈餘'] == 21.2
+
+    def test_negative_values_and_full_width_colon(self, handler):
+        income_sheet = handler.get_incomesheet_announce(PAGES['quarterly_loss_fullwidth.html'])
+
+        assert income_sheet['營業收入合計'] == 85120
+        assert income_sheet['營業利益'] == -12345
+        assert income_sheet['基本每股盈餘'] == -0.35
+
+    def test_summary_announcement(self, handler):
+        income_sheet = handler.get_incomesheet_announce(PAGES['summary_revenue_only.html'])
+
+        assert income_sheet['營業收入合計'] == 1200000
+        assert income_sheet['母公司業主淨利'] == 150000
+        assert income_sheet['營業毛利'] is None
+
+    def test_no_income_sheet(self, handler):
+        with pytest.raises(ValueError):
+            handler.get_incomesheet_announce(PAGES['no_income_sheet.html'])
+
+    @pytest.mark.parametrize('raw, value', [
+        ('1,234(千元)', 1234), (' (5,678) ', -5678), ('$12.5元', 12.5), ('(千元)', None), ('無', None)
+    ])
+    def test_parse_value(self, handler, raw, value):
+        assert handler._parse_value(raw) == value
+
+
+class TestParserBenchmark:
+
+    def test_main_on_fixture_pages(self, tmp_path):
+        output = tmp_path / 'parser.json'
+
+        assert main(['--repeat', '1', '--output', str(output)]) == 0
+        assert main(['--repeat', '1', '--compare', str(output), '--threshold', '0.99']) == 0
+
+    def test_compare_results(self):
+        baseline = {'results': {'streaming': {'pages_per_second': 1000}}}
+
+        assert compare_results(baseline, {'results': {'streaming': {'pages_per_second': 900}}}, 0.2) == []
+        assert compare_results(baseline, {'results': {'streaming': {'pages_per_second': 700}}}, 0.2) == [
+            'streaming: 1000 -> 700 pages/s'
+        ]
+
+
+@pytest.mark.usefixtures('app_context')
+class TestGetSingleSeasonIncomesheets:
+
+    @staticmethod
+    def _announcement():
+        return {
+            '營業收入合計': 1300000000000.0, '營業毛利': 690000000000.0, '營業毛利率': None,
+            '營業利益': 550000000000.0, '營業利益率': None, '稅前淨利': 580000000000.0, '稅前淨利率': None,
+            '本期淨利': 500000000000.0, '本期淨利率': None, '母公司業主淨利': 490000000000.0,
+            '基本每股盈餘': 19.0,
+        }
+
+    def test_matches_single_announcement_path(self, sample_income_sheet, sample_income_sheet_list):
+        handler = AnnounceHandler('https://mops.twse.com.tw/mops/web/t05st01?co_id=2330')
+        expected = handler.get_single_season_incomesheet(self._announcement(), 2024, 2)
+        expected = handler.calculate_income_sheet_annual_growth_rate(expected, 2024, 2)
+
+        results = AnnounceHandler().get_single_season_incomesheets([
+            dict(self._announcement(), stock_id='2330', year=2024, season=2)
+        ])
+
+        assert results[0] == dict(expected, year=2024, season=2)
+        assert results[0]['營業收入合計'] == 700000000000
+        assert results[0]['營業收入合計年增率'] is not None
+
+    def test_null_prior_year_ratio(self, sample_income_sheet_list):
+        results = AnnounceHandler().get_single_season_incomesheets([
+            dict(self._announcement(), stock_id='2330', year=2024, season=1)
+        ])
+
+        assert not isinstance(results[0], Exception)
+        assert results[0]['營業毛利率年增率'] is not None
+        assert results[0]['稅前淨利率年增率'] is None
+        assert results[0]['本期淨利率年增率'] is None
+
+    def test_first_season_without_history(self, sample_basic_info):
+        results = AnnounceHandler().get_single_season_incomesheets([
+            dict(self._announcement(), stock_id='2330', year=2030, season=1)
+        ])
+
+        assert results[0]['營業收入合計'] == 1300000000000
+        assert results[0]['營業毛利率'] == 53.08
+        assert results[0]['營業收入合計年增率'] is None
+
+    def test_failed_record_does_not_stop_batch(self, sample_basic_info):
+        broken = dict(self._announcement(), stock_id='2330', year=2030, season=1)
+        broken['營業收入合計'] = 0
+
+        results = AnnounceHandler().get_single_season_incomesheets([
+            broken, dict(self._announcement(), stock_id='2330', year=2030, season=1)
+        ])
+
+        assert isinstance(results[0], ZeroDivisionError)
+        assert results[1]['營業毛利率'] == 53.08
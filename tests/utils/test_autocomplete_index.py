@@ -0,0 +1,157 @@
+"""
+Autocomplete Index Tests
+
+The database is replaced by a dict of (公司簡稱, search_count) per stock so
+the index can be tested without MySQL.
+"""
+import pytest
+from unittest.mock import patch
+
+from app.utils.autocomplete_index import AutocompleteIndex
+
+
+STOCKS = {
+    '2330': ('台積電', 100),
+    '2303': ('聯電', 40),
+    '2317': ('鴻海', 80),
+    '2337': ('旺宏', 5),
+    '3008': ('大立光', 30),
+    '2344': ('華邦電', 60),
+    '2345': ('智邦', 60),
+}
+
+
+@pytest.fixture
+def database():
+    stocks = dict(STOCKS)
+
+    def load_stocks(stock_ids=None):
+        return {
+            stock_id: stock for stock_id, stock in stocks.items()
+            if stock_ids is None or stock_id in stock_ids
+        }
+
+    with patch.object(AutocompleteIndex, '_load_stocks', side_effect=load_stocks) as loader:
+        yield stocks, loader
+
+
+@pytest.fixture
+def index(database):
+    index = AutocompleteIndex()
+    index.build()
+    return index
+
+
+def brute_force(stocks, prefix, top_k=AutocompleteIndex.TOP_K):
+    if prefix.isdigit() and len(prefix) <= 4:
+        matches = [stock_id for stock_id in stocks if stock_id.startswith(prefix)]
+    else:
+        matches = [stock_id for stock_id, (name, _) in stocks.items() if name.lower().startswith(prefix.lower())]
+    matches.sort(key=lambda stock_id: (-stocks[stock_id][1], stock_id))
+    return [(stock_id, stocks[stock_id][0]) for stock_id in matches[:top_k]]
+
+
+class TestAutocompleteIndex:
+    """Test suite for AutocompleteIndex."""
+
+    def test_search_by_id_prefix(self, index):
+        """Digit prefixes match stock ids, most searched first."""
+        assert index.search('23') == [
+            ('2330', '台積電'), ('2317', '鴻海'), ('2344', '華邦電'), ('2345', '智邦'),
+            ('2303', '聯電'), ('2337', '旺宏')
+        ]
+        assert index.search('234') == [('2344', '華邦電'), ('2345', '智邦')]
+        assert index.search('9') == []
+
+    def test_search_by_name_prefix(self, index):
+        """Other input matches 公司簡稱."""
+        assert index.search('台') == [('2330', '台積電')]
+        assert index.search('大立') == [('3008', '大立光')]
+        assert index.search('台塑') == []
+
+    def test_search_is_limited_to_top_k(self, index):
+        """Only the TOP_K most searched stocks are returned."""
+        index.TOP_K = 2
+        index.build()
+
+        assert index.search('2') == [('2330', '台積電'), ('2317', '鴻海')]
+
+    def test_search_does_not_query(self, index, database):
+        """Answering a lookup does not touch the database once built."""
+        _, loader = database
+        loader.reset_mock()
+
+        index.search('23')
+        index.search('鴻')
+
+        loader.assert_not_called()
+
+    def test_add_search_count_reorders(self, index):
+        """A rising search count moves the stock up every prefix it matches."""
+        index.add_search_count('2337', 200)
+
+        assert index.search('23')[0] == ('2337', '旺宏')
+        assert index.search('2')[0] == ('2337', '旺宏')
+        assert index.search('旺') == [('2337', '旺宏')]
+
+    def test_add_search_count_enters_full_top_k(self, index):
+        """A stock outside a full top list replaces the last one once it ranks higher."""
+        index.TOP_K = 2
+        index.build()
+        index.add_search_count('2303', 10)
+
+        assert index.search('23') == [('2330', '台積電'), ('2317', '鴻海')]
+
+        index.add_search_count('2303', 35)
+
+        assert index.search('23') == [('2330', '台積電'), ('2303', '聯電')]
+
+    def test_refresh_stocks_renames_and_removes(self, index, database):
+        """Reloaded stocks move to their new name and leave when no longer indexed."""
+        stocks, _ = database
+        stocks['2303'] = ('聯華電子', 40)
+        del stocks['2317']
+
+        index.refresh_stocks(['2303', '2317'])
+
+        assert index.search('聯華') == [('2303', '聯華電子')]
+        assert index.search('鴻') == []
+        assert '2317' not in [stock_id for stock_id, _ in index.search('23')]
+
+    def test_refresh_applies_database_changes(self, index, database):
+        """A refresh matches the index to the database and reports the changed stocks."""
+        stocks, _ = database
+        stocks['2330'] = ('台積電', 10)
+        stocks['6505'] = ('台塑化', 500)
+        del stocks['3008']
+
+        assert index.refresh() == 3
+        for prefix in ['2', '23', '3', '6', '台', '台積', '大']:
+            assert index.search(prefix) == brute_force(stocks, prefix), prefix
+
+    def test_case_insensitive_names(self, database):
+        """Latin letters in 公司簡稱 match regardless of case."""
+        stocks, _ = database
+        stocks['6669'] = ('緯穎-KY', 10)
+        stocks['2357'] = ('ASUS', 10)
+        index = AutocompleteIndex()
+        index.build()
+
+        assert index.search('asu') == [('2357', 'ASUS')]
+        assert index.search('緯穎-ky') == [('6669', '緯穎-KY')]
+
+    def test_matches_brute_force_after_updates(self, index, database):
+        """Every prefix agrees with a full scan after a mix of updates."""
+        stocks, _ = database
+        for stock_id, count in [('2345', 1), ('2303', 70), ('3008', 45), ('2345', 3)]:
+            index.add_search_count(stock_id, count)
+            name, search_count = stocks[stock_id]
+            stocks[stock_id] = (name, search_count + count)
+
+        for stock_id in stocks:
+            for length in range(1, 5):
+                prefix = stock_id[:length]
+                assert index.search(prefix) == brute_force(stocks, prefix), prefix
+            name = stocks[stock_id][0]
+            for length in range(1, len(name) + 1):
+                assert index.search(name[:length]) == brute_force(stocks, name[:length]), name[:length]
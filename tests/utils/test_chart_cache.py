@@ -0,0 +1,89 @@
+"""
+Chart Cache Tests
+
+Redis is replaced by the in-memory FakeRedis of tests/utils/conftest.py so
+the cache logic can be tested without a Redis server.
+"""
+import pytest
+from unittest.mock import patch
+
+from flask import jsonify
+
+from app.utils.chart_cache import ChartCache
+
+
+REDIS_CLIENT = 'app.utils.chart_cache.redis_client'
+
+
+@pytest.mark.usefixtures('app_context')
+class TestChartCache:
+    """Test suite for ChartCache."""
+
+    def test_miss_then_hit(self, fake_redis):
+        """A computed chart is served from the cache on the next request and counted."""
+        cache = ChartCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return jsonify([{'Year/Season': '2024Q1', '基本每股盈餘': 9.0}])
+
+        first = cache.get_or_compute('eps', 'etag-1', compute)
+        second = cache.get_or_compute('eps', 'etag-1', compute)
+
+        assert len(calls) == 1
+        assert second.status_code == 200
+        assert second.get_json() == first.get_json()
+        assert second.mimetype == 'application/json'
+
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+        assert stats['routes']['eps'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    def test_new_etag_recomputes(self, fake_redis):
+        """A write changes the data version ETag, so the old entry is not used."""
+        cache = ChartCache()
+        cache.get_or_compute('eps', 'etag-1', lambda: jsonify([1]))
+
+        response = cache.get_or_compute('eps', 'etag-2', lambda: jsonify([2]))
+
+        assert response.get_json() == [2]
+
+    def test_errors_and_missing_etag_are_not_cached(self, fake_redis):
+        """Only successful responses with an ETag are stored."""
+        cache = ChartCache()
+        cache.get_or_compute('daily_info', 'etag-1', lambda: (jsonify({}), 404))
+        cache.get_or_compute('daily_info', None, lambda: jsonify({}))
+
+        assert [key for key in fake_redis.store if not key.endswith(':lock')] == []
+
+    def test_waits_for_worker_holding_the_lock(self, fake_redis):
+        """A cold key being computed elsewhere is awaited instead of recomputed."""
+        cache = ChartCache()
+        cache_key = f'{ChartCache.KEY_PREFIX}:eps:etag-1'
+        fake_redis.store[f'{cache_key}:lock'] = b'1'
+
+        def other_worker_finishes(seconds):
+            fake_redis.store[cache_key] = b'[1]'
+
+        with patch('app.utils.chart_cache.time.sleep', side_effect=other_worker_finishes):
+            response = cache.get_or_compute('eps', 'etag-1', lambda: pytest.fail('recomputed'))
+
+        assert response.get_json() == [1]
+
+    def test_computes_when_lock_holder_times_out(self, fake_redis):
+        """A worker stuck behind a lock falls back to computing itself."""
+        cache = ChartCache()
+        cache.WAIT_SECONDS = 0
+        fake_redis.store[f'{ChartCache.KEY_PREFIX}:eps:etag-1:lock'] = b'1'
+
+        response = cache.get_or_compute('eps', 'etag-1', lambda: jsonify([3]))
+
+        assert response.get_json() == [3]
+
+    def test_redis_unavailable_computes(self, broken_redis):
+        """Redis failures degrade to running the view uncached."""
+        cache = ChartCache()
+        response = cache.get_or_compute('eps', 'etag-1', lambda: jsonify([4]))
+        assert response.get_json() == [4]
+        assert cache.get_stats()['hits'] == 0
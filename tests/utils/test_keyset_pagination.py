@@ -0,0 +1,30 @@
+import pytest
+from datetime import datetime
+
+from app.utils.keyset_pagination import decode_cursor, encode_cursor, paginate_by_keyset
+
+
+class TestCursor:
+
+    def test_round_trip(self):
+        cursor = encode_cursor(datetime(2024, 3, 1, 10, 30, 15), 42)
+
+        assert decode_cursor(cursor) == (datetime(2024, 3, 1, 10, 30, 15), 42)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(datetime(2024, 3, 1, 10, 30), 123456)
+
+        assert all(char.isalnum() or char in '-_' for char in cursor)
+
+    @pytest.mark.parametrize('cursor', ['garbage', '', 'W10', 'WyJub3QtYS1kYXRlIiwgMV0'])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestPaginateByKeyset:
+
+    @pytest.mark.parametrize('page_size', [0, -5])
+    def test_invalid_page_size(self, page_size):
+        with pytest.raises(ValueError):
+            paginate_by_keyset(None, None, None, page_size=page_size)
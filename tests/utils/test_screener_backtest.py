@@ -0,0 +1,78 @@
+"""
+Screener Backtest Tests
+
+Candidate SQL is patched to return the shared sample stock; the valuation
+check runs against the shared income sheet (2024 Q1) and the 2023 monthly
+valuation fixtures.
+"""
+import pytest
+from datetime import date, datetime
+from unittest.mock import patch
+
+from app.utils.screener_backtest import ScreenerBacktest
+from app.utils.stock_screener import StockScreenerManager
+from app.models.screener_backtest_result import ScreenerBacktestResult
+
+
+class TestMonthEndDates:
+
+    def test_month_end_dates(self):
+        dates = ScreenerBacktest.get_month_end_dates(date(2023, 11, 15), date(2024, 2, 29))
+
+        assert dates == [datetime(2023, 11, 30), datetime(2023, 12, 31),
+                         datetime(2024, 1, 31), datetime(2024, 2, 29)]
+
+    def test_partial_last_month_is_excluded(self):
+        dates = ScreenerBacktest.get_month_end_dates(date(2024, 1, 1), date(2024, 3, 30))
+
+        assert dates[-1] == datetime(2024, 2, 29)
+
+    @pytest.mark.parametrize('backtest_date,expected', [
+        (datetime(2024, 1, 31), (2023, 12)),
+        (datetime(2024, 8, 31), (2024, 7)),
+    ])
+    def test_previous_month(self, backtest_date, expected):
+        assert ScreenerBacktest.get_previous_month(backtest_date) == expected
+
+
+@pytest.mark.usefixtures('app_context')
+class TestScreenerBacktest:
+
+    def test_run_evaluates_point_in_time(
+        self, sample_basic_info, sample_income_sheet, sample_monthly_valuation_list
+    ):
+        stock_id = sample_basic_info.id
+        backtest = ScreenerBacktest('test_screener_option', '2024-01-01', '2024-08-31')
+
+        with patch.object(StockScreenerManager, 'get_candidate_stocks',
+                          return_value=[(stock_id, '其他', 100)]):
+            result = backtest.run()
+
+        # 2024 Q1 is the newest reported season from April onwards
+        assert result['date_count'] == 8
+        assert result['results']['2024-03-31'] == []
+        assert result['results']['2024-04-30'] == [stock_id]
+        assert result['results']['2024-08-31'] == [stock_id]
+        assert result['saved'] == 5
+
+        saved = ScreenerBacktestResult.query.filter_by(
+            filter_model='test_screener_option', stock_id=stock_id).all()
+        assert sorted(row.backtest_date.month for row in saved) == [4, 5, 6, 7, 8]
+
+    def test_rerun_does_not_duplicate(
+        self, sample_basic_info, sample_income_sheet, sample_monthly_valuation_list
+    ):
+        stock_id = sample_basic_info.id
+        with patch.object(StockScreenerManager, 'get_candidate_stocks',
+                          return_value=[(stock_id, '其他', 100)]):
+            ScreenerBacktest('test_screener_option', '2024-04-01', '2024-05-31').run()
+            ScreenerBacktest('test_screener_option', '2024-04-01', '2024-05-31').run()
+
+        assert ScreenerBacktestResult.query.filter_by(stock_id=stock_id).count() == 2
+
+    def test_stock_without_history_fails(self, sample_basic_info):
+        backtest = ScreenerBacktest('test_screener_option', '2024-04-01', '2024-04-30')
+        backtest.load_history([sample_basic_info.id])
+
+        query_condition = StockScreenerManager('test_screener_option', datetime(2024, 4, 30)).query_condition
+        assert backtest.evaluate(sample_basic_info.id, datetime(2024, 4, 30), query_condition) is False
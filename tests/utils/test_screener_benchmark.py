@@ -0,0 +1,56 @@
+"""
+Screener Benchmark Tests
+
+Covers the regression comparison and the determinism of the synthetic
+market; the benchmark itself runs on its own database, not in the suite.
+"""
+import random
+
+from benchmarks.screener_benchmark import compare_results
+from benchmarks.synthetic_market import _generate_stock
+from app.database_setup import IncomeSheet, MonthRevenue
+from app.monthly_valuation.models import MonthlyValuation
+
+
+def _report(seconds, queries):
+    return {'results': {'option': {
+        'candidate_count': 10,
+        'screener': {'seconds': seconds, 'min_seconds': seconds, 'queries': queries},
+    }}}
+
+
+class TestCompareResults:
+
+    def test_within_threshold(self):
+        assert compare_results(_report(1.0, 4), _report(1.1, 4), 0.2) == []
+
+    def test_slower_than_threshold(self):
+        regressions = compare_results(_report(1.0, 4), _report(1.5, 4), 0.2)
+
+        assert regressions == ['option.screener: 1.0s -> 1.5s']
+
+    def test_more_queries(self):
+        regressions = compare_results(_report(1.0, 4), _report(1.0, 40), 0.2)
+
+        assert regressions == ['option.screener: 4 -> 40 queries']
+
+    def test_new_benchmark_is_ignored(self):
+        assert compare_results({'results': {}}, _report(1.0, 4), 0.2) == []
+
+
+class TestSyntheticMarket:
+
+    def test_same_seed_generates_same_stock(self):
+        first = _generate_stock('1101', random.Random(1), 2020, 2024)
+        second = _generate_stock('1101', random.Random(1), 2020, 2024)
+
+        assert first == second
+
+    def test_history_size(self):
+        rows = _generate_stock('1101', random.Random(1), 2020, 2024)
+
+        assert len(rows[MonthRevenue]) == 5 * 12
+        assert len(rows[MonthlyValuation]) == 5 * 12
+        assert len(rows[IncomeSheet]) == 5 * 4
+        assert rows[MonthRevenue][0]['去年同月增減'] is None
+        assert rows[MonthRevenue][12]['去年同月增減'] is not None
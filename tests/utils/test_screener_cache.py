@@ -0,0 +1,109 @@
+"""
+Screener Cache Tests
+
+Redis is replaced by the in-memory FakeRedis of tests/utils/conftest.py so
+the cache logic can be tested without a Redis server.
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.utils.screener_cache import ScreenerCache
+from app.utils.stock_screener import StockScreenerManager
+
+
+REDIS_CLIENT = 'app.utils.screener_cache.redis_client'
+
+
+@pytest.mark.usefixtures('app_context')
+class TestScreenerCache:
+    """Test suite for ScreenerCache."""
+
+    def test_miss_then_hit(self, fake_redis):
+        """A stored result is returned on the next lookup and counted."""
+        cache = ScreenerCache()
+        key = cache.build_key('test_screener_option', {'date': '2025-08-08'})
+
+        assert cache.get(key, 'test_screener_option') is None
+        cache.set(key, [('2330', '台積電', 500.0)])
+        assert cache.get(key, 'test_screener_option') == [('2330', '台積電', 500.0)]
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert stats['options']['test_screener_option'] == {'hits': 1, 'misses': 1}
+
+    def test_key_depends_on_option_and_condition(self, fake_redis):
+        """Different options or query conditions never share a key."""
+        cache = ScreenerCache()
+
+        key = cache.build_key('a', {'date': '2025-08-08'})
+        assert key != cache.build_key('b', {'date': '2025-08-08'})
+        assert key != cache.build_key('a', {'date': '2025-08-09'})
+        assert key == cache.build_key('a', {'date': '2025-08-08'})
+
+    def test_invalidate_changes_key(self, fake_redis):
+        """Invalidation moves to a new generation so old entries are unreachable."""
+        cache = ScreenerCache()
+        key = cache.build_key('a', {'date': '2025-08-08'})
+        cache.set(key, [('2330',)])
+
+        cache.invalidate()
+
+        new_key = cache.build_key('a', {'date': '2025-08-08'})
+        assert new_key != key
+        assert cache.get(new_key, 'a') is None
+
+    def test_rows_round_trip_as_json(self, fake_redis):
+        """Decimal and date values come back with their types, stored as plain JSON."""
+        cache = ScreenerCache()
+        key = cache.build_key('a', {'date': '2025-08-08'})
+        stocks = [('2330', '台積電', Decimal('12.34'), date(2025, 8, 8), 500.0, None)]
+
+        cache.set(key, stocks)
+
+        assert cache.get(key, 'a') == stocks
+        assert fake_redis.store[key].startswith('[["2330"')
+
+    def test_unreadable_entry_is_a_miss(self, fake_redis):
+        """Entries that are not screener JSON, e.g. pickles, are never loaded."""
+        cache = ScreenerCache()
+        key = cache.build_key('a', {'date': '2025-08-08'})
+        fake_redis.store[key] = b'\x80\x04\x95'
+
+        assert cache.get(key, 'a') is None
+
+    def test_watermark_is_memoized(self, fake_redis):
+        """Lookups within WATERMARK_SECONDS reuse the watermark, invalidate() drops it."""
+        cache = ScreenerCache()
+        with patch.object(ScreenerCache, 'get_data_watermark', return_value='w') as get_data_watermark:
+            cache.build_key('a', {'date': '2025-08-08'})
+            cache.build_key('b', {'date': '2025-08-08'})
+            assert get_data_watermark.call_count == 1
+
+            cache.invalidate()
+            cache.build_key('a', {'date': '2025-08-08'})
+            assert get_data_watermark.call_count == 2
+
+    def test_redis_unavailable_is_a_miss(self, broken_redis):
+        """Redis failures degrade to running the screener uncached."""
+        cache = ScreenerCache()
+        key = cache.build_key('a', {'date': '2025-08-08'})
+        assert key is None
+        assert cache.get(key, 'a') is None
+        cache.set(key, [])
+        cache.invalidate()
+        assert cache.get_stats()['hits'] == 0
+
+    def test_screener_uses_cache(self, fake_redis):
+        """get_screened_stocks skips the screener SQL on a cache hit."""
+        screener = StockScreenerManager('test_screener_option')
+        cached_stocks = [('2330', '其他', 0)]
+        key = ScreenerCache().build_key(screener.option, screener.query_condition)
+        ScreenerCache().set(key, cached_stocks)
+
+        with patch.object(StockScreenerManager, 'get_candidate_stocks') as get_candidate_stocks:
+            assert screener.get_screened_stocks() == cached_stocks
+            get_candidate_stocks.assert_not_called()
@@ -0,0 +1,87 @@
+"""
+Screener Rule Compiler Tests
+
+test_rule_option in tests/fixtures/screener_format.json requires a month
+revenue YoY above 10% in the newest 2 months and a positive newest EPS.
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from app.utils.screener_rules import ScreenerRuleSet, get_period_window
+from app.utils.stock_screener import StockScreenerManager
+
+
+class TestPeriodWindow:
+
+    def test_month_window_crosses_year(self):
+        assert get_period_window('month', datetime(2024, 2, 15), 3) == [(2024, 1), (2023, 12), (2023, 11)]
+
+    def test_season_window(self):
+        # In May the newest published season is Q1
+        assert get_period_window('season', datetime(2024, 5, 15), 2) == [(2024, 1), (2023, 4)]
+
+
+class TestScreenerRuleSet:
+
+    @pytest.mark.parametrize('rule,message', [
+        ({'metric': 'unknown.去年同月增減', 'comparator': '>', 'value': 0}, 'Unknown metric source'),
+        ({'metric': 'month_revenue.unknown', 'comparator': '>', 'value': 0}, 'Unknown metric column'),
+        ({'metric': 'month_revenue.去年同月增減', 'comparator': '=>', 'value': 0}, 'Unknown comparator'),
+        ({'metric': 'basic_information.產業類別', 'comparator': '==', 'value': 'x', 'lookback': 2}, 'no periods'),
+    ])
+    def test_invalid_rule(self, rule, message):
+        with pytest.raises(ValueError, match=message):
+            ScreenerRuleSet([rule])
+
+    def test_statement_only_uses_bound_parameters(self):
+        rule_set = ScreenerRuleSet([
+            {'metric': 'month_revenue.去年同月增減', 'comparator': '>', 'value': 12.34, 'lookback': 3}
+        ])
+
+        assert '12.34' not in str(rule_set.statement)
+        params = rule_set.get_params(datetime(2024, 5, 15))
+        assert params['rule0_value'] == 12.34
+        assert params['rule0_0_year'] == 2024 and params['rule0_0_period'] == '4'
+        assert params['rule0_2_period'] == '2'
+
+    def test_rule_sets_are_compiled_once(self):
+        first = StockScreenerManager.get_rule_set('test_rule_option')
+
+        with patch('builtins.open') as mocked_open:
+            assert StockScreenerManager.get_rule_set('test_rule_option') is first
+            StockScreenerManager('test_screener_option')
+        mocked_open.assert_not_called()
+
+    def test_sql_options_have_no_rule_set(self):
+        assert StockScreenerManager.get_rule_set('test_screener_option') is None
+
+
+@pytest.mark.usefixtures('app_context')
+class TestScreenerRuleExecution:
+
+    @pytest.mark.parametrize('screen_date,passed', [
+        (datetime(2024, 5, 15), True),
+        # January revenue YoY is below 10%
+        (datetime(2024, 3, 15), False),
+    ])
+    def test_execute_matches_in_memory_evaluation(
+        self, sample_basic_info, sample_month_revenue_list, sample_income_sheet, screen_date, passed
+    ):
+        rule_set = StockScreenerManager.get_rule_set('test_rule_option')
+
+        rows = [tuple(row) for row in rule_set.execute(screen_date)]
+        arrays = rule_set.load_metric_arrays(stock_ids=[sample_basic_info.id])
+
+        assert rows == rule_set.evaluate(arrays, screen_date)
+        assert (sample_basic_info.id in [row[0] for row in rows]) is passed
+
+    def test_candidate_rows_match_format(self, sample_basic_info, sample_month_revenue_list, sample_income_sheet):
+        manager = StockScreenerManager('test_rule_option', datetime(2024, 5, 15))
+
+        stocks = manager.get_candidate_stocks()
+        stock = next(row for row in stocks if row[0] == sample_basic_info.id)
+
+        assert len(stock) == 3
+        assert stock[2] == pytest.approx(sample_month_revenue_list[3].去年同月增減)
+        assert manager.format_screener_message([stock])
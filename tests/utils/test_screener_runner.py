@@ -0,0 +1,89 @@
+"""
+Screener Runner Tests
+
+Redis is replaced by a client whose every command fails, so each option
+is a cache miss and runs the full candidate/valuation/save path.
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils.screener_runner import ScreenerRunner
+from app.utils.stock_screener import StockScreenerManager
+from app.models.recommended_stock import RecommendedStock
+
+
+class BrokenRedis:
+    """Redis client whose every command fails."""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise RedisConnectionError('redis is down')
+        return fail
+
+
+@pytest.fixture(autouse=True)
+def broken_redis():
+    with patch('app.utils.screener_cache.redis_client', BrokenRedis()):
+        yield
+
+
+@pytest.mark.usefixtures('app_context')
+class TestScreenerRunner:
+    """Test suite for ScreenerRunner."""
+
+    def test_loads_every_option_by_default(self):
+        runner = ScreenerRunner()
+
+        assert runner.options == ['test_screener_option', 'test_screener_option_2', 'test_rule_option']
+        assert runner.max_workers == 3
+
+    def test_parses_string_date(self):
+        runner = ScreenerRunner(date='2025-08-08')
+
+        assert runner.date == datetime(2025, 8, 8)
+
+    def test_valuation_runs_once_for_all_options(self, sample_basic_info):
+        stock_id = sample_basic_info.id
+        candidates = {
+            'test_screener_option': [(stock_id, '其他', 100)],
+            'test_screener_option_2': [(stock_id, 1.0, 0.5, 100.0), ('0000', 1.0, 0.5, 100.0)],
+        }
+
+        def fake_candidates(manager):
+            return candidates.get(manager.option, [])
+
+        with patch.object(StockScreenerManager, 'get_candidate_stocks', fake_candidates), \
+                patch.object(StockScreenerManager, 'check_stocks_valuation',
+                             return_value={stock_id}) as check:
+            result = ScreenerRunner(date=datetime(2025, 8, 8)).run()
+
+        check.assert_called_once_with([stock_id, '0000'])
+        assert result['valuation']['candidate_count'] == 2
+        assert result['valuation']['passed_count'] == 1
+
+        for option in candidates:
+            option_result = result['options'][option]
+            assert option_result['error'] is None
+            assert option_result['cached'] is False
+            assert option_result['stock_count'] == 1
+            assert option_result['save_stats']['added'] == 1
+            assert len(option_result['messages']) == 1
+
+        saved = RecommendedStock.query.filter_by(stock_id=stock_id).all()
+        assert {stock.filter_model for stock in saved} == set(candidates)
+
+    def test_failed_option_does_not_stop_others(self):
+        def fake_candidates(manager):
+            if manager.option == 'test_screener_option':
+                raise RuntimeError('bad sql')
+            return []
+
+        with patch.object(StockScreenerManager, 'get_candidate_stocks', fake_candidates):
+            result = ScreenerRunner(date=datetime(2025, 8, 8)).run()
+
+        assert result['options']['test_screener_option']['error'] == 'bad sql'
+        assert result['options']['test_screener_option_2']['error'] is None
+        assert result['options']['test_screener_option_2']['stock_count'] == 0
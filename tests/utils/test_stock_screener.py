@@ -352,3 +352,80 @@ class TestStockScreenerIntegration:
             # Cleanup
             RecommendedStock.query.filter_by(stock_id='2330').delete()
             db.session.commit()
+
+
+@pytest.mark.usefixtures('app_context')
+class TestBatchValuation:
+    """Tests for the set-based check_stocks_valuation path."""
+
+    def test_matches_single_stock_check(self, complete_stock_data):
+        """Batch result agrees with check_stock_valuation for every stock."""
+        screener = StockScreenerManager("test_screener_option")
+        stock_ids = ['2330', '9999']
+
+        passed = screener.check_stocks_valuation(stock_ids)
+
+        for stock_id in stock_ids:
+            assert (stock_id in passed) == screener.check_stock_valuation(stock_id)
+
+    def test_empty_candidates(self, app_context):
+        """No candidates returns an empty set without querying."""
+        screener = StockScreenerManager("test_screener_option")
+
+        assert screener.check_stocks_valuation([]) == set()
+
+    def test_constant_query_count(self, complete_stock_data, sample_basic_info_2):
+        """Query count does not grow with the number of candidates."""
+        from sqlalchemy import event
+        from app import db
+
+        screener = StockScreenerManager("test_screener_option")
+        statements = []
+
+        def count_query(*args, **kwargs):
+            statements.append(args[2])
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        try:
+            screener.check_stocks_valuation(['2330'])
+            single_count = len(statements)
+            statements.clear()
+            screener.check_stocks_valuation(['2330', '2317', '9999', '9998'])
+            batch_count = len(statements)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        assert batch_count == single_count
+
+    def test_filter_stocks_by_valuation_keeps_order(self, complete_stock_data):
+        """filter_stocks_by_valuation keeps the candidate rows of passing stocks."""
+        screener = StockScreenerManager("test_screener_option")
+        stocks = [('9999', '不存在', 0), ('2330', '台積電', 500.0)]
+
+        result = screener.filter_stocks_by_valuation(stocks)
+
+        expected = [stock for stock in stocks if screener.check_stock_valuation(stock[0])]
+        assert result == expected
+
+    @pytest.mark.parametrize('overrides, expected', [
+        ({}, True),
+        ({'eps': 0.2}, False),
+        ({'operating_margin': 5.0}, False),
+        ({'pretax_margin': 0}, False),
+        ({'pe_median': None}, False),
+        ({'stock_price': None}, False),
+        ({'stock_price': 800.0}, False),
+    ])
+    def test_is_valuation_acceptable(self, overrides, expected):
+        """Valuation rules applied to already loaded figures."""
+        values = {
+            'eps': 8.69,
+            'operating_margin': 41.67,
+            'pretax_margin': 43.33,
+            'average_monthly_price': 610.0,
+            'pe_median': 18.0,
+            'stock_price': 580.0,
+        }
+        values.update(overrides)
+
+        assert StockScreenerManager.is_valuation_acceptable(**values) is expected
@@ -0,0 +1,107 @@
+"""
+Stock Search Count Service Tests
+
+Redis is replaced by the in-memory FakeRedis of tests/utils/conftest.py,
+running the search count script in Python, so counting can be tested
+without a Redis server.
+"""
+import pytest
+from unittest.mock import patch
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app import db
+from app.database_setup import StockSearchCounts
+from app.utils.stock_search_count_service import StockSearchCountService, INCREASE_SEARCH_COUNT_SCRIPT
+
+
+REDIS_CLIENT = 'app.utils.stock_search_count_service.redis_client'
+
+
+def increase_search_count(redis, keys, args):
+    """Python version of INCREASE_SEARCH_COUNT_SCRIPT."""
+    (user_key, deltas_key), (stock_id, expire_at) = keys, args
+    if not redis.sadd(user_key, stock_id):
+        return 0
+    redis.expireat(user_key, expire_at)
+    redis.hincrby(deltas_key, stock_id, 1)
+    return 1
+
+
+@pytest.fixture
+def fake_redis(fake_redis):
+    fake_redis.scripts[INCREASE_SEARCH_COUNT_SCRIPT] = increase_search_count
+    return fake_redis
+
+
+class TestIncreaseStockSearchCount:
+    """Test suite for StockSearchCountService.increase_stock_search_count."""
+
+    def test_counts_once_per_user_per_day(self, fake_redis):
+        """Repeated views of a user are counted once, each in one round trip."""
+        service = StockSearchCountService()
+
+        assert service.increase_stock_search_count('a@example.com', '2330') is True
+        assert service.increase_stock_search_count('a@example.com', '2330') is False
+        assert service.increase_stock_search_count('b@example.com', '2330') is True
+        assert service.increase_stock_search_count('a@example.com', '2317') is True
+
+        assert fake_redis.round_trips == 4
+        assert fake_redis.hgetall(StockSearchCountService.DELTAS_KEY) == {b'2330': b'2', b'2317': b'1'}
+
+    def test_redis_error_is_not_raised(self, broken_redis):
+        """A Redis outage loses the view instead of failing the page."""
+        assert StockSearchCountService().increase_stock_search_count('a@example.com', '2330') is False
+
+
+@pytest.mark.usefixtures('app_context')
+class TestFlushStockSearchCounts:
+    """Test suite for StockSearchCountService.flush_stock_search_counts."""
+
+    def test_flush_applies_deltas(self, fake_redis, sample_stock_search_counts):
+        """Accumulated views are added to stock_search_counts and cleared from Redis."""
+        service = StockSearchCountService()
+        for user in ['a@example.com', 'b@example.com', 'c@example.com']:
+            service.increase_stock_search_count(user, '2330')
+
+        assert service.flush_stock_search_counts() == 1
+
+        db.session.expire_all()
+        assert db.session.get(StockSearchCounts, '2330').search_count == 1003
+        assert fake_redis.hashes == {}
+        assert service.flush_stock_search_counts() == 0
+
+    def test_flush_retries_failed_deltas(self, fake_redis, sample_stock_search_counts):
+        """Deltas of a failed flush are applied by the next one together with later views."""
+        service = StockSearchCountService()
+        service.increase_stock_search_count('a@example.com', '2330')
+
+        with patch.object(db.session, 'commit', side_effect=RuntimeError('database is down')):
+            with pytest.raises(RuntimeError):
+                service.flush_stock_search_counts()
+        service.increase_stock_search_count('b@example.com', '2330')
+
+        service.flush_stock_search_counts()
+        service.flush_stock_search_counts()
+
+        db.session.expire_all()
+        assert db.session.get(StockSearchCounts, '2330').search_count == 1002
+
+    def test_flush_logs_redis_failure_after_commit(self, fake_redis, sample_stock_search_counts):
+        """A Redis error while clearing committed deltas is logged, not raised."""
+        service = StockSearchCountService()
+        service.increase_stock_search_count('a@example.com', '2330')
+
+        with patch.object(fake_redis, 'delete', side_effect=RedisConnectionError('redis is down')), \
+                patch('app.utils.stock_search_count_service.logger') as logger:
+            assert service.flush_stock_search_counts() == 1
+
+        logger.error.assert_called_once()
+        db.session.expire_all()
+        assert db.session.get(StockSearchCounts, '2330').search_count == 1001
+
+    def test_flush_skips_while_another_runs(self, fake_redis):
+        """Only one flush runs at a time."""
+        fake_redis.store[StockSearchCountService.FLUSH_LOCK_KEY] = b'1'
+
+        assert StockSearchCountService().flush_stock_search_counts() == -1